@@ -1,4 +1,9 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Lean one-file build (the "lean" profile of build_exe.py, which also
+# offers a one-dir "fast" profile that skips unpacking on every launch)
+import sys
+sys.path.insert(0, SPECPATH)
+from build_exe import LEAN_EXCLUDES
 
 
 a = Analysis(
@@ -6,11 +11,11 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('license.json', '.')],
-    hiddenimports=['PyQt5', 'reportlab', 'docx', 'pymupdf', 'pdfplumber', 'PIL'],
+    hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=LEAN_EXCLUDES,
     noarchive=False,
     optimize=0,
 )
@@ -26,7 +31,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     runtime_tmpdir=None,
     console=False,
@@ -12,5 +12,32 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from gui import main
 
+
+def smoke_imports(modules, result_file):
+    """Import each module and record the outcome (used by build_exe.py).
+    
+    Args:
+        modules: Comma-separated module names
+        result_file: File to write 'name: ok' or 'name: error' lines to
+        
+    Returns:
+        Exit status: 0 if every module imported, 1 otherwise
+    """
+    import importlib
+    lines = []
+    for name in modules.split(','):
+        try:
+            importlib.import_module(name)
+            lines.append(f"{name}: ok")
+        except Exception as e:
+            lines.append(f"{name}: {type(e).__name__}: {e}")
+    with open(result_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return 0 if all(line.endswith(': ok') for line in lines) else 1
+
+
 if __name__ == "__main__":
+    # Build smoke test: check the lazily imported libraries are bundled
+    if os.environ.get('MCQ_SMOKE_IMPORTS'):
+        sys.exit(smoke_imports(os.environ['MCQ_SMOKE_IMPORTS'], os.environ['MCQ_SMOKE_RESULT']))
     main()
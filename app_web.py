@@ -7,19 +7,48 @@ Run this to launch the web application accessible on tablets/phones
 import os
 import json
 from datetime import datetime
-from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for, Response, stream_with_context
+from werkzeug.utils import secure_filename, safe_join
 import secrets
 from pathlib import Path
 
-from pdf_extractor import PDFQuestionExtractor
-from document_generator import QuestionPaperGenerator, AnswerKeyGenerator
-from database import QuestionDatabase
+from ingest import CheckpointedIngestor, IngestCheckpoint, CHECKPOINT_FILE
+from database import QuestionDatabase, BucketIndex, normalize_options
+from paper_assembly import Blueprint, PaperAssembler
+from exposure import UsageHistory, ExposurePool
+from paper_cache import PaperCache, paper_cache_key
+from downloads import zip_response
+from exporters import EXPORT_FORMATS, stream_export
 from license_manager import LicenseValidator
 
+def load_secret_key(key_file='.secret_key'):
+    """Get the session secret shared by all server processes.
+    
+    Uses MCQ_SECRET_KEY if set; otherwise reads key_file, creating it on
+    first use. The file is linked into place atomically so that workers
+    starting together all end up with the same key.
+    """
+    key = os.environ.get('MCQ_SECRET_KEY')
+    if key:
+        return key
+    
+    key_path = Path(key_file)
+    if not key_path.exists():
+        temp_path = key_path.with_name(f"{key_path.name}.{os.getpid()}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(temp_path, key_path)
+        except FileExistsError:
+            pass  # Another worker created it first
+        finally:
+            os.remove(temp_path)
+    return key_path.read_text().strip()
+
 # Initialize Flask app
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(32)
+app.secret_key = load_secret_key()
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'output'
@@ -30,6 +59,16 @@ os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 
 # Initialize database
 db = QuestionDatabase()
+ingestor = CheckpointedIngestor(
+    db, IngestCheckpoint(CHECKPOINT_FILE)
+)
+exposure_pool = ExposurePool(db, UsageHistory())
+
+@app.before_request
+def refresh_shared_state():
+    """Pick up questions and usage recorded by other server processes."""
+    db.refresh()
+    exposure_pool.history.refresh()
 
 # License check
 def check_license():
@@ -50,8 +89,8 @@ def index():
     """Main page."""
     is_valid, license_msg = check_license()
     stats = {
-        'total_questions': len(db.get_all_questions()),
-        'subjects': len(set(q['subject'] for q in db.get_all_questions())),
+        'total_questions': db.count_questions(),
+        'subjects': len(db.get_subjects()),
         'license_message': license_msg
     }
     return render_template('index.html', stats=stats)
@@ -78,27 +117,21 @@ def upload():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
-        # Extract questions
+        # Extract questions, resuming any earlier partial ingest of this file
         subject = request.form.get('subject', 'General')
         chapter = request.form.get('chapter', 'Chapter 1')
         
-        extractor = PDFQuestionExtractor()
-        questions = extractor.extract_from_pdf(filepath)
-        
-        # Add to database
-        added_count = 0
-        for q in questions:
-            q['subject'] = subject
-            q['chapter'] = chapter
-            db.add_question(q)
-            added_count += 1
+        success, added_count, message = ingestor.ingest(filepath, subject, chapter)
+        if not success:
+            # Keep the upload so a retry can pick up from the checkpoint
+            return jsonify({'error': message, 'count': added_count}), 500
         
         # Clean up
         os.remove(filepath)
         
         return jsonify({
             'success': True,
-            'message': f'Successfully extracted and added {added_count} questions',
+            'message': message,
             'count': added_count
         })
         
@@ -108,7 +141,13 @@ def upload():
 @app.route('/questions')
 def questions():
     """View all questions."""
-    all_questions = db.get_all_questions()
+    all_questions = []
+    for question in db.get_all_questions():
+        # Questions stored before options were normalized may use the list shape
+        options, correct_answer = normalize_options(question.get('options'), question.get('correct_answer'))
+        subject, chapter, difficulty = BucketIndex.key_for(question)
+        all_questions.append(dict(question, options=options, correct_answer=correct_answer,
+                                  subject=subject, chapter=chapter, difficulty=difficulty))
     subjects = sorted(set(q['subject'] for q in all_questions))
     return render_template('questions.html', questions=all_questions, subjects=subjects)
 
@@ -148,9 +187,7 @@ def add_question():
 def generate():
     """Generate MCQ paper."""
     if request.method == 'GET':
-        all_questions = db.get_all_questions()
-        subjects = sorted(set(q['subject'] for q in all_questions))
-        return render_template('generate.html', subjects=subjects)
+        return render_template('generate.html', subjects=db.get_subjects())
     
     try:
         # Get form data
@@ -160,34 +197,69 @@ def generate():
         num_questions = int(request.form.get('num_questions', 20))
         subject = request.form.get('subject', '')
         
-        # Get questions
-        if subject and subject != 'All':
-            available = db.get_questions_by_subject(subject)
-        else:
-            available = db.get_all_questions()
+        blueprint_text = request.form.get('blueprint', '').strip()
+        balance_exposure = request.form.get('balance_exposure') == 'on'
+        avoid_recent_days = int(request.form.get('avoid_recent_days') or 0)
+        recent = exposure_pool.history.recently_used(avoid_recent_days)
         
-        if len(available) < num_questions:
-            return jsonify({
-                'error': f'Not enough questions. Available: {len(available)}, Requested: {num_questions}'
-            }), 400
+        if blueprint_text:
+            # Assemble from blueprint (questions per chapter, difficulty mix, exclusions)
+            try:
+                blueprint = Blueprint.from_json(blueprint_text)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid blueprint: {e}'}), 400
+            
+            success, selected, diagnostics = PaperAssembler.from_database(db).assemble(blueprint, exclude=recent)
+            if not success:
+                return jsonify({
+                    'error': 'Blueprint cannot be satisfied: ' + '; '.join(diagnostics),
+                    'diagnostics': diagnostics
+                }), 400
+        else:
+            # Count matching questions from the facet index
+            subject_filter = subject if subject and subject != 'All' else None
+            available = db.count_questions(subject=subject_filter)
+            
+            if available < num_questions:
+                return jsonify({
+                    'error': f'Not enough questions. Available: {available}, Requested: {num_questions}'
+                }), 400
+            
+            if balance_exposure or recent:
+                # Favour less-used questions and skip recently used ones
+                try:
+                    selected = exposure_pool.sample(num_questions, subject=subject_filter, exclude=recent)
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+            else:
+                # Select random questions without materializing the bank
+                selected = db.sample_questions(num_questions, subject=subject_filter)
         
-        # Select random questions
-        import random
-        selected = random.sample(available, num_questions)
         selected_dict = {i+1: q for i, q in enumerate(selected)}
         
-        # Generate question paper
-        generator = QuestionPaperGenerator(college_name, exam_name, exam_date, selected_dict)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        question_paper = f"question_paper_{timestamp}.docx"
-        question_path = os.path.join(app.config['OUTPUT_FOLDER'], question_paper)
-        generator.generate(question_path)
+        # Reuse identical papers rendered earlier
+        cache = PaperCache(app.config['OUTPUT_FOLDER'])
+        key = paper_cache_key(college_name, exam_name, exam_date, selected_dict)
+        cached = cache.lookup(key)
+        if cached:
+            question_path, answer_path = cached['question_paper'], cached['answer_key']
+        else:
+            # python-docx is only loaded once a paper is actually rendered
+            from document_generator import QuestionPaperGenerator, AnswerKeyGenerator
+            
+            # Generate question paper
+            generator = QuestionPaperGenerator(college_name, exam_name, exam_date, selected_dict)
+            question_path = cache.render(key, 'question_paper', generator.generate)
+            
+            # Generate answer key
+            answer_gen = AnswerKeyGenerator(college_name, exam_name, exam_date, selected_dict)
+            answer_path = cache.render(key, 'answer_key', answer_gen.generate)
+            cache.prune(keep=[key])
+        question_paper = question_path.name
+        answer_key = answer_path.name
         
-        # Generate answer key
-        answer_gen = AnswerKeyGenerator(college_name, exam_name, exam_date, selected_dict)
-        answer_key = f"answer_key_{timestamp}.docx"
-        answer_path = os.path.join(app.config['OUTPUT_FOLDER'], answer_key)
-        answer_gen.generate(answer_path)
+        # Remember which questions were used so later papers can avoid them
+        exposure_pool.record([q['id'] for q in selected])
         
         return jsonify({
             'success': True,
@@ -199,14 +271,63 @@ def generate():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def output_file(filename):
+    """Resolve a file name inside the output folder, or None if missing."""
+    filepath = safe_join(app.config['OUTPUT_FOLDER'], filename)
+    if filepath and os.path.isfile(filepath):
+        return os.path.abspath(filepath)
+    return None
+
 @app.route('/download/<filename>')
 def download(filename):
-    """Download generated file."""
-    filepath = os.path.join(app.config['OUTPUT_FOLDER'], filename)
-    if os.path.exists(filepath):
-        return send_file(filepath, as_attachment=True)
+    """Download generated file (supports ETag and Range requests)."""
+    filepath = output_file(filename)
+    if filepath:
+        return send_file(filepath, as_attachment=True, conditional=True, etag=True)
     return "File not found", 404
 
+@app.route('/download_batch')
+def download_batch():
+    """Download several generated files as one zip, streamed on the fly.
+    
+    Query: ?file=<name>&file=<name>...[&name=<archive name>]
+    """
+    filenames = request.args.getlist('file')
+    if not filenames:
+        return "No files requested", 400
+    
+    files = []
+    for filename in dict.fromkeys(filenames):
+        filepath = output_file(filename)
+        if not filepath:
+            return f"File not found: {filename}", 404
+        files.append((filepath, os.path.basename(filepath)))
+    
+    archive_name = secure_filename(request.args.get('name', '')) or 'papers.zip'
+    if not archive_name.endswith('.zip'):
+        archive_name += '.zip'
+    return zip_response(request, files, archive_name)
+
+@app.route('/export/<export_format>')
+def export(export_format):
+    """Stream the question bank in an export format (csv, jsonl, gift, qti).
+    
+    Query: ?subject=<subject>&chapter=<chapter> (both optional)
+    """
+    if export_format not in EXPORT_FORMATS:
+        return f"Unknown export format: {export_format}", 404
+    
+    subject = request.args.get('subject') or None
+    chapter = request.args.get('chapter') or None
+    _, extension, mimetype = EXPORT_FORMATS[export_format]
+    name = secure_filename('_'.join(part for part in ('questions', subject, chapter) if part)) + extension
+    
+    return Response(
+        stream_with_context(stream_export(db, export_format, subject, chapter)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{name}"'}
+    )
+
 @app.route('/delete_question/<int:question_id>', methods=['POST'])
 def delete_question(question_id):
     """Delete a question."""
@@ -239,16 +360,18 @@ if __name__ == '__main__':
     import socket
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
+    port = int(os.environ.get('MCQ_PORT', 8080))
     
     print("\n" + "="*60)
     print("MCQ PAPER GENERATOR - WEB APPLICATION")
     print("="*60)
     print(f"\nStarting server...")
-    print(f"\nAccess from this computer: http://localhost:8080")
-    print(f"Access from tablet/phone: http://{local_ip}:8080")
+    print(f"\nAccess from this computer: http://localhost:{port}")
+    print(f"Access from tablet/phone: http://{local_ip}:{port}")
     print(f"\nMake sure your tablet/phone is on the same WiFi network!")
+    print("For many simultaneous users run: python serve.py")
     print("\nPress Ctrl+C to stop the server")
     print("="*60 + "\n")
     
     # Run server accessible from network
-    app.run(host='0.0.0.0', port=8080, debug=False)
+    app.run(host='0.0.0.0', port=port, debug=False)
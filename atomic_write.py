@@ -0,0 +1,90 @@
+"""
+Durable File Writes
+Writes files through a temporary file, fsync and rename, so a crash or
+power cut leaves either the old or the new contents on disk, never a
+half-written file. Optionally keeps rotating backups of the previous
+versions.
+"""
+
+import os
+import json
+import shutil
+from pathlib import Path
+
+
+def backup_paths(path, count):
+    """Backup file names, newest first: name.bak, name.bak.2, ..."""
+    path = Path(path)
+    return [path.with_name(f"{path.name}.bak" + (f".{n}" if n > 1 else '')) for n in range(1, count + 1)]
+
+
+def fsync_directory(directory):
+    """Flush a directory entry so a rename survives a power cut (POSIX only)."""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def rotate_backups(path, count):
+    """Keep the current file as the newest of count backups.
+
+    The current file is hard-linked (copied where links are unsupported)
+    rather than moved, so it stays in place until the new version replaces it.
+    """
+    path = Path(path)
+    if count <= 0 or not path.exists():
+        return
+    backups = backup_paths(path, count)
+    for older, newer in zip(reversed(backups), reversed(backups[:-1])):
+        if newer.exists():
+            os.replace(newer, older)
+    if backups[0].exists():
+        os.remove(backups[0])
+    try:
+        os.link(path, backups[0])
+    except OSError:
+        shutil.copy2(path, backups[0])
+
+
+def atomic_write_bytes(path, data, backups=0):
+    """Durably replace a file's contents.
+
+    Args:
+        path: Target file
+        data: Bytes to write
+        backups: Number of previous versions to keep as name.bak, name.bak.2...
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        rotate_backups(path, backups)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    fsync_directory(path.parent)
+
+
+def atomic_write_json(path, data, indent=None, backups=0):
+    """Durably write data as JSON.
+
+    Args:
+        path: Target file
+        data: JSON-serialisable object
+        indent: Pretty-print indent; None writes compact JSON, which is
+            smaller and faster for large files
+        backups: Number of previous versions to keep
+    """
+    separators = (',', ':') if indent is None else None
+    text = json.dumps(data, indent=indent, separators=separators)
+    atomic_write_bytes(path, text.encode('utf-8'), backups)
+
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Compact Question Bank Snapshots
+Compressed binary snapshot format for question banks, a fraction of the
+size of the indented JSON file and quicker to open: the facet index is
+stored alongside the records, so opening a bank only decodes the index
+and each chunk of records is decompressed the first time it is used.
+QuestionDatabase recognises the format by its magic bytes, so a bank
+file may use either format.
+
+Layout:
+    MAGIC
+    chunk 1 .. chunk n   compressed JSON objects {id: record}, CHUNK_RECORDS each
+    index                compressed JSON: IDs in chunk order, the distinct
+                         (subject, chapter, difficulty) keys and each ID's key
+    footer               JSON: codec, next_id, generation, count, the index
+                         location and the offset/size/count/first_id/last_id
+                         of every chunk
+    footer length (8 bytes, little endian) + MAGIC
+
+Chunks use zstd when the zstandard package is installed and zlib otherwise.
+
+Usage:
+    python bank_snapshot.py export questions_db.json questions_db.mcqz
+    python bank_snapshot.py import questions_db.mcqz questions_db.json
+    python bank_snapshot.py info questions_db.mcqz
+"""
+
+import sys
+import json
+import zlib
+import struct
+import argparse
+import threading
+from pathlib import Path
+from collections.abc import MutableMapping
+
+from atomic_write import atomic_write_bytes, atomic_write_json, backup_paths
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b'MCQSNAP1'
+TRAILER = struct.Struct('<Q8s')
+CHUNK_RECORDS = 256
+COMPACT_SUFFIX = '.mcqz'
+
+
+def _compressor(codec):
+    """Get (compress, decompress) functions for a codec name."""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("Snapshot uses zstd; install the zstandard package to read it")
+        return zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress
+    if codec == 'zlib':
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    raise ValueError(f"Unknown snapshot codec '{codec}'")
+
+
+def default_codec():
+    """Best codec available in this environment."""
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def is_snapshot(path):
+    """Check whether a file is a compact snapshot (by its magic bytes)."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def encode_snapshot(data, codec=None, chunk_records=CHUNK_RECORDS, key_of=None):
+    """Encode a bank to snapshot bytes.
+
+    Args:
+        data: Dictionary with questions {id: record}, next_id and generation
+        codec: 'zlib' or 'zstd' (default: best available)
+        chunk_records: Questions per compressed chunk
+        key_of: Optional {id: (subject, chapter, difficulty)} from an
+            up-to-date BucketIndex; computed from the records if not given
+
+    Returns:
+        Snapshot bytes
+    """
+    codec = codec or default_codec()
+    compress, _ = _compressor(codec)
+    items = sorted(((int(k), v) for k, v in data.get('questions', {}).items()), key=lambda item: item[0])
+    if key_of is None:
+        from database import BucketIndex
+        key_of = {qid: BucketIndex.key_for(record) for qid, record in items}
+
+    parts = [MAGIC]
+    offset = len(MAGIC)
+    chunks = []
+    for start in range(0, len(items), chunk_records):
+        batch = items[start:start + chunk_records]
+        payload = json.dumps({str(k): v for k, v in batch}, separators=(',', ':')).encode('utf-8')
+        blob = compress(payload)
+        chunks.append({
+            'offset': offset, 'size': len(blob), 'count': len(batch),
+            'first_id': batch[0][0], 'last_id': batch[-1][0]
+        })
+        parts.append(blob)
+        offset += len(blob)
+
+    key_numbers = {}
+    for qid, _ in items:
+        key_numbers.setdefault(key_of[qid], len(key_numbers))
+    index = compress(json.dumps({
+        'ids': [qid for qid, _ in items],
+        'keys': list(key_numbers),
+        'key_index': [key_numbers[key_of[qid]] for qid, _ in items],
+    }, separators=(',', ':')).encode('utf-8'))
+    parts.append(index)
+
+    footer = json.dumps({
+        'format': 1,
+        'codec': codec,
+        'next_id': data.get('next_id', 1),
+        'generation': data.get('generation', 0),
+        'count': len(items),
+        'index': {'offset': offset, 'size': len(index)},
+        'chunks': chunks,
+    }, separators=(',', ':')).encode('utf-8')
+    parts.append(footer)
+    parts.append(TRAILER.pack(len(footer), MAGIC))
+    return b''.join(parts)
+
+
+def read_footer(blob):
+    """Parse the footer index of snapshot bytes.
+
+    Raises:
+        ValueError: If the bytes are not a complete snapshot
+    """
+    if not blob.startswith(MAGIC) or len(blob) < len(MAGIC) + TRAILER.size:
+        raise ValueError("Not a question bank snapshot")
+    footer_length, magic = TRAILER.unpack_from(blob, len(blob) - TRAILER.size)
+    if magic != MAGIC or footer_length > len(blob):
+        raise ValueError("Snapshot is truncated")
+    start = len(blob) - TRAILER.size - footer_length
+    return json.loads(blob[start:start + footer_length])
+
+
+def iter_chunks(blob, footer=None):
+    """Yield the {id: record} dictionary of each chunk in ID order."""
+    footer = footer or read_footer(blob)
+    _, decompress = _compressor(footer['codec'])
+    for chunk in footer['chunks']:
+        payload = decompress(blob[chunk['offset']:chunk['offset'] + chunk['size']])
+        yield json.loads(payload)
+
+
+class SnapshotQuestions(MutableMapping):
+    """Question records of a snapshot, {id: record}, decoded on demand.
+
+    Behaves like the questions dictionary of a JSON bank. A chunk is
+    decompressed the first time one of its records is read; iterating
+    decodes everything, in ID order.
+    """
+
+    def __init__(self, blob, footer):
+        self._blob = blob
+        self._footer = footer
+        self._decompress = _compressor(footer['codec'])[1]
+        self._records = {}
+        self._chunk_of = {}
+        self._lock = threading.Lock()
+
+        offset = footer['index']['offset']
+        index = json.loads(self._decompress(blob[offset:offset + footer['index']['size']]))
+        self._ids = index['ids']
+        keys = [tuple(key) for key in index['keys']]
+        self._keys = [keys[number] for number in index['key_index']]
+        if len(self._ids) != footer['count']:
+            raise ValueError("Snapshot index is incomplete")
+
+        start = 0
+        for number, chunk in enumerate(footer['chunks']):
+            for qid in self._ids[start:start + chunk['count']]:
+                self._chunk_of[qid] = number
+            start += chunk['count']
+
+    def facet_keys(self):
+        """(id, (subject, chapter, difficulty)) pairs as stored in the snapshot."""
+        return zip(self._ids, self._keys)
+
+    def _load_chunk(self, number):
+        with self._lock:
+            chunk = self._footer['chunks'][number]
+            payload = self._decompress(self._blob[chunk['offset']:chunk['offset'] + chunk['size']])
+            for key, record in json.loads(payload).items():
+                qid = int(key)
+                # Skip records replaced or deleted since the snapshot was opened
+                if self._chunk_of.get(qid) == number:
+                    del self._chunk_of[qid]
+                    record.setdefault('id', qid)
+                    self._records[qid] = record
+
+    def load_all(self):
+        """Decode every remaining chunk, keeping the records in ID order."""
+        if self._chunk_of:
+            for number in sorted(set(self._chunk_of.values())):
+                self._load_chunk(number)
+            self._records = dict(sorted(self._records.items()))
+            self._blob = None
+
+    def __getitem__(self, question_id):
+        try:
+            return self._records[question_id]
+        except KeyError:
+            number = self._chunk_of.get(question_id)
+            if number is None:
+                raise
+        self._load_chunk(number)
+        return self._records[question_id]
+
+    def __setitem__(self, question_id, record):
+        self._chunk_of.pop(question_id, None)
+        self._records[question_id] = record
+
+    def __delitem__(self, question_id):
+        if self._chunk_of.pop(question_id, None) is None:
+            del self._records[question_id]
+
+    def __contains__(self, question_id):
+        return question_id in self._records or question_id in self._chunk_of
+
+    def __len__(self):
+        return len(self._records) + len(self._chunk_of)
+
+    def __iter__(self):
+        self.load_all()
+        return iter(self._records)
+
+
+def decode_snapshot(blob, lazy=False):
+    """Decode snapshot bytes to the same dictionary a JSON bank file holds.
+
+    Args:
+        blob: Snapshot bytes
+        lazy: Return questions as a SnapshotQuestions mapping keyed by int
+            ID instead of decoding every record up front
+    """
+    footer = read_footer(blob)
+    if lazy:
+        questions = SnapshotQuestions(blob, footer)
+    else:
+        questions = {}
+        for chunk in iter_chunks(blob, footer):
+            questions.update(chunk)
+        if len(questions) != footer['count']:
+            raise ValueError("Snapshot is incomplete")
+    return {'questions': questions, 'next_id': footer['next_id'], 'generation': footer['generation']}
+
+
+def write_snapshot(path, data, codec=None, backups=0, key_of=None):
+    """Durably write a bank as a compact snapshot."""
+    atomic_write_bytes(path, encode_snapshot(data, codec, key_of=key_of), backups)
+
+
+def read_bank(path, backups=0, lazy=False):
+    """Read a bank file in either format, falling back to its backups.
+
+    Args:
+        path: Bank file (JSON or compact snapshot)
+        backups: Number of backups to try after the file itself
+        lazy: Decode compact snapshot records on demand (see decode_snapshot)
+
+    Returns:
+        Tuple (data, path_read, compact) where compact tells whether the
+        copy read was a compact snapshot
+
+    Raises:
+        FileNotFoundError: If neither the file nor any backup exists
+        ValueError: If every existing candidate is corrupt
+    """
+    errors = []
+    for candidate in [Path(path)] + backup_paths(path, backups):
+        try:
+            blob = candidate.read_bytes()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            errors.append(f"{candidate}: {e}")
+            continue
+        try:
+            if blob.startswith(MAGIC):
+                return decode_snapshot(blob, lazy), candidate, True
+            return json.loads(blob), candidate, False
+        except (ValueError, KeyError, zlib.error) as e:
+            errors.append(f"{candidate}: {e}")
+    if not errors:
+        raise FileNotFoundError(f"{path} not found")
+    raise ValueError("No readable copy: " + "; ".join(errors))
+
+
+def main():
+    """Command-line entry point for converting bank files."""
+    parser = argparse.ArgumentParser(description="Convert question banks to and from compact snapshots")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="Write a compact snapshot of a bank file")
+    export.add_argument('source', help="Bank file (JSON or snapshot)")
+    export.add_argument('target', help="Snapshot file to write")
+    export.add_argument('--codec', choices=['zlib', 'zstd'], default=None, help="Compression (default: best available)")
+
+    restore = commands.add_parser('import', help="Write a JSON bank file from a snapshot")
+    restore.add_argument('source', help="Snapshot file")
+    restore.add_argument('target', help="JSON bank file to write")
+    restore.add_argument('--indent', type=int, default=None, help="Pretty-print the JSON")
+
+    info = commands.add_parser('info', help="Show what a bank file contains")
+    info.add_argument('source', help="Bank file (JSON or snapshot)")
+
+    args = parser.parse_args()
+    try:
+        data, _, compact = read_bank(args.source)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.command == 'export':
+        write_snapshot(args.target, data, args.codec)
+    elif args.command == 'import':
+        atomic_write_json(args.target, data, indent=args.indent)
+
+    source_size = Path(args.source).stat().st_size
+    print(f"{args.source}: {'compact snapshot' if compact else 'JSON'}, "
+          f"{len(data.get('questions', {}))} questions, {source_size / 1024:.1f} KB")
+    if args.command != 'info':
+        target_size = Path(args.target).stat().st_size
+        print(f"Wrote {args.target}: {target_size / 1024:.1f} KB "
+              f"({target_size / source_size * 100:.0f}% of source)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Answer Key Table Benchmark
+Compares building the answer key grid cell by cell through python-docx
+with the one-pass XML builder in document_generator.add_grid_table.
+
+Usage:
+    python benchmarks/answer_key_table.py [--sizes 100 1000 10000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from document_generator import add_grid_table
+
+
+def make_cells(count):
+    """Build answer key cell texts for count questions."""
+    return [f"Q{i}: {'ABCD'[i % 4]}" for i in range(1, count + 1)]
+
+
+def per_cell_table(doc, cells, num_cols=10):
+    """The previous implementation: one table.cell() lookup per answer."""
+    num_rows = (len(cells) + num_cols - 1) // num_cols + 1
+    table = doc.add_table(rows=num_rows, cols=num_cols)
+    table.style = 'Light Grid Accent 1'
+    for i in range(num_cols):
+        table.cell(0, i).text = ""
+    for idx, text in enumerate(cells):
+        cell = table.cell((idx // num_cols) + 1, idx % num_cols)
+        cell.text = text
+        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+        cell.paragraphs[0].runs[0].font.size = Pt(10)
+        cell.paragraphs[0].runs[0].font.bold = True
+    return table
+
+
+def one_pass_table(doc, cells, num_cols=10):
+    """The one-pass XML builder."""
+    return add_grid_table(doc, cells, num_cols, "Question : Answer", style='Light Grid Accent 1')
+
+
+def time_builder(builder, cells, repeat):
+    """Best wall-clock time of building the table into a fresh document."""
+    best = float('inf')
+    for _ in range(repeat):
+        doc = Document()
+        start = time.perf_counter()
+        builder(doc, cells)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark answer key table rendering")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="Question counts")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size (best is reported)")
+    parser.add_argument('--skip-per-cell-above', type=int, default=1000,
+                        help="Skip the per-cell builder above this size (it is quadratic)")
+    args = parser.parse_args()
+
+    print(f"{'Questions':>10} {'Per-cell (s)':>14} {'One-pass (s)':>14} {'Speedup':>9}")
+    for size in args.sizes:
+        cells = make_cells(size)
+        fast = time_builder(one_pass_table, cells, args.repeat)
+        if size <= args.skip_per_cell_above:
+            slow = time_builder(per_cell_table, cells, args.repeat)
+            print(f"{size:>10} {slow:>14.3f} {fast:>14.3f} {slow / fast:>8.1f}x")
+        else:
+            print(f"{size:>10} {'skipped':>14} {fast:>14.3f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
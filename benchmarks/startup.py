@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Startup Time Benchmark
+Measures how long each entry point takes to become usable: Python import
+time of its module, time until the first window is shown (desktop and
+Kivy apps), the first HTTP response is served (web app) or the menu is
+waiting for input (console app), and the peak resident memory of the
+process. Frozen PyInstaller builds can be measured too.
+
+Results are appended to a history file and compared with the previous
+run; the script exits with status 1 when a budget is exceeded.
+
+Windows report readiness by writing the time to the file named in the
+MCQ_STARTUP_PROBE environment variable and quitting (see gui.main and
+MCQMobileApp.on_start), so frozen builds need no console.
+
+Usage:
+    python benchmarks/startup.py [--entries gui app_web main] [--repeat 3]
+    python benchmarks/startup.py --frozen dist/MCQ_Paper_Generator --offscreen
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import argparse
+import platform
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# kind: 'window' (waits for the probe file), 'http' (waits for a response)
+# or 'exit' (runs until the process exits, with stdin fed in)
+ENTRY_POINTS = {
+    'app': {'argv': ['app.py'], 'module': 'app', 'kind': 'window'},
+    'gui': {'argv': ['gui.py'], 'module': 'gui', 'kind': 'window'},
+    'app_web': {'argv': ['app_web.py'], 'module': 'app_web', 'kind': 'http'},
+    'main': {'argv': ['main.py'], 'module': 'main', 'kind': 'exit', 'stdin': '3\n'},
+    'kivy': {'argv': ['main.py'], 'cwd': 'mobile_kivy', 'module': 'main', 'kind': 'window'},
+}
+
+# Limits per entry: import_s and ready_s in seconds, rss_mb in MB.
+# Frozen builds are checked against the 'frozen' entry.
+BUDGETS = {
+    'app': {'import_s': 0.5, 'ready_s': 2.0, 'rss_mb': 150},
+    'gui': {'import_s': 0.5, 'ready_s': 2.0, 'rss_mb': 150},
+    'app_web': {'import_s': 1.0, 'ready_s': 3.0, 'rss_mb': 150},
+    'main': {'import_s': 1.0, 'ready_s': 2.0, 'rss_mb': 150},
+    'kivy': {'import_s': 2.0, 'ready_s': 5.0, 'rss_mb': 250},
+    'frozen': {'ready_s': 5.0, 'rss_mb': 300},
+}
+
+DEFAULT_HISTORY = ROOT / 'benchmarks' / 'startup_history.jsonl'
+
+
+def free_port():
+    """Get a free local TCP port for the web app."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_exited(proc):
+    """Check whether a process has exited without reaping it, so that
+    wait_process can still collect its resource usage.
+
+    macOS has no waitid: there a non-blocking wait4 reaps the process
+    and its resource usage is kept on proc.rusage for wait_process.
+    """
+    if hasattr(os, 'waitid'):
+        return os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+    if hasattr(os, 'wait4'):
+        if proc.returncode is not None:
+            return True
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid == 0:
+            return False
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        proc.rusage = usage
+        return True
+    return proc.poll() is not None
+
+
+def wait_process(proc):
+    """Wait for a process to exit.
+
+    Returns:
+        Tuple (exit_code, peak_rss_mb); peak RSS is None where os.wait4 is
+        unavailable (Windows)
+    """
+    if not hasattr(os, 'wait4'):
+        return proc.wait(), None
+    usage = getattr(proc, 'rusage', None)
+    if usage is None:
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return proc.returncode, usage.ru_maxrss / scale
+
+
+def measure_import(entry):
+    """Seconds to import the entry's module in a fresh interpreter."""
+    code = ("import time; start = time.perf_counter(); "
+            f"import {entry['module']}; print(time.perf_counter() - start)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT / entry.get('cwd', '.'),
+                            capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(command, entry, timeout, env):
+    """Start an entry point and time it until it is usable.
+
+    Args:
+        command: Command line to run
+        entry: Entry point definition (kind, cwd, stdin)
+        timeout: Seconds to wait before giving up
+        env: Environment for the process
+
+    Returns:
+        Tuple (ready_seconds, peak_rss_mb)
+    """
+    env = dict(env)
+    cwd = ROOT / entry.get('cwd', '.')
+    kind = entry['kind']
+    probe_file = Path(tempfile.gettempdir()) / f"mcq_startup_probe_{os.getpid()}"
+    probe_file.unlink(missing_ok=True)
+    if kind == 'window':
+        env['MCQ_STARTUP_PROBE'] = str(probe_file)
+    elif kind == 'http':
+        env['MCQ_PORT'] = str(free_port())
+
+    start_wall = time.time()
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ready = None
+    try:
+        if kind == 'exit':
+            proc.stdin.write(entry.get('stdin', '').encode())
+            proc.stdin.close()
+        elif kind == 'http':
+            url = f"http://127.0.0.1:{env['MCQ_PORT']}/"
+            while ready is None and not process_exited(proc) and time.perf_counter() - start < timeout:
+                try:
+                    urllib.request.urlopen(url, timeout=1).close()
+                    ready = time.perf_counter() - start
+                except urllib.error.HTTPError:
+                    ready = time.perf_counter() - start
+                except OSError:
+                    time.sleep(0.02)
+            proc.terminate()
+
+        deadline = time.perf_counter() + timeout
+        while not process_exited(proc) and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        if not process_exited(proc):
+            proc.kill()
+            raise RuntimeError(f"not ready after {timeout}s")
+        exit_code, rss_mb = wait_process(proc)
+    except BaseException:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        raise
+
+    if kind == 'exit':
+        if exit_code != 0:
+            raise RuntimeError(f"exited with status {exit_code}")
+        ready = time.perf_counter() - start
+    elif kind == 'window':
+        if not probe_file.exists():
+            raise RuntimeError(f"no window shown (exit status {exit_code})")
+        ready = float(probe_file.read_text()) - start_wall
+        probe_file.unlink()
+    elif ready is None:
+        raise RuntimeError(f"no HTTP response (exit status {exit_code})")
+    return ready, rss_mb
+
+
+def run_benchmark(name, command, entry, mode, repeat, timeout, env):
+    """Measure one entry point repeat times and summarize with medians.
+
+    Returns:
+        Result dictionary for the history file
+    """
+    result = {'entry': name, 'mode': mode, 'import_s': None, 'ready_s': None, 'rss_mb': None, 'error': None}
+    try:
+        if mode == 'source':
+            result['import_s'] = statistics.median(measure_import(entry) for _ in range(repeat))
+        runs = [measure_ready(command, entry, timeout, env) for _ in range(repeat)]
+        result['ready_s'] = statistics.median(ready for ready, _ in runs)
+        if runs[0][1] is not None:
+            result['rss_mb'] = max(rss for _, rss in runs)
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        result['error'] = str(e)
+    return result
+
+
+def check_budget(result, budgets):
+    """List the budgets a result exceeds."""
+    budget = budgets.get('frozen' if result['mode'] == 'frozen' else result['entry'], {})
+    return [f"{metric} {result[metric]:.2f} > {limit}" for metric, limit in budget.items()
+            if result.get(metric) is not None and result[metric] > limit]
+
+
+def load_history(path):
+    """Read all previous results, oldest first."""
+    if not Path(path).exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def git_revision():
+    """Short commit hash of the tree being measured, if available."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def format_value(value, unit):
+    """Format a measurement for the results table."""
+    if value is None:
+        return '-'
+    return f"{value:.3f}s" if unit == 's' else f"{value:.0f}{unit}"
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark startup time of every entry point")
+    parser.add_argument('--entries', nargs='+', choices=sorted(ENTRY_POINTS), default=None,
+                        help="Source entry points to measure (default: all, or none with --frozen)")
+    parser.add_argument('--frozen', nargs='*', default=[], metavar='EXECUTABLE',
+                        help="PyInstaller builds of the desktop app to measure")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per entry point (medians are reported)")
+    parser.add_argument('--timeout', type=float, default=60, help="Seconds to wait for an entry point")
+    parser.add_argument('--offscreen', action='store_true', help="Render Qt windows offscreen (headless machines)")
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY), help="History file (JSON lines)")
+    parser.add_argument('--budgets', default=None, help="JSON file overriding the built-in budgets")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    if args.budgets:
+        with open(args.budgets, 'r', encoding='utf-8') as f:
+            budgets.update(json.load(f))
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+
+    entries = args.entries if args.entries is not None else ([] if args.frozen else sorted(ENTRY_POINTS))
+    jobs = [(name, [sys.executable] + ENTRY_POINTS[name]['argv'], ENTRY_POINTS[name], 'source')
+            for name in entries]
+    jobs += [(Path(path).name, [str(Path(path).resolve())], {'kind': 'window'}, 'frozen')
+             for path in args.frozen]
+
+    previous = {}
+    for record in load_history(args.history):
+        previous[(record['entry'], record['mode'])] = record
+
+    stamp = {'time': datetime.now().isoformat(timespec='seconds'), 'revision': git_revision(),
+             'python': platform.python_version(), 'platform': platform.platform()}
+
+    print(f"{'Entry':<24} {'Mode':<7} {'Import':>8} {'Ready':>8} {'Peak RSS':>9} {'vs last':>9}  Status")
+    failures = 0
+    with open(args.history, 'a', encoding='utf-8') as history:
+        for name, command, entry, mode in jobs:
+            result = run_benchmark(name, command, entry, mode, args.repeat, args.timeout, env)
+            last = previous.get((name, mode))
+            change = '-'
+            if last and last.get('ready_s') and result['ready_s']:
+                change = f"{(result['ready_s'] / last['ready_s'] - 1) * 100:+.0f}%"
+
+            if result['error'] and result['error'].startswith('ModuleNotFoundError'):
+                # e.g. Kivy on a desktop machine; not a startup regression
+                status = f"SKIPPED: {result['error']}"
+            elif result['error']:
+                failures += 1
+                status = f"ERROR: {result['error']}"
+            else:
+                exceeded = check_budget(result, budgets)
+                failures += bool(exceeded)
+                status = "OVER BUDGET: " + ", ".join(exceeded) if exceeded else "OK"
+            print(f"{name:<24} {mode:<7} {format_value(result['import_s'], 's'):>8} "
+                  f"{format_value(result['ready_s'], 's'):>8} {format_value(result['rss_mb'], ' MB'):>9} "
+                  f"{change:>9}  {status}")
+
+            history.write(json.dumps(dict(stamp, **result)) + '\n')
+
+    print(f"\nResults appended to {args.history}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
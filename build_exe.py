@@ -2,14 +2,77 @@
 """
 Build script to create executable for MCQ Paper Generator
 Supports Windows (.exe), macOS (.app), and Linux (binary)
+
+Build profiles:
+    full  One file with every library the old build listed (slowest launch)
+    lean  One file without unused Qt modules and libraries, no UPX
+    fast  The lean build as a folder: nothing is unpacked on launch
+
+Usage:
+    python build_exe.py [--profiles lean fast] [--import-report]
 """
 
 import os
 import sys
 import shutil
+import argparse
+import tempfile
 import subprocess
 from pathlib import Path
 
+# Entry modules whose import time is reported before building
+STARTUP_MODULES = ['gui', 'app_web']
+# Cold start budget for Python imports (seconds)
+IMPORT_BUDGET = 1.0
+
+# Modules the desktop app never imports, which PyInstaller hooks would
+# otherwise bundle. The app only uses QtCore, QtGui and QtWidgets.
+LEAN_EXCLUDES = [
+    'PyQt5.QtWebEngine', 'PyQt5.QtWebEngineCore', 'PyQt5.QtWebEngineWidgets',
+    'PyQt5.QtWebKit', 'PyQt5.QtWebKitWidgets', 'PyQt5.QtWebChannel', 'PyQt5.QtWebSockets',
+    'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtQuickWidgets', 'PyQt5.QtQuick3D',
+    'PyQt5.QtMultimedia', 'PyQt5.QtMultimediaWidgets', 'PyQt5.QtNetwork', 'PyQt5.QtNfc',
+    'PyQt5.QtBluetooth', 'PyQt5.QtPositioning', 'PyQt5.QtLocation', 'PyQt5.QtSensors',
+    'PyQt5.QtSerialPort', 'PyQt5.QtSql', 'PyQt5.QtTest', 'PyQt5.QtXml', 'PyQt5.QtXmlPatterns',
+    'PyQt5.QtDesigner', 'PyQt5.QtHelp', 'PyQt5.QtOpenGL', 'PyQt5.QtSvg', 'PyQt5.QtDBus',
+    'PyQt5.QtRemoteObjects', 'PyQt5.QtTextToSpeech', 'PyQt5.Qt3DCore', 'PyQt5.Qt3DRender',
+    'PyQt5.QtPrintSupport', 'PyQt5.QtChart', 'PyQt5.QtDataVisualization',
+    # Web server, mobile app and libraries the desktop app does not use
+    'flask', 'werkzeug', 'jinja2', 'gunicorn', 'waitress', 'kivy',
+    'reportlab', 'fitz', 'pymupdf', 'numpy', 'pandas', 'scipy', 'matplotlib',
+    'tkinter', 'IPython', 'pytest', 'unittest', 'pydoc', 'setuptools', 'pip',
+]
+
+# Libraries the app imports lazily (on first PDF load or paper generation),
+# so a launch check alone would not notice them missing from a build.
+# pdfminer.pdfdocument needs cryptography to open any PDF.
+SMOKE_IMPORTS = ['pdfplumber', 'pdfminer.pdfdocument', 'docx', 'document_generator', 'pdf_extractor']
+
+PROFILES = {
+    'full': {
+        'name': 'MCQ_Paper_Generator',
+        'onefile': True,
+        'upx': True,
+        'hidden_imports': ['PyQt5', 'reportlab', 'docx', 'pymupdf', 'pdfplumber', 'PIL'],
+        'excludes': [],
+    },
+    'lean': {
+        'name': 'MCQ_Paper_Generator_lean',
+        'onefile': True,
+        # UPX-packed libraries are decompressed again on every launch
+        'upx': False,
+        'hidden_imports': [],
+        'excludes': LEAN_EXCLUDES,
+    },
+    'fast': {
+        'name': 'MCQ_Paper_Generator_fast',
+        'onefile': False,
+        'upx': False,
+        'hidden_imports': [],
+        'excludes': LEAN_EXCLUDES,
+    },
+}
+
 def clean_build():
     """Clean previous build files."""
     print("Cleaning previous builds...")
@@ -18,73 +81,223 @@ def clean_build():
         if os.path.exists(d):
             shutil.rmtree(d)
             print(f"  Removed {d}/")
+
+def import_time_report(modules=STARTUP_MODULES, top=10):
+    """Report where startup import time goes, using python -X importtime.
+    
+    Each module is imported in a fresh interpreter so nothing is cached.
+    
+    Args:
+        modules: Module names to import
+        top: Number of slowest imports to list per module
+        
+    Returns:
+        Dictionary {module: total import seconds} (None if the import failed)
+    """
+    print("\n" + "="*60)
+    print("Startup Import Time")
+    print("="*60)
+    
+    totals = {}
+    for module in modules:
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'unknown error'
+            print(f"\n{module}: import failed ({error})")
+            totals[module] = None
+            continue
+        
+        # Lines look like "import time: self [us] | cumulative | imported package"
+        rows = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        
+        # Imports are listed children first, so the module's own imports
+        # are the rows between the previous top-level row and the module
+        end = next(i for i, row in enumerate(rows) if row[2].strip() == module)
+        start = end
+        while start > 0 and rows[start - 1][2].startswith('  '):
+            start -= 1
+        total = rows[end][1] / 1e6
+        totals[module] = total
+        status = "OK" if total <= IMPORT_BUDGET else f"OVER BUDGET ({IMPORT_BUDGET:.1f}s)"
+        print(f"\n{module}: {total:.3f}s  {status}")
+        # Direct imports of the module (one indent level below it) by cumulative time
+        packages = [row for row in rows[start:end] if not row[2].startswith('     ')]
+        for _, cumulative, name in sorted(packages, reverse=True, key=lambda row: row[1])[:top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name.strip()}")
+    
+    return totals
+
+def executable_path(profile):
+    """Path of the executable a profile builds."""
+    name = PROFILES[profile]['name']
+    file_name = name + ('.exe' if sys.platform == 'win32' else '')
+    if PROFILES[profile]['onefile']:
+        return Path('dist') / file_name
+    return Path('dist') / name / file_name
+
+def bundle_size(path):
+    """Size in bytes of a one-file executable or a one-dir bundle folder."""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+def launch_time(executable, repeat=3):
+    """Median seconds until the built app shows its window.
+    
+    Uses the startup probe of benchmarks/startup.py.
+    
+    Returns:
+        Tuple (seconds, peak_rss_mb), or (None, None) if it did not start
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parent / 'benchmarks'))
+    from startup import measure_ready
+    
+    env = dict(os.environ)
+    if sys.platform.startswith('linux') and not env.get('DISPLAY'):
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    try:
+        runs = [measure_ready([str(Path(executable).resolve())], {'kind': 'window'}, 60, env)
+                for _ in range(repeat)]
+    except (OSError, RuntimeError) as e:
+        print(f"  Launch failed: {e}")
+        return None, None
+    times = sorted(ready for ready, _ in runs)
+    return times[len(times) // 2], runs[0][1]
+
+def smoke_test(executable, modules=SMOKE_IMPORTS, timeout=120):
+    """Import the lazily loaded libraries inside a built executable.
     
-    # Remove spec files
-    for spec in Path('.').glob('*.spec'):
-        spec.unlink()
-        print(f"  Removed {spec}")
+    The app writes one result line per module to the file named in
+    MCQ_SMOKE_RESULT and exits (see app.py), so this works for windowed
+    builds without a console.
+    
+    Returns:
+        True if every module imported
+    """
+    result_file = Path(tempfile.gettempdir()) / f"mcq_smoke_{os.getpid()}.txt"
+    result_file.unlink(missing_ok=True)
+    env = dict(os.environ, MCQ_SMOKE_IMPORTS=','.join(modules), MCQ_SMOKE_RESULT=str(result_file))
+    try:
+        subprocess.run([str(Path(executable).resolve())], env=env, timeout=timeout,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"  Smoke test could not run: {e}")
+        return False
+    if not result_file.exists():
+        print("  Smoke test failed: no result written")
+        return False
+    lines = result_file.read_text(encoding='utf-8').splitlines()
+    result_file.unlink()
+    failed = [line for line in lines if not line.endswith(': ok')]
+    for line in failed:
+        print(f"  ✗ {line}")
+    if len(lines) != len(modules):
+        print("  Smoke test failed: incomplete result")
+        return False
+    return not failed
 
-def create_executable():
-    """Create executable using PyInstaller."""
+def create_executable(profile='lean'):
+    """Create executable using PyInstaller.
+    
+    Args:
+        profile: Name of a build profile in PROFILES
+        
+    Returns:
+        True if the build succeeded
+    """
+    options = PROFILES[profile]
     print("\n" + "="*60)
-    print("Building MCQ Paper Generator Executable")
+    print(f"Building MCQ Paper Generator Executable ({profile})")
     print("="*60 + "\n")
     
-    # PyInstaller command
+    # PyInstaller command; the spec file is written under build/ so the
+    # checked-in MCQ_Paper_Generator.spec is left alone
     cmd = [
         sys.executable,
         '-m', 'PyInstaller',
-        '--name=MCQ_Paper_Generator',
-        '--onefile',
+        f"--name={options['name']}",
+        '--onefile' if options['onefile'] else '--onedir',
         '--noconsole',
-        '--add-data=license.json:.',
-        '--hidden-import=PyQt5',
-        '--hidden-import=reportlab',
-        '--hidden-import=docx',
-        '--hidden-import=pymupdf',
-        '--hidden-import=pdfplumber',
-        '--hidden-import=PIL',
-        'app.py'
+        '--noconfirm',
+        '--specpath=build',
+        f"--add-data={Path('license.json').resolve()}{os.pathsep}.",
     ]
+    if not options['upx']:
+        cmd.append('--noupx')
+    cmd += [f'--hidden-import={module}' for module in options['hidden_imports']]
+    cmd += [f'--exclude-module={module}' for module in options['excludes']]
+    cmd.append('app.py')
     
     print("Running PyInstaller...")
     print(f"Command: {' '.join(cmd)}\n")
     
     result = subprocess.run(cmd, capture_output=False)
+    exe_path = executable_path(profile)
     
-    if result.returncode == 0:
+    smoke_ok = False
+    if result.returncode == 0 and exe_path.exists():
+        # Check the build can load what it imports lazily before publishing it
+        print("\nSmoke test: importing " + ", ".join(SMOKE_IMPORTS))
+        smoke_ok = smoke_test(exe_path)
+    
+    if smoke_ok:
         print("\n" + "="*60)
         print("BUILD SUCCESSFUL!")
         print("="*60)
-        
-        # Find the executable
-        dist_dir = Path('dist')
-        if dist_dir.exists():
-            exe_files = list(dist_dir.glob('MCQ_Paper_Generator*'))
-            if exe_files:
-                exe_path = exe_files[0]
-                size_mb = exe_path.stat().st_size / (1024 * 1024)
-                
-                print(f"\nExecutable created: {exe_path}")
-                print(f"File size: {size_mb:.1f} MB")
-                print(f"\nLocation: {exe_path.absolute()}")
-                print("\nYou can now distribute this file!")
-                print("Users just need to:")
-                print("  1. Copy the executable to their computer")
-                print("  2. Double-click to run")
-                print("  3. No Python installation required!")
-                
-                return True
+        print(f"\nExecutable created: {exe_path}")
+        print(f"Location: {exe_path.absolute()}")
+        return True
     else:
         print("\n" + "="*60)
         print("BUILD FAILED!")
         print("="*60)
         return False
 
+def profile_report(profiles, repeat=3):
+    """Print bundle size and launch time of each built profile."""
+    print("\n" + "="*60)
+    print("Build Profiles")
+    print("="*60)
+    print(f"{'Profile':<8} {'Layout':<8} {'Size':>10} {'Launch':>9} {'Peak RSS':>9}")
+    for profile in profiles:
+        exe_path = executable_path(profile)
+        if not exe_path.exists():
+            print(f"{profile:<8} not built")
+            continue
+        bundle = exe_path if PROFILES[profile]['onefile'] else exe_path.parent
+        size_mb = bundle_size(bundle) / (1024 * 1024)
+        seconds, rss_mb = launch_time(exe_path, repeat)
+        layout = 'onefile' if PROFILES[profile]['onefile'] else 'onedir'
+        launch = f"{seconds:.2f}s" if seconds is not None else '-'
+        rss = f"{rss_mb:.0f} MB" if rss_mb is not None else '-'
+        print(f"{profile:<8} {layout:<8} {size_mb:>7.1f} MB {launch:>9} {rss:>9}")
+
 def main():
     """Main build process."""
+    parser = argparse.ArgumentParser(description="Build the MCQ Paper Generator executable")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Only report startup import time, do not build")
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=['lean', 'fast'],
+                        help="Build profiles to create (default: lean fast)")
+    parser.add_argument('--repeat', type=int, default=3, help="Launches per profile for the launch time")
+    args = parser.parse_args()
+    
     print("MCQ Paper Generator - Executable Builder\n")
     
+    # Heavy libraries imported at startup slow every launch of the build
+    import_time_report()
+    if args.import_report:
+        return
+    
     # Check if license exists
     if not os.path.exists('license.json'):
         print("WARNING: license.json not found!")
@@ -93,8 +306,11 @@ def main():
     # Clean previous builds
     clean_build()
     
-    # Create executable
-    success = create_executable()
+    # Create executables
+    built = [profile for profile in args.profiles if create_executable(profile)]
+    success = len(built) == len(args.profiles)
+    if built:
+        profile_report(built, args.repeat)
     
     if success:
         print("\n" + "="*60)
@@ -104,7 +320,8 @@ def main():
         print("   - Navigate to the 'dist' folder")
         print("   - Run the MCQ_Paper_Generator executable")
         print("\n2. Distribution:")
-        print("   - Share the file from the 'dist' folder")
+        print("   - Share the file from the 'dist' folder (one-file profiles)")
+        print("   - or zip the whole dist/MCQ_Paper_Generator_fast folder (fast profile)")
         print("   - Include license.json if needed")
         print("   - No other files required!")
         print("\n" + "="*60)
@@ -1,87 +1,558 @@
 # Database of MCQ Questions
 # Each question contains: id, question text, options (A, B, C, D), correct answer, explanation/solution
 
+import os
 import json
+import random
+import threading
 from pathlib import Path
 
+from file_lock import FileLock
+from atomic_write import atomic_write_bytes, atomic_write_json
+from bank_snapshot import read_bank, write_snapshot, SnapshotQuestions, COMPACT_SUFFIX
+
+
+OPTION_KEYS = ('A', 'B', 'C', 'D')
+
+
+def normalize_options(options, correct_answer):
+    """Convert either question shape to lettered options and a letter answer.
+    
+    Bank records use {'A': text, ..., 'D': text} with a letter answer; the
+    web form and the mobile app use a list of texts with a 0-based index.
+    
+    Args:
+        options: Dictionary keyed A-D or list of option texts
+        correct_answer: Letter, 0-based index or index string
+        
+    Returns:
+        Tuple (options_dict, answer_letter); the letter is '' if the
+        answer does not name one of the four options
+    """
+    if isinstance(options, dict):
+        normalized = {key: str(options.get(key, '') or '') for key in OPTION_KEYS}
+    else:
+        options = list(options or [])
+        normalized = {key: str(options[i]) if i < len(options) else '' for i, key in enumerate(OPTION_KEYS)}
+    
+    answer = str(correct_answer if correct_answer is not None else '').strip().upper()
+    if answer.isdigit():
+        index = int(answer)
+        answer = OPTION_KEYS[index] if index < len(OPTION_KEYS) else ''
+    elif answer not in OPTION_KEYS:
+        answer = ''
+    return normalized, answer
+
+
+class BucketIndex:
+    """Question ID arrays per facet, kept up to date as questions change.
+    
+    IDs are held in plain lists: one for the whole bank, one per
+    (subject, chapter, difficulty) bucket and one per single facet value.
+    Each question remembers its position in every list it belongs to, so
+    removal is a swap with the last element and every mutation is O(1).
+    """
+    
+    FACETS = ('subject', 'chapter', 'difficulty')
+    DEFAULT_KEY = ('General', 'Chapter 1', 'Medium')
+    
+    def __init__(self, questions=None):
+        """
+        Build the index.
+        
+        Args:
+            questions: Dictionary of questions {id: question_data}
+        """
+        self.all_ids = []
+        self.buckets = {}
+        self.facets = {}
+        self.key_of = {}
+        self._positions = {}
+        if questions:
+            self._fill((qid, self.key_for(q)) for qid, q in questions.items())
+    
+    @classmethod
+    def from_keys(cls, keyed_ids):
+        """Build an index from (question_id, bucket_key) pairs."""
+        index = cls()
+        index._fill(keyed_ids)
+        return index
+    
+    def _fill(self, keyed_ids):
+        """Add (question_id, bucket_key) pairs to an empty index in one pass."""
+        arrays_for = {}
+        for question_id, key in keyed_ids:
+            arrays = arrays_for.get(key)
+            if arrays is None:
+                arrays = arrays_for[key] = self._arrays(key)
+            self._positions[question_id] = [len(array) for array in arrays]
+            for array in arrays:
+                array.append(question_id)
+            self.key_of[question_id] = key
+    
+    @staticmethod
+    def key_for(question):
+        """Get the (subject, chapter, difficulty) bucket key for a question."""
+        return (
+            question.get('subject', BucketIndex.DEFAULT_KEY[0]),
+            question.get('chapter', BucketIndex.DEFAULT_KEY[1]),
+            question.get('difficulty', BucketIndex.DEFAULT_KEY[2])
+        )
+    
+    def _arrays(self, key):
+        """ID lists a question with this bucket key belongs to, in slot order."""
+        arrays = [self.all_ids, self.buckets.setdefault(key, [])]
+        for facet, value in zip(self.FACETS, key):
+            arrays.append(self.facets.setdefault((facet, value), []))
+        return arrays
+    
+    def add(self, question_id, question):
+        """Add a question, moving it if it is already indexed."""
+        key = self.key_for(question)
+        if self.key_of.get(question_id) == key:
+            return
+        self.remove(question_id)
+        
+        positions = []
+        for array in self._arrays(key):
+            positions.append(len(array))
+            array.append(question_id)
+        self.key_of[question_id] = key
+        self._positions[question_id] = positions
+    
+    def remove(self, question_id):
+        """Remove a question from every list it belongs to."""
+        key = self.key_of.pop(question_id, None)
+        if key is None:
+            return False
+        
+        positions = self._positions.pop(question_id)
+        for slot, (array, position) in enumerate(zip(self._arrays(key), positions)):
+            last = array.pop()
+            if last != question_id:
+                array[position] = last
+                self._positions[last][slot] = position
+        
+        if not self.buckets[key]:
+            del self.buckets[key]
+        for facet, value in zip(self.FACETS, key):
+            if not self.facets[(facet, value)]:
+                del self.facets[(facet, value)]
+        return True
+    
+    def matching(self, subject=None, chapter=None, difficulty=None):
+        """Get bucket keys matching the given facets (None matches anything).
+        
+        Returns:
+            Sorted list of (subject, chapter, difficulty) keys
+        """
+        return sorted(
+            key for key in self.buckets
+            if (subject is None or key[0] == subject)
+            and (chapter is None or key[1] == chapter)
+            and (difficulty is None or key[2] == difficulty)
+        )
+    
+    def ids_matching(self, subject=None, chapter=None, difficulty=None):
+        """Get the IDs matching the given facets.
+        
+        No facet, a single facet or all three facets map straight onto a
+        maintained list, which is returned as-is and must not be modified.
+        Two facets are answered by joining the matching buckets.
+        """
+        given = [(facet, value) for facet, value in zip(self.FACETS, (subject, chapter, difficulty))
+                 if value is not None]
+        if not given:
+            return self.all_ids
+        if len(given) == 1:
+            return self.facets.get(given[0], [])
+        if len(given) == 3:
+            return self.buckets.get((subject, chapter, difficulty), [])
+        return [qid for key in self.matching(subject, chapter, difficulty) for qid in self.buckets[key]]
+    
+    def values(self, facet):
+        """Sorted distinct values of a facet."""
+        return sorted(value for name, value in self.facets if name == facet)
+    
+    def size(self, key):
+        """Number of questions in a bucket."""
+        return len(self.buckets.get(key, ()))
+
+
+def _stat_file(path):
+    """Identity, modification time and size of a file, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
 
 class QuestionDatabase:
-    """Manage MCQ questions database."""
+    """Manage MCQ questions database.
+    
+    Questions are stored as a snapshot (db_file, in JSON or the compact
+    bank_snapshot format) plus an append-only journal (<db_file>.journal)
+    of the changes made since that snapshot. Each change gets the next
+    generation number. Processes sharing the
+    files take <db_file>.lock for every write, first replaying only the
+    journal lines they have not seen yet, so IDs are never handed out
+    twice and no process overwrites another's changes. The journal is
+    folded into a new snapshot once it grows large.
+    """
+    
+    # Compact once the journal passes this size and half the snapshot size
+    COMPACT_MIN_BYTES = 256 * 1024
+    # Previous snapshots kept as <db_file>.bak, .bak.2, ...
+    BACKUPS = 2
     
     def __init__(self, db_file="questions_db.json"):
         self.db_file = Path(db_file)
+        self.journal_file = self.db_file.with_name(self.db_file.name + '.journal')
+        self.lock = FileLock(self.db_file.with_name(self.db_file.name + '.lock'))
+        # Snapshot format: compact binary or JSON, kept as found on load
+        self.compact = self.db_file.suffix == COMPACT_SUFFIX
+        # Held while questions and index change (threads of this process);
+        # readers that use both take it too
+        self.view_lock = threading.RLock()
         self.questions = {}
         self.next_id = 1
+        self.index = BucketIndex()
+        self.revision = 0
+        self.generation = 0
+        self._snapshot_stamp = None
+        self._journal_stamp = None
+        self._journal_base = None
+        self._journal_offset = 0
         self.load()
     
     def load(self):
-        """Load questions from file."""
-        if self.db_file.exists():
+        """Load questions from the snapshot and replay the journal."""
+        with self.lock:
+            self.next_id = 1
+            self.generation = 0
             try:
-                with open(self.db_file, 'r') as f:
-                    data = json.load(f)
-                    self.questions = {int(k): v for k, v in data.get('questions', {}).items()}
-                    self.next_id = data.get('next_id', 1)
-            except:
-                pass
-        
-        # If no questions, load defaults
-        if not self.questions:
-            self.questions = STATIC_QUESTIONS.copy()
-            self.next_id = max(self.questions.keys()) + 1 if self.questions else 1
-            self.save()
+                data, source, self.compact = read_bank(self.db_file, self.BACKUPS, lazy=True)
+            except FileNotFoundError:
+                data = None
+            except ValueError as e:
+                # Never replace an unreadable bank with the sample questions
+                raise ValueError(f"Question database {self.db_file} is corrupt and has no usable backup ({e})")
+            
+            if data is not None:
+                if source != self.db_file:
+                    print(f"Warning: {self.db_file} is unreadable; loaded backup {source}")
+                self.next_id = data.get('next_id', 1)
+                self.generation = data.get('generation', 0)
+            self._snapshot_stamp = _stat_file(self.db_file)
+            
+            questions = data.get('questions', {}) if data else {}
+            if isinstance(questions, SnapshotQuestions):
+                # Records stay compressed until used; the index is stored with them
+                index = BucketIndex.from_keys(questions.facet_keys())
+            else:
+                questions = {int(k): v for k, v in questions.items()}
+                # Records need their ID once they leave the dictionary (e.g. usage tracking)
+                for question_id, question in questions.items():
+                    question.setdefault('id', question_id)
+                index = BucketIndex(questions)
+            
+            # Readers in other threads wait until the journal is replayed
+            # too, so they never see questions and index out of step
+            with self.view_lock:
+                self.questions = questions
+                self.index = index
+                self._journal_base = None
+                self._journal_offset = 0
+                self._replay_journal(loading=True)
+                
+                # Brand-new bank: start from the sample questions
+                if data is None and not self.questions:
+                    self.questions = {k: dict(v) for k, v in STATIC_QUESTIONS.items()}
+                    self.next_id = max(self.questions.keys()) + 1 if self.questions else 1
+                    for question_id, question in self.questions.items():
+                        question.setdefault('id', question_id)
+                    self.index = BucketIndex(self.questions)
+                    self.save()
+            
+            self.revision += 1
     
     def save(self):
-        """Save questions to file."""
-        data = {
-            'questions': {str(k): v for k, v in self.questions.items()},
-            'next_id': self.next_id
-        }
-        with open(self.db_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Write a full snapshot and start a new, empty journal."""
+        with self.lock:
+            data = {
+                'questions': {str(k): v for k, v in self.questions.items()},
+                'next_id': self.next_id,
+                'generation': self.generation
+            }
+            if self.compact:
+                write_snapshot(self.db_file, data, backups=self.BACKUPS, key_of=self.index.key_of)
+            else:
+                atomic_write_json(self.db_file, data, backups=self.BACKUPS)
+            self._snapshot_stamp = _stat_file(self.db_file)
+            self._start_journal()
     
-    def add_question(self, question_data):
-        """Add a new question."""
-        question_id = self.next_id
-        self.questions[question_id] = {
+    def _start_journal(self):
+        """Replace the journal with an empty one based on the current generation."""
+        header = (json.dumps({'base': self.generation}) + '\n').encode('utf-8')
+        atomic_write_bytes(self.journal_file, header)
+        self._journal_base = self.generation
+        self._journal_offset = len(header)
+        self._journal_stamp = _stat_file(self.journal_file)
+    
+    def _replay_journal(self, loading=False):
+        """Apply journal entries this process has not seen yet.
+        
+        Only complete lines past the last read offset are parsed; a torn
+        last line from a crashed writer is left for the next writer to cut.
+        
+        Args:
+            loading: Called from load(), right after reading the snapshot
+        
+        Returns:
+            Number of entries applied, or None if the journal was compacted
+            past this process's generation and a full load is needed
+        """
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            self._journal_base = None
+            self._journal_stamp = None
+            return 0
+        
+        applied = 0
+        with f:
+            self._journal_stamp = _stat_file(self.journal_file)
+            header = f.readline()
+            try:
+                base = json.loads(header)['base'] if header.endswith(b'\n') else 0
+            except (ValueError, KeyError, TypeError):
+                base = 0
+            if base != self._journal_base:
+                if base > self.generation and not loading:
+                    return None
+                self._journal_base = base
+                self._journal_offset = len(header) if header.endswith(b'\n') else 0
+            
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                self._journal_offset += len(line)
+                entry = json.loads(line)
+                if entry['gen'] > self.generation:
+                    self._apply(entry)
+                    applied += 1
+        return applied
+    
+    def _apply(self, entry):
+        """Apply one journal entry to the in-memory questions and index."""
+        with self.view_lock:
+            for record in entry.get('put', ()):
+                question_id = int(record['id'])
+                self.questions[question_id] = record
+                self.index.add(question_id, record)
+                self.next_id = max(self.next_id, question_id + 1)
+            for question_id in entry.get('delete', ()):
+                if self.questions.pop(question_id, None) is not None:
+                    self.index.remove(question_id)
+            self.generation = entry['gen']
+    
+    def _catch_up(self):
+        """Bring memory in line with the files. The caller holds the lock.
+        
+        Returns:
+            True if anything changed
+        """
+        if _stat_file(self.db_file) != self._snapshot_stamp:
+            self.load()
+            return True
+        if _stat_file(self.journal_file) == self._journal_stamp:
+            return False
+        applied = self._replay_journal()
+        if applied is None:
+            self.load()
+            return True
+        if applied:
+            self.revision += 1
+        return applied > 0
+    
+    def _commit(self, put=(), delete=()):
+        """Journal a change and apply it. The caller holds the lock and has caught up.
+        
+        Args:
+            put: Question records to insert or replace
+            delete: Question IDs to remove
+        """
+        entry = {'gen': self.generation + 1, 'put': list(put), 'delete': list(delete)}
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        
+        if self._journal_base is None:
+            self._start_journal()
+        with open(self.journal_file, 'r+b') as f:
+            # Cut any torn line left by a writer that crashed mid-append
+            f.truncate(self._journal_offset)
+            f.seek(self._journal_offset)
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_offset += len(line)
+        self._journal_stamp = _stat_file(self.journal_file)
+        
+        self._apply(entry)
+        self.revision += 1
+        
+        snapshot_size = self._snapshot_stamp[2] if self._snapshot_stamp else 0
+        if self._journal_offset > max(self.COMPACT_MIN_BYTES, snapshot_size // 2):
+            self.save()
+    
+    def refresh(self):
+        """Pick up changes other processes made to the database.
+        
+        Costs two stat() calls when nothing changed, so it can run before
+        every request. Otherwise only the new journal lines are replayed.
+        
+        Returns:
+            True if the questions changed
+        """
+        if (_stat_file(self.db_file) == self._snapshot_stamp
+                and _stat_file(self.journal_file) == self._journal_stamp):
+            return False
+        with self.lock:
+            return self._catch_up()
+    
+    def _build_record(self, question_id, question_data):
+        """Build a stored question record from submitted data.
+        
+        Options given as a list with a 0-based answer index (web form,
+        mobile app) are stored in the bank's lettered shape.
+        """
+        options, correct_answer = normalize_options(question_data['options'], question_data['correct_answer'])
+        record = {
             'id': question_id,
             'question': question_data['question'],
-            'options': question_data['options'],
-            'correct_answer': question_data['correct_answer'],
+            'options': options,
+            'correct_answer': correct_answer,
+            'explanation': question_data.get('explanation', ''),
             'subject': question_data.get('subject', 'General'),
             'chapter': question_data.get('chapter', 'Chapter 1'),
             'difficulty': question_data.get('difficulty', 'Medium')
         }
-        self.next_id += 1
-        self.save()
+        # Provenance of questions ingested from PDF files
+        for key in ('source', 'page', 'fingerprint'):
+            if key in question_data:
+                record[key] = question_data[key]
+        return record
+    
+    def add_question(self, question_data):
+        """Add a new question."""
+        with self.lock:
+            self._catch_up()
+            question_id = self.next_id
+            self._commit(put=[self._build_record(question_id, question_data)])
         return question_id
     
+    def add_questions(self, questions_data):
+        """Add several questions as a single journal entry.
+        
+        Args:
+            questions_data: Iterable of question dictionaries
+            
+        Returns:
+            List of new question IDs
+        """
+        with self.lock:
+            self._catch_up()
+            records = []
+            for question_data in questions_data:
+                records.append(self._build_record(self.next_id + len(records), question_data))
+            if records:
+                self._commit(put=records)
+        return [record['id'] for record in records]
+    
     def get_question(self, question_id):
         """Get a single question."""
-        return self.questions.get(question_id)
+        with self.view_lock:
+            return self.questions.get(question_id)
     
     def get_all_questions(self):
         """Get all questions as a list."""
-        return list(self.questions.values())
+        with self.view_lock:
+            return list(self.questions.values())
+    
+    def get_bucket_index(self):
+        """Get the facet index maintained alongside the questions."""
+        return self.index
+    
+    def get_questions_and_index(self):
+        """Get the questions and their facet index as one consistent pair.
+        
+        Both are changed in place by later journal entries, so hold
+        view_lock while reading them.
+        """
+        with self.view_lock:
+            return self.questions, self.index
     
     def get_questions_by_subject(self, subject):
         """Get questions for a specific subject."""
-        return [q for q in self.questions.values() if q.get('subject') == subject]
+        with self.view_lock:
+            return [self.questions[qid] for qid in self.index.ids_matching(subject=subject)]
+    
+    def get_subjects(self):
+        """Get the sorted list of subjects in the bank."""
+        with self.view_lock:
+            return self.index.values('subject')
+    
+    def count_questions(self, subject=None, chapter=None, difficulty=None):
+        """Count questions matching the given facets (None matches anything)."""
+        with self.view_lock:
+            return len(self.index.ids_matching(subject, chapter, difficulty))
+    
+    def sample_questions(self, count, subject=None, chapter=None, difficulty=None, rng=None):
+        """Draw distinct random questions matching the given facets.
+        
+        IDs are sampled straight from the facet index and only the chosen
+        records are fetched, so the cost depends on count, not bank size.
+        
+        Args:
+            count: Number of questions to draw
+            subject: Optional subject filter
+            chapter: Optional chapter filter
+            difficulty: Optional difficulty filter
+            rng: random.Random instance (default: module random)
+            
+        Returns:
+            List of question dictionaries
+            
+        Raises:
+            ValueError: If fewer than count questions match
+        """
+        with self.view_lock:
+            ids = self.index.ids_matching(subject, chapter, difficulty)
+            chosen = (rng or random).sample(ids, count)
+            return [self.questions[qid] for qid in chosen]
     
     def delete_question(self, question_id):
         """Delete a question."""
-        if question_id in self.questions:
-            del self.questions[question_id]
-            self.save()
-            return True
+        with self.lock:
+            self._catch_up()
+            if question_id in self.questions:
+                self._commit(delete=[question_id])
+                return True
         return False
     
     def update_question(self, question_id, question_data):
         """Update an existing question."""
-        if question_id in self.questions:
-            self.questions[question_id].update(question_data)
-            self.save()
-            return True
+        with self.lock:
+            self._catch_up()
+            if question_id in self.questions:
+                record = dict(self.questions[question_id])
+                record.update(question_data)
+                if 'options' in question_data or 'correct_answer' in question_data:
+                    record['options'], record['correct_answer'] = normalize_options(
+                        record.get('options'), record.get('correct_answer'))
+                self._commit(put=[record])
+                return True
         return False
 
 
@@ -1,8 +1,153 @@
+import copy
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
 from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Inches, Pt, RGBColor, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn, nsdecls
 from datetime import datetime
 
+from paper_cache import RENDERER_VERSION
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered OOXML blocks.
+    
+    A block is the list of body elements (paragraphs) produced for one
+    question. Entries are keyed by a hash of the block kind, the renderer
+    version and the question content, and hold private copies of the
+    elements; callers always receive fresh copies to splice into a document.
+    """
+    
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(kind, question_data):
+        """Build the cache key for a question block."""
+        payload = json.dumps([kind, RENDERER_VERSION, question_data], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Get copies of a cached block's elements, or None."""
+        with self._lock:
+            elements = self._entries.get(key)
+            if elements is None:
+                return None
+            self._entries.move_to_end(key)
+        return [copy.deepcopy(element) for element in elements]
+    
+    def put(self, key, elements):
+        """Store copies of a block's elements."""
+        elements = [copy.deepcopy(element) for element in elements]
+        with self._lock:
+            self._entries[key] = elements
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached blocks."""
+        with self._lock:
+            self._entries.clear()
+
+
+FRAGMENT_CACHE = FragmentCache()
+
+
+def _body_end(body):
+    """Index where new block elements go (before the section properties)."""
+    return len(body) - (1 if body.sectPr is not None else 0)
+
+
+def add_cached_block(doc, kind, question_data, number_text, render):
+    """Add a question block to a document, reusing cached OOXML if possible.
+    
+    On a miss the block is rendered with python-docx and the resulting
+    elements are cached. On a hit the cached elements are copied into the
+    body and the first text node, which holds the question number, is set
+    to number_text.
+    
+    Args:
+        doc: python-docx Document
+        kind: Block kind, part of the cache key (e.g. 'question')
+        question_data: Question dictionary, part of the cache key
+        number_text: Text of the block's first run (e.g. 'Q3. ')
+        render: Callable that renders the block into doc
+    """
+    body = doc.element.body
+    key = FragmentCache.key(kind, question_data)
+    elements = FRAGMENT_CACHE.get(key)
+    
+    if elements is None:
+        start = _body_end(body)
+        render()
+        FRAGMENT_CACHE.put(key, body[start:_body_end(body)])
+        return
+    
+    sect_pr = body.sectPr
+    for element in elements:
+        if sect_pr is not None:
+            sect_pr.addprevious(element)
+        else:
+            body.append(element)
+    elements[0].find('.//' + qn('w:t')).text = number_text
+
+
+def add_grid_table(doc, cells, num_cols, header_text="", style=None, font_size=10):
+    """Add a table that lays out short texts row by row.
+    
+    The rows are written as one XML string and parsed once, instead of
+    resolving every cell through table.cell(), which walks the grid on
+    each call. Cell text is bold and centred.
+    
+    Args:
+        doc: python-docx Document
+        cells: List of cell texts
+        num_cols: Number of columns
+        header_text: Text of the header row, which spans all columns
+        style: Table style name
+        font_size: Cell font size in points
+    
+    Returns:
+        The python-docx Table
+    """
+    num_cols = max(1, int(num_cols))
+    table = doc.add_table(rows=0, cols=num_cols)
+    if style:
+        table.style = style
+    
+    section = doc.sections[-1]
+    table_width = section.page_width - section.left_margin - section.right_margin
+    col_width = Emu(table_width).twips // num_cols
+    half_points = int(font_size * 2)
+    run_props = f'<w:rPr><w:b/><w:sz w:val="{half_points}"/></w:rPr>'
+    para_props = '<w:pPr><w:jc w:val="center"/></w:pPr>'
+    
+    def cell_xml(text, span=1):
+        grid_span = f'<w:gridSpan w:val="{span}"/>' if span > 1 else ''
+        run = f'<w:r>{run_props}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>' if text else ''
+        return (f'<w:tc><w:tcPr><w:tcW w:w="{col_width * span}" w:type="dxa"/>{grid_span}</w:tcPr>'
+                f'<w:p>{para_props}{run}</w:p></w:tc>')
+    
+    rows = [f'<w:tr>{cell_xml(header_text, num_cols)}</w:tr>']
+    empty_cell = cell_xml('')
+    for start in range(0, len(cells), num_cols):
+        chunk = cells[start:start + num_cols]
+        padding = empty_cell * (num_cols - len(chunk))
+        rows.append(f"<w:tr>{''.join(cell_xml(text) for text in chunk)}{padding}</w:tr>")
+    
+    fragment = parse_xml(f"<w:tbl {nsdecls('w')}>{''.join(rows)}</w:tbl>")
+    table._tbl.extend(list(fragment))
+    return table
+
 
 class QuestionPaperGenerator:
     """Generate Question Paper in Word format."""
@@ -93,23 +238,32 @@ class QuestionPaperGenerator:
         for question_id in sorted(self.questions.keys()):
             question_data = self.questions[question_id]
             
-            # Question number and text
-            question_para = self.doc.add_paragraph()
-            question_para.paragraph_format.left_indent = Inches(0)
-            question_run = question_para.add_run(f"Q{question_id}. {question_data['question']}")
+            number_text = f"Q{question_id}. "
+            add_cached_block(
+                self.doc, 'question', question_data, number_text,
+                lambda: self.render_question(number_text, question_data)
+            )
+    
+    def render_question(self, number_text, question_data):
+        """Render one question block with python-docx."""
+        # Question number and text
+        question_para = self.doc.add_paragraph()
+        question_para.paragraph_format.left_indent = Inches(0)
+        for text in (number_text, question_data['question']):
+            question_run = question_para.add_run(text)
             question_run.font.bold = True
             question_run.font.size = Pt(11)
-            
-            # Options
-            for option_key in ['A', 'B', 'C', 'D']:
-                option_text = question_data['options'][option_key]
-                option_para = self.doc.add_paragraph()
-                option_para.paragraph_format.left_indent = Inches(0.25)
-                option_run = option_para.add_run(f"{option_key}) {option_text}")
-                option_run.font.size = Pt(10)
-            
-            # Add space between questions
-            self.doc.add_paragraph()
+        
+        # Options
+        for option_key in ['A', 'B', 'C', 'D']:
+            option_text = question_data['options'][option_key]
+            option_para = self.doc.add_paragraph()
+            option_para.paragraph_format.left_indent = Inches(0.25)
+            option_run = option_para.add_run(f"{option_key}) {option_text}")
+            option_run.font.size = Pt(10)
+        
+        # Add space between questions
+        self.doc.add_paragraph()
     
     def generate(self, output_path):
         """Generate the question paper document.
@@ -193,35 +347,19 @@ class AnswerKeyGenerator:
         
         self.doc.add_paragraph()
     
-    def add_answer_key_table(self):
-        """Add answer key table."""
+    def add_answer_key_table(self, num_cols=10, header_text="Question : Answer"):
+        """
+        Add answer key table.
+        
+        Args:
+            num_cols: Number of answers per row
+            header_text: Text of the header row, merged across all columns
+        """
         ans_heading = self.doc.add_heading('Answer Key:', level=2)
         ans_heading.runs[0].font.size = Pt(12)
         
-        # Create table for answers
-        num_questions = len(self.questions)
-        num_cols = 10  # 10 columns for better layout
-        num_rows = (num_questions + num_cols - 1) // num_cols + 1
-        
-        table = self.doc.add_table(rows=num_rows, cols=num_cols)
-        table.style = 'Light Grid Accent 1'
-        
-        # Header row
-        for i in range(num_cols):
-            table.cell(0, i).text = ""
-        
-        # Fill in answers
-        question_ids = sorted(self.questions.keys())
-        for idx, qid in enumerate(question_ids):
-            row = (idx // num_cols) + 1
-            col = idx % num_cols
-            correct_ans = self.questions[qid]['correct_answer']
-            
-            cell = table.cell(row, col)
-            cell.text = f"Q{qid}: {correct_ans}"
-            cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            cell.paragraphs[0].runs[0].font.size = Pt(10)
-            cell.paragraphs[0].runs[0].font.bold = True
+        cells = [f"Q{qid}: {self.questions[qid]['correct_answer']}" for qid in sorted(self.questions.keys())]
+        add_grid_table(self.doc, cells, num_cols, header_text, style='Light Grid Accent 1')
         
         self.doc.add_paragraph()
     
@@ -232,32 +370,41 @@ class AnswerKeyGenerator:
         
         for question_id in sorted(self.questions.keys()):
             question_data = self.questions[question_id]
-            correct_ans = question_data['correct_answer']
-            explanation = question_data['explanation']
-            
-            # Question
-            q_para = self.doc.add_paragraph()
-            q_run = q_para.add_run(f"Q{question_id}. {question_data['question']}")
+            number_text = f"Q{question_id}. "
+            add_cached_block(
+                self.doc, 'solution', question_data, number_text,
+                lambda: self.render_solution(number_text, question_data)
+            )
+    
+    def render_solution(self, number_text, question_data):
+        """Render one detailed solution block with python-docx."""
+        correct_ans = question_data['correct_answer']
+        explanation = question_data['explanation']
+        
+        # Question
+        q_para = self.doc.add_paragraph()
+        for text in (number_text, question_data['question']):
+            q_run = q_para.add_run(text)
             q_run.font.bold = True
             q_run.font.size = Pt(11)
-            
-            # Answer
-            ans_para = self.doc.add_paragraph()
-            ans_para.paragraph_format.left_indent = Inches(0.25)
-            ans_run = ans_para.add_run(f"Answer: {correct_ans}")
-            ans_run.font.bold = True
-            ans_run.font.color.rgb = RGBColor(0, 128, 0)  # Green color
-            ans_run.font.size = Pt(10)
-            
-            # Explanation
-            exp_para = self.doc.add_paragraph()
-            exp_para.paragraph_format.left_indent = Inches(0.25)
-            exp_run = exp_para.add_run(f"Explanation: {explanation}")
-            exp_run.font.size = Pt(10)
-            exp_run.font.italic = True
-            
-            # Add space between questions
-            self.doc.add_paragraph()
+        
+        # Answer
+        ans_para = self.doc.add_paragraph()
+        ans_para.paragraph_format.left_indent = Inches(0.25)
+        ans_run = ans_para.add_run(f"Answer: {correct_ans}")
+        ans_run.font.bold = True
+        ans_run.font.color.rgb = RGBColor(0, 128, 0)  # Green color
+        ans_run.font.size = Pt(10)
+        
+        # Explanation
+        exp_para = self.doc.add_paragraph()
+        exp_para.paragraph_format.left_indent = Inches(0.25)
+        exp_run = exp_para.add_run(f"Explanation: {explanation}")
+        exp_run.font.size = Pt(10)
+        exp_run.font.italic = True
+        
+        # Add space between questions
+        self.doc.add_paragraph()
     
     def generate(self, output_path):
         """Generate the answer key document.
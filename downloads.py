@@ -0,0 +1,203 @@
+"""
+Download Helpers
+Streams zip archives of generated papers without building them on disk,
+with HTTP range requests and ETags so interrupted downloads can resume and
+repeat downloads are answered with 304 Not Modified
+"""
+
+import os
+import time
+import zlib
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Zip record layouts (all little endian)
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_OF_CENTRAL_DIR = struct.Struct('<IHHHHIIH')
+
+ZIP_VERSION = 20
+UTF8_NAMES_FLAG = 0x800
+ZIP_LIMIT = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+# CRC-32 by (path, mtime_ns, size), so conditional and range requests for
+# an unchanged archive do not read every file again
+CRC_CACHE_SIZE = 1024
+_crc_cache = OrderedDict()
+_crc_cache_lock = threading.Lock()
+
+
+def dos_datetime(timestamp):
+    """Convert a Unix timestamp to zip (MS-DOS) time and date fields."""
+    t = time.localtime(timestamp)
+    year = max(t.tm_year, 1980)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def file_crc32(file_path):
+    """CRC-32 of a file's contents."""
+    crc = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def cached_crc32(file_path, stat):
+    """CRC-32 of a file, computed once per version of the file.
+
+    Args:
+        file_path: Path to the file
+        stat: os.stat result of the file (identifies the version)
+    """
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _crc_cache_lock:
+        if key in _crc_cache:
+            _crc_cache.move_to_end(key)
+            return _crc_cache[key]
+    crc = file_crc32(file_path)
+    with _crc_cache_lock:
+        _crc_cache[key] = crc
+        while len(_crc_cache) > CRC_CACHE_SIZE:
+            _crc_cache.popitem(last=False)
+    return crc
+
+
+class ZipStream:
+    """A zip archive of existing files, produced on the fly.
+
+    Entries are stored uncompressed: DOCX and PDF files are already
+    compressed, and stored entries make the archive's exact size and byte
+    layout known before anything is sent. That allows a Content-Length, an
+    ETag and serving any byte range without writing the archive anywhere.
+    """
+
+    def __init__(self, files):
+        """
+        Initialize the stream.
+
+        Args:
+            files: List of (file_path, name_in_archive) tuples
+        """
+        self.segments = []
+        central = []
+        offset = 0
+        digest = hashlib.sha1()
+
+        for file_path, arcname in files:
+            stat = os.stat(file_path)
+            name = arcname.encode('utf-8')
+            # Every offset, including the central directory's after the
+            # last entry, has to fit the 32-bit zip fields
+            if offset + LOCAL_HEADER.size + len(name) + stat.st_size > ZIP_LIMIT:
+                raise ValueError("Archive too large to stream")
+            if len(central) >= ZIP_MAX_ENTRIES:
+                raise ValueError("Too many files to stream in one archive")
+            crc = cached_crc32(file_path, stat)
+            dos_time, dos_date = dos_datetime(stat.st_mtime)
+
+            header = LOCAL_HEADER.pack(
+                0x04034b50, ZIP_VERSION, UTF8_NAMES_FLAG, 0, dos_time, dos_date,
+                crc, stat.st_size, stat.st_size, len(name), 0
+            ) + name
+            central.append(CENTRAL_HEADER.pack(
+                0x02014b50, ZIP_VERSION, ZIP_VERSION, UTF8_NAMES_FLAG, 0, dos_time, dos_date,
+                crc, stat.st_size, stat.st_size, len(name), 0, 0, 0, 0, 0o100644 << 16, offset
+            ) + name)
+
+            self.segments.append((len(header), header))
+            self.segments.append((stat.st_size, file_path))
+            offset += len(header) + stat.st_size
+            digest.update(header)
+
+        directory = b''.join(central)
+        if len(directory) > ZIP_LIMIT:
+            raise ValueError("Archive too large to stream")
+        end = END_OF_CENTRAL_DIR.pack(
+            0x06054b50, 0, 0, len(central), len(central), len(directory), offset, 0
+        )
+        self.segments.append((len(directory) + len(end), directory + end))
+        self.size = offset + len(directory) + len(end)
+        # Headers carry name, size, CRC and modification time of every entry
+        self.etag = digest.hexdigest()
+
+    def iter_bytes(self, start=0, stop=None):
+        """Yield the archive bytes in [start, stop).
+
+        Args:
+            start: First byte offset
+            stop: End offset (exclusive, default: end of archive)
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        position = 0
+        for length, content in self.segments:
+            seg_start, seg_stop = max(start, position), min(stop, position + length)
+            if seg_start < seg_stop:
+                if isinstance(content, bytes):
+                    yield content[seg_start - position:seg_stop - position]
+                else:
+                    with open(content, 'rb') as f:
+                        f.seek(seg_start - position)
+                        remaining = seg_stop - seg_start
+                        while remaining > 0:
+                            chunk = f.read(min(CHUNK_SIZE, remaining))
+                            if not chunk:
+                                raise IOError(f"{content} changed while streaming")
+                            remaining -= len(chunk)
+                            yield chunk
+            position += length
+            if position >= stop:
+                break
+
+
+def zip_response(request, files, download_name):
+    """Build a streaming zip download honouring conditional and range headers.
+
+    Args:
+        request: Current Flask request
+        files: List of (file_path, name_in_archive) tuples
+        download_name: File name offered to the browser
+
+    Returns:
+        Flask Response (200, 206, 304 or 416)
+    """
+    stream = ZipStream(files)
+
+    response = Response(mimetype='application/zip')
+    response.set_etag(stream.etag)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+
+    if request.if_none_match.contains(stream.etag):
+        response.status_code = 304
+        return response
+
+    start, stop = 0, stream.size
+    # Multi-range requests get the whole archive; If-Range only resumes
+    # when the client still has the same archive
+    byte_ranges = request.range
+    if_range = request.if_range
+    if (byte_ranges and len(byte_ranges.ranges) == 1
+            and (not (if_range.etag or if_range.date) or if_range.etag == stream.etag)):
+        byte_range = byte_ranges.range_for_length(stream.size)
+        if byte_range is None:
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{stream.size}'
+            return response
+        start, stop = byte_range
+        response.status_code = 206
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{stream.size}'
+
+    response.response = stream.iter_bytes(start, stop)
+    response.content_length = stop - start
+    return response
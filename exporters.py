@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Question Bank Export
+Streams questions from a QuestionDatabase as CSV, JSON-lines, Moodle GIFT
+or IMS QTI 1.2. Every exporter is a generator of text pieces, one question
+at a time, so output of any size is written (or sent over HTTP) without
+being built in memory.
+
+Usage:
+    python exporters.py csv questions.csv [--subject Physics] [--chapter Optics]
+    python exporters.py gift - --subject Physics > physics.gift
+"""
+
+import io
+import sys
+import csv
+import json
+import argparse
+from xml.sax.saxutils import escape, quoteattr
+
+from database import normalize_options
+
+
+CSV_COLUMNS = ['id', 'question', 'option_a', 'option_b', 'option_c', 'option_d',
+               'correct_answer', 'explanation', 'subject', 'chapter', 'difficulty']
+
+
+def iter_questions(db, subject=None, chapter=None):
+    """Yield matching questions in ID order with options normalized.
+
+    Args:
+        db: QuestionDatabase
+        subject: Optional subject filter
+        chapter: Optional chapter filter
+
+    Yields:
+        Question dictionaries with options {'A'..'D'} and a letter answer
+    """
+    for question_id in sorted(db.index.ids_matching(subject, chapter)):
+        question = db.questions.get(question_id)
+        if question is None:
+            continue  # Deleted while exporting
+        options, answer = normalize_options(question.get('options'), question.get('correct_answer'))
+        record = dict(question)
+        record['id'] = question_id
+        record['options'] = options
+        record['correct_answer'] = answer
+        yield record
+
+
+def export_csv(questions):
+    """Yield CSV text: a header row, then one row per question."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield row(CSV_COLUMNS)
+    for q in questions:
+        yield row([
+            q['id'], q.get('question', ''),
+            q['options']['A'], q['options']['B'], q['options']['C'], q['options']['D'],
+            q['correct_answer'], q.get('explanation', ''),
+            q.get('subject', ''), q.get('chapter', ''), q.get('difficulty', '')
+        ])
+
+
+def export_jsonl(questions):
+    """Yield one JSON object per line."""
+    for q in questions:
+        yield json.dumps(q, ensure_ascii=False) + '\n'
+
+
+def gift_escape(text):
+    """Escape GIFT control characters in question text."""
+    text = str(text).replace('\\', '\\\\')
+    for char in '~=#{}:':
+        text = text.replace(char, '\\' + char)
+    return text.replace('\n', '\\n')
+
+
+def export_gift(questions):
+    """Yield Moodle GIFT, with a $CATEGORY line whenever subject/chapter changes."""
+    category = None
+    for q in questions:
+        current = (q.get('subject', ''), q.get('chapter', ''))
+        if current != category:
+            category = current
+            path = '/'.join(part.replace('/', '-') for part in current if part)
+            yield f"$CATEGORY: $course$/{path}\n\n"
+
+        lines = [f"// id: {q['id']} difficulty: {q.get('difficulty', '')}",
+                 f"::Q{q['id']}:: {gift_escape(q.get('question', ''))} {{"]
+        for key, text in q['options'].items():
+            mark = '=' if key == q['correct_answer'] else '~'
+            lines.append(f"{mark}{gift_escape(text)}")
+        if q.get('explanation'):
+            lines.append(f"####{gift_escape(q['explanation'])}")
+        lines.append("}")
+        yield '\n'.join(lines) + '\n\n'
+
+
+def export_qti(questions, title="Question Bank"):
+    """Yield an IMS QTI 1.2 assessment with one multiple-choice item per question."""
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<questestinterop xmlns="http://www.imsglobal.org/xsd/ims_qtiasiv1p2">\n'
+           f'<assessment ident="question_bank" title={quoteattr(title)}>\n'
+           '<section ident="root_section">\n')
+    for q in questions:
+        ident = f"q{q['id']}"
+        parts = [
+            f'<item ident="{ident}" title="Q{q["id"]}">',
+            '<itemmetadata><qtimetadata>'
+            '<qtimetadatafield><fieldlabel>question_type</fieldlabel>'
+            '<fieldentry>multiple_choice_question</fieldentry></qtimetadatafield>'
+            f'<qtimetadatafield><fieldlabel>subject</fieldlabel><fieldentry>{escape(str(q.get("subject", "")))}</fieldentry></qtimetadatafield>'
+            f'<qtimetadatafield><fieldlabel>chapter</fieldlabel><fieldentry>{escape(str(q.get("chapter", "")))}</fieldentry></qtimetadatafield>'
+            f'<qtimetadatafield><fieldlabel>difficulty</fieldlabel><fieldentry>{escape(str(q.get("difficulty", "")))}</fieldentry></qtimetadatafield>'
+            '</qtimetadata></itemmetadata>',
+            '<presentation>',
+            f'<material><mattext texttype="text/plain">{escape(str(q.get("question", "")))}</mattext></material>',
+            '<response_lid ident="response1" rcardinality="Single"><render_choice>',
+        ]
+        for key, text in q['options'].items():
+            parts.append(f'<response_label ident="{key}"><material>'
+                         f'<mattext texttype="text/plain">{escape(text)}</mattext></material></response_label>')
+        parts.append('</render_choice></response_lid></presentation>')
+        parts.append(
+            '<resprocessing><outcomes>'
+            '<decvar maxvalue="100" minvalue="0" varname="SCORE" vartype="Decimal"/></outcomes>'
+            f'<respcondition continue="No"><conditionvar><varequal respident="response1">{q["correct_answer"]}</varequal>'
+            '</conditionvar><setvar action="Set" varname="SCORE">100</setvar></respcondition>'
+        )
+        if q.get('explanation'):
+            parts.append('<respcondition continue="Yes"><conditionvar><other/></conditionvar>'
+                         '<displayfeedback feedbacktype="Response" linkrefid="general_fb"/></respcondition>')
+        parts.append('</resprocessing>')
+        if q.get('explanation'):
+            parts.append('<itemfeedback ident="general_fb"><flow_mat><material>'
+                         f'<mattext texttype="text/plain">{escape(str(q["explanation"]))}</mattext>'
+                         '</material></flow_mat></itemfeedback>')
+        parts.append('</item>\n')
+        yield '\n'.join(parts)
+    yield '</section>\n</assessment>\n</questestinterop>\n'
+
+
+# format: (exporter, file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': (export_csv, '.csv', 'text/csv'),
+    'jsonl': (export_jsonl, '.jsonl', 'application/x-ndjson'),
+    'gift': (export_gift, '.gift', 'text/plain'),
+    'qti': (export_qti, '.xml', 'application/xml'),
+}
+
+
+def get_exporter(export_format):
+    """Get the exporter generator function for a format name.
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[export_format][0]
+
+
+def stream_export(db, export_format, subject=None, chapter=None):
+    """Yield the export of a bank in the given format, piece by piece."""
+    return get_exporter(export_format)(iter_questions(db, subject, chapter))
+
+
+def export_to_file(db, export_format, output, subject=None, chapter=None):
+    """Write an export to a file path ('-' for stdout).
+
+    Returns:
+        Number of questions exported
+    """
+    exporter = get_exporter(export_format)
+    count = 0
+
+    def counted():
+        nonlocal count
+        for question in iter_questions(db, subject, chapter):
+            count += 1
+            yield question
+
+    stream = open(output, 'w', encoding='utf-8', newline='') if output != '-' else sys.stdout
+    try:
+        for piece in exporter(counted()):
+            stream.write(piece)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return count
+
+
+def main():
+    """Command-line entry point for exporting a bank."""
+    parser = argparse.ArgumentParser(description="Export the question bank")
+    parser.add_argument('format', choices=sorted(EXPORT_FORMATS), help="Output format")
+    parser.add_argument('output', help="Output file ('-' for stdout)")
+    parser.add_argument('--subject', default=None, help="Only export this subject")
+    parser.add_argument('--chapter', default=None, help="Only export this chapter")
+    parser.add_argument('--db', default='questions_db.json', help="Question database file")
+    args = parser.parse_args()
+
+    from database import QuestionDatabase
+    db = QuestionDatabase(args.db)
+    try:
+        count = export_to_file(db, args.format, args.output, args.subject, args.chapter)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.output != '-':
+        print(f"Exported {count} questions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
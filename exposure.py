@@ -0,0 +1,418 @@
+"""
+Exposure Control
+Tracks how often and when each question was used in a paper and samples
+new papers weighted toward less-exposed questions
+"""
+
+import os
+import json
+import random
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from atomic_write import atomic_write_bytes, atomic_write_json
+from file_lock import FileLock
+
+
+class UsageHistory:
+    """Persist question usage: last used date and use count per question ID.
+
+    Usage is stored as a snapshot (history_file) plus a journal
+    (<history_file>.journal) with one appended line per recorded paper,
+    so recording a paper never rewrites the whole file. The journal is
+    folded into the snapshot once it passes COMPACT_BYTES. Processes
+    sharing the files take <history_file>.lock to write or to read past
+    a change, so none of them loses or double-counts a paper.
+
+    Callables in listeners are called with the set of question IDs whose
+    use count changed, whether this process or another recorded them.
+    """
+
+    COMPACT_BYTES = 1024 * 1024
+
+    def __init__(self, history_file="usage_history.json"):
+        self.history_file = Path(history_file)
+        self.journal_file = self.history_file.with_name(self.history_file.name + '.journal')
+        self.lock = FileLock(self.history_file.with_name(self.history_file.name + '.lock'))
+        self.usage = {}
+        self.listeners = []
+        self._snapshot_stamp = None
+        self._journal_stamp = None
+        self._journal_offset = 0
+        self.load()
+
+    def load(self):
+        """Load the usage snapshot and replay the journal."""
+        with self.lock:
+            usage = {}
+            if self.history_file.exists():
+                with open(self.history_file, 'r') as f:
+                    usage = {int(k): v for k, v in json.load(f).get('usage', {}).items()}
+            self.usage = usage
+            self._snapshot_stamp = _stat_file(self.history_file)
+            self._journal_offset = 0
+            self._replay_journal()
+
+    def save(self):
+        """Fold the journal into a new snapshot and start an empty journal."""
+        with self.lock:
+            data = {'usage': {str(k): v for k, v in self.usage.items()}}
+            atomic_write_json(self.history_file, data)
+            self._snapshot_stamp = _stat_file(self.history_file)
+            atomic_write_bytes(self.journal_file, b'')
+            self._journal_offset = 0
+            self._journal_stamp = _stat_file(self.journal_file)
+
+    def _apply(self, question_ids, last_used):
+        for qid in question_ids:
+            entry = self.usage.setdefault(qid, {'count': 0, 'last_used': None})
+            entry['count'] += 1
+            entry['last_used'] = last_used
+
+    def _replay_journal(self):
+        """Apply journal lines this process has not read yet. The caller holds the lock.
+
+        Returns:
+            Set of question IDs whose use count changed
+        """
+        changed = set()
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            self._journal_stamp = None
+            return changed
+        with f:
+            self._journal_stamp = _stat_file(self.journal_file)
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn line from a crashed writer; cut by the next record
+                self._journal_offset += len(line)
+                entry = json.loads(line)
+                self._apply(entry['ids'], entry['when'])
+                changed.update(entry['ids'])
+        return changed
+
+    def _catch_up(self):
+        """Bring memory in line with the files. The caller holds the lock.
+
+        Returns:
+            Set of question IDs whose use count changed
+        """
+        journal_stamp = _stat_file(self.journal_file)
+        journal_replaced = self._journal_stamp is not None and (
+            journal_stamp is None or journal_stamp[0] != self._journal_stamp[0])
+        if _stat_file(self.history_file) != self._snapshot_stamp or journal_replaced:
+            # Compacted elsewhere: reload and compare counts (rare)
+            before = {qid: entry.get('count', 0) for qid, entry in self.usage.items()}
+            self.load()
+            ids = before.keys() | self.usage.keys()
+            return {qid for qid in ids if before.get(qid, 0) != self.count(qid)}
+        if journal_stamp == self._journal_stamp:
+            return set()
+        return self._replay_journal()
+
+    def _notify(self, changed):
+        if changed:
+            for listener in self.listeners:
+                listener(changed)
+
+    def refresh(self):
+        """Pick up papers other processes recorded.
+
+        Costs two stat() calls when nothing changed; otherwise only new
+        journal lines are read.
+
+        Returns:
+            Set of question IDs whose use count changed
+        """
+        if (_stat_file(self.history_file) == self._snapshot_stamp
+                and _stat_file(self.journal_file) == self._journal_stamp):
+            return set()
+        with self.lock:
+            changed = self._catch_up()
+        # Listeners run after the lock is released, so they may take their own locks
+        self._notify(changed)
+        return changed
+
+    def count(self, question_id):
+        """Number of papers a question has appeared in."""
+        return self.usage.get(question_id, {}).get('count', 0)
+
+    def record(self, question_ids, when=None):
+        """Record that questions were used in a paper.
+
+        Args:
+            question_ids: IDs of the questions in the paper
+            when: datetime of use (default: now)
+        """
+        question_ids = list(question_ids)
+        last_used = (when or datetime.now()).isoformat()
+        line = (json.dumps({'ids': question_ids, 'when': last_used}, separators=(',', ':')) + '\n').encode('utf-8')
+        with self.lock:
+            # Pick up papers recorded by other processes before adding this one
+            changed = self._catch_up()
+            fd = os.open(self.journal_file, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, 'r+b') as f:
+                # Cut any torn line left by a writer that crashed mid-append
+                f.truncate(self._journal_offset)
+                f.seek(self._journal_offset)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_offset += len(line)
+            self._journal_stamp = _stat_file(self.journal_file)
+            self._apply(question_ids, last_used)
+            changed.update(question_ids)
+            if self._journal_offset > self.COMPACT_BYTES:
+                self.save()
+        self._notify(changed)
+
+    def recently_used(self, days):
+        """IDs of questions used within the last given number of days."""
+        if days <= 0:
+            return set()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        return {qid for qid, entry in list(self.usage.items())
+                if entry.get('last_used') and entry['last_used'] >= cutoff}
+
+
+def _stat_file(path):
+    """Inode, modification time and size of a file, or None."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class FenwickTree:
+    """Binary indexed tree over non-negative weights.
+
+    Supports O(log n) weight updates and O(log n) lookup of the slot that
+    holds a given cumulative weight, which is what weighted sampling needs.
+    """
+
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.weights = list(weights)
+        self.tree = [0.0] + self.weights
+        # Linear-time construction
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+    def total(self):
+        """Sum of all weights."""
+        total = 0.0
+        i = self.size
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def set(self, slot, weight):
+        """Set the weight of a 0-based slot."""
+        delta = weight - self.weights[slot]
+        self.weights[slot] = weight
+        i = slot + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def append(self, weight):
+        """Add a new slot at the end."""
+        self.size += 1
+        self.weights.append(0.0)
+        # The new node covers (size - lowbit, size]; fill it from its children
+        covered = 0.0
+        i = self.size - 1
+        stop = self.size - (self.size & -self.size)
+        while i > stop:
+            covered += self.tree[i]
+            i -= i & -i
+        self.tree.append(covered)
+        self.set(self.size - 1, weight)
+
+    def find(self, target):
+        """Find the 0-based slot whose cumulative weight range contains target."""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                position = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(position, self.size - 1)
+
+
+class ExposureSampler:
+    """Weighted sampler over a set of question IDs.
+
+    A question used n times has weight 1 / (1 + n), so rarely used
+    questions are drawn more often. Weights live in a Fenwick tree and are
+    updated per question as papers are recorded; nothing is reweighted
+    over the whole bank.
+
+    Sampling temporarily zeroes weights in the shared tree, so every method
+    that reads or changes the tree holds the sampler's lock; request
+    threads of the web app share one sampler.
+    """
+
+    def __init__(self, question_ids, history, rng=None):
+        self.history = history
+        self.rng = rng or random
+        self.lock = threading.RLock()
+        self.slot_of = {}
+        self.ids = []
+        self.free_slots = []
+        for qid in question_ids:
+            self.slot_of[qid] = len(self.ids)
+            self.ids.append(qid)
+        self.tree = FenwickTree([self.weight(qid) for qid in self.ids])
+
+    def weight(self, question_id):
+        """Sampling weight for a question based on its use count."""
+        return 1.0 / (1 + self.history.count(question_id))
+
+    def add(self, question_id):
+        """Add a question to the sampler."""
+        with self.lock:
+            if question_id in self.slot_of:
+                return
+            if self.free_slots:
+                slot = self.free_slots.pop()
+                self.ids[slot] = question_id
+                self.tree.set(slot, self.weight(question_id))
+            else:
+                slot = len(self.ids)
+                self.ids.append(question_id)
+                self.tree.append(self.weight(question_id))
+            self.slot_of[question_id] = slot
+
+    def remove(self, question_id):
+        """Remove a question from the sampler."""
+        with self.lock:
+            slot = self.slot_of.pop(question_id, None)
+            if slot is not None:
+                self.tree.set(slot, 0.0)
+                self.ids[slot] = None
+                self.free_slots.append(slot)
+
+    def sync(self, question_ids):
+        """Bring the sampler in line with the current set of IDs."""
+        current = set(question_ids)
+        with self.lock:
+            for qid in [qid for qid in self.slot_of if qid not in current]:
+                self.remove(qid)
+            for qid in current:
+                self.add(qid)
+
+    def refresh(self, question_ids):
+        """Recompute weights for questions whose use count changed."""
+        with self.lock:
+            for qid in question_ids:
+                slot = self.slot_of.get(qid)
+                if slot is not None:
+                    self.tree.set(slot, self.weight(qid))
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def sample(self, count, exclude=()):
+        """Draw distinct questions, favouring less-exposed ones.
+
+        Drawn and excluded questions have their weight set to zero while
+        sampling and restored afterwards (under the sampler's lock, so no
+        other thread sees the zeroed weights), so a draw costs O(log n).
+
+        Args:
+            count: Number of IDs to draw
+            exclude: IDs that must not be drawn
+
+        Returns:
+            List of question IDs
+
+        Raises:
+            ValueError: If fewer than count questions are available
+        """
+        with self.lock:
+            zeroed = []
+            for qid in exclude:
+                slot = self.slot_of.get(qid)
+                if slot is not None and self.tree.weights[slot] > 0:
+                    zeroed.append((slot, self.tree.weights[slot]))
+                    self.tree.set(slot, 0.0)
+
+            try:
+                available = len(self) - len(zeroed)
+                if count > available:
+                    raise ValueError(f"Not enough questions. Available: {available}, Requested: {count}")
+
+                picked = []
+                while len(picked) < count:
+                    slot = self.tree.find(self.rng.random() * self.tree.total())
+                    if self.tree.weights[slot] <= 0:
+                        # Floating point drift landed on an empty slot; draw again
+                        continue
+                    picked.append(self.ids[slot])
+                    zeroed.append((slot, self.tree.weights[slot]))
+                    self.tree.set(slot, 0.0)
+                return picked
+            finally:
+                for slot, weight in zeroed:
+                    self.tree.set(slot, weight)
+
+
+class ExposurePool:
+    """Exposure-aware sampling over a QuestionDatabase.
+
+    One ExposureSampler is kept per subject filter and re-synced with the
+    database's facet index only when the database revision changes.
+    Sampler lookup, sampling and weight updates are serialised by a lock,
+    so the pool can be shared by request threads.
+    """
+
+    def __init__(self, db, history, rng=None):
+        self.db = db
+        self.history = history
+        self.rng = rng
+        self.samplers = {}
+        self.lock = threading.RLock()
+        history.listeners.append(self._usage_changed)
+
+    def _usage_changed(self, question_ids):
+        """Reweight only the questions whose use count changed."""
+        with self.lock:
+            for _, sampler in self.samplers.values():
+                sampler.refresh(question_ids)
+
+    def _sampler(self, subject):
+        # Papers recorded by other processes reach the samplers via _usage_changed
+        self.history.refresh()
+        entry = self.samplers.get(subject)
+        ids = self.db.index.ids_matching(subject=subject)
+        if entry is None:
+            entry = [self.db.revision, ExposureSampler(ids, self.history, self.rng)]
+            self.samplers[subject] = entry
+        elif entry[0] != self.db.revision:
+            entry[1].sync(ids)
+            entry[0] = self.db.revision
+        return entry[1]
+
+    def sample(self, count, subject=None, exclude=()):
+        """Draw questions for a paper, favouring less-exposed ones.
+
+        Returns:
+            List of question dictionaries
+        """
+        with self.lock, self.db.view_lock:
+            ids = self._sampler(subject).sample(count, exclude)
+            return [self.db.questions[qid] for qid in ids]
+
+    def record(self, question_ids):
+        """Record a generated paper; sampling weights follow via _usage_changed."""
+        self.history.record(question_ids)
@@ -5,75 +5,176 @@ Desktop application with PDF loading and random question selection
 
 import sys
 import os
+import time
 import random
+import tempfile
+import threading
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QCheckBox, QScrollArea, QMessageBox,
-    QFileDialog, QSpinBox, QTextEdit
+    QLabel, QLineEdit, QPushButton, QListView, QMessageBox,
+    QFileDialog, QSpinBox, QPlainTextEdit, QProgressBar, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QThread, QTimer, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex,
+    QSortFilterProxyModel, pyqtSignal
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 
-from pdf_extractor import extract_pdf_questions
-from document_generator import QuestionPaperGenerator, AnswerKeyGenerator
-from pdf_converter import PDFConverter
 from license_manager import LicenseValidator
 
+# pdf_extractor (pdfplumber) and document_generator (python-docx, lxml) are
+# imported by the worker threads on first use, so the window opens without them
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a GenerationJob when it has been cancelled."""
+
 
-class DocumentGeneratorThread(QThread):
-    """Worker thread for document generation."""
+class GenerationJobSignals(QObject):
+    """Signals of a GenerationJob (a QRunnable cannot emit signals itself)."""
     
-    progress = pyqtSignal(str)
-    finished = pyqtSignal(bool, str)
+    progress = pyqtSignal(int, int, str)   # job ID, step, message
+    finished = pyqtSignal(int, bool, str)  # job ID, success, message
+
+
+class GenerationJob(QRunnable):
+    """One question paper + answer key, generated on a QThreadPool thread.
     
-    def __init__(self, college_name, exam_name, exam_date, questions, output_dir):
+    Cancellation is checked between steps; a job that has not started yet
+    is taken off the pool's queue instead (see cancel_jobs). Jobs for the
+    same paper (cache key) run one at a time, so a repeat waits and then
+    reuses the first job's files instead of converting the same DOCX to
+    the same PDF alongside it.
+    """
+    
+    # Steps 0..STEPS-1 report progress; STEPS means done
+    STEPS = 3
+    # Seconds between cancel checks while waiting for a job on the same paper
+    WAIT_INTERVAL = 0.2
+    
+    _key_locks = {}
+    _key_locks_guard = threading.Lock()
+    
+    def __init__(self, job_id, college_name, exam_name, exam_date, questions, output_dir):
         super().__init__()
+        # The window keeps the job until it is cleared from the queue panel
+        self.setAutoDelete(False)
+        self.job_id = job_id
         self.college_name = college_name
         self.exam_name = exam_name
         self.exam_date = exam_date
         self.questions = questions
         self.output_dir = output_dir
+        self.signals = GenerationJobSignals()
+        self.done = False
+        self._cancelled = threading.Event()
+    
+    def cancel(self):
+        """Ask the job to stop before its next step."""
+        self._cancelled.set()
+    
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+    
+    def _step(self, step, message):
+        if self._cancelled.is_set():
+            raise GenerationCancelled()
+        self.signals.progress.emit(self.job_id, step, message)
+    
+    def _done(self, message):
+        # The files exist by now, so a late cancel no longer applies
+        self.signals.progress.emit(self.job_id, self.STEPS, message)
+    
+    @classmethod
+    def _key_lock(cls, key):
+        with cls._key_locks_guard:
+            return cls._key_locks.setdefault(key, threading.Lock())
+    
+    def _wait_for(self, lock):
+        """Acquire lock, giving up if the job is cancelled meanwhile."""
+        if lock.acquire(blocking=False):
+            return
+        self._step(0, "Waiting for another job on the same paper...")
+        while not lock.acquire(timeout=self.WAIT_INTERVAL):
+            if self._cancelled.is_set():
+                raise GenerationCancelled()
     
     def run(self):
         try:
-            Path(self.output_dir).mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
+            success, message = self._generate()
+            self.signals.finished.emit(self.job_id, success, message)
+        except GenerationCancelled:
+            self.signals.finished.emit(self.job_id, False, "Cancelled")
+        except Exception as e:
+            self.signals.finished.emit(self.job_id, False, f"Error: {str(e)}")
+    
+    def _generate(self):
+        from paper_cache import PaperCache, paper_cache_key
+        
+        cache = PaperCache(self.output_dir)
+        key = paper_cache_key(self.college_name, self.exam_name, self.exam_date, self.questions)
+        
+        lock = self._key_lock(key)
+        self._wait_for(lock)
+        try:
+            return self._generate_locked(cache, key)
+        finally:
+            lock.release()
+    
+    def _generate_locked(self, cache, key):
+        from document_generator import QuestionPaperGenerator, AnswerKeyGenerator
+        from pdf_converter import PDFConverter
+        
+        if cache.lookup(key, require_pdf=True):
+            self._done("✓ Reusing previously generated papers")
+            return True, f"Documents saved to: {os.path.abspath(self.output_dir)}"
+        
+        cached = cache.lookup(key)
+        if cached:
+            self._step(1, "Reusing previously generated DOCX files...")
+            qp_path, ak_path = str(cached['question_paper']), str(cached['answer_key'])
+        else:
             # Generate Question Paper
-            self.progress.emit("Generating Question Paper...")
-            qp_filename = f"Question_Paper_{timestamp}.docx"
-            qp_path = os.path.join(self.output_dir, qp_filename)
+            self._step(0, "Generating Question Paper...")
             qp_gen = QuestionPaperGenerator(self.college_name, self.exam_name, self.exam_date, self.questions)
-            qp_gen.generate(qp_path)
+            qp_path = str(cache.render(key, 'question_paper', qp_gen.generate))
             
             # Generate Answer Key
-            self.progress.emit("Generating Answer Key & Solutions...")
-            ak_filename = f"Answer_Key_Solutions_{timestamp}.docx"
-            ak_path = os.path.join(self.output_dir, ak_filename)
+            self._step(1, "Generating Answer Key & Solutions...")
             ak_gen = AnswerKeyGenerator(self.college_name, self.exam_name, self.exam_date, self.questions)
-            ak_gen.generate(ak_path)
-            
-            # Convert to PDF
-            self.progress.emit("Converting to PDF format...")
-            pdf_result = PDFConverter.convert_documents(qp_path, ak_path, self.output_dir)
-            
-            if pdf_result:
-                self.progress.emit("✓ All documents generated successfully!")
-                self.finished.emit(True, f"Documents saved to:\n{os.path.abspath(self.output_dir)}")
-            else:
-                self.progress.emit("✓ Documents generated (PDF conversion skipped)")
-                self.finished.emit(True, f"DOCX files saved to:\n{os.path.abspath(self.output_dir)}")
-        except Exception as e:
-            self.finished.emit(False, f"Error: {str(e)}")
+            ak_path = str(cache.render(key, 'answer_key', ak_gen.generate))
+        
+        # Convert to PDF, with a LibreOffice profile of its own so jobs can convert in parallel
+        self._step(2, "Converting to PDF format...")
+        with tempfile.TemporaryDirectory(prefix="mcq_libreoffice_") as profile_dir:
+            pdf_result = PDFConverter.convert_documents(qp_path, ak_path, self.output_dir, profile_dir)
+        cache.prune(keep=[key])
+        
+        if pdf_result:
+            self._done("✓ All documents generated successfully!")
+            return True, f"Documents saved to: {os.path.abspath(self.output_dir)}"
+        self._done("✓ Documents generated (PDF conversion skipped)")
+        return True, f"DOCX files saved to: {os.path.abspath(self.output_dir)}"
 
 
 class PDFLoaderThread(QThread):
-    """Worker thread for PDF loading."""
+    """Worker thread for PDF loading.
+    
+    Questions are sent to the UI in batches while pages are parsed, at
+    most every BATCH_INTERVAL seconds, so the list fills as the PDF is
+    read. requestInterruption() stops the load after the current page.
+    """
+    
+    BATCH_INTERVAL = 0.2
     
     progress = pyqtSignal(str)
-    finished = pyqtSignal(bool, dict, str)
+    page_progress = pyqtSignal(int, int)
+    questions_found = pyqtSignal(dict)
+    finished = pyqtSignal(bool, int, str)
     
     def __init__(self, pdf_path):
         super().__init__()
@@ -82,31 +183,217 @@ class PDFLoaderThread(QThread):
     def run(self):
         try:
             self.progress.emit(f"Loading PDF: {Path(self.pdf_path).name}")
-            success, questions, message = extract_pdf_questions(self.pdf_path)
+            from pdf_extractor import PDFQuestionExtractor, QuestionValidator
+            
+            questions = {}
+            pending = {}
+            last_emit = time.monotonic()
+            pages = PDFQuestionExtractor(self.pdf_path).iter_question_pages()
+            try:
+                for page_num, total_pages, page_questions in pages:
+                    questions.update(page_questions)
+                    pending.update(page_questions)
+                    if time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                        self.page_progress.emit(page_num, total_pages)
+                        if pending:
+                            self.questions_found.emit(pending)
+                            pending = {}
+                        last_emit = time.monotonic()
+                    if self.isInterruptionRequested():
+                        break
+            finally:
+                pages.close()
+                if pending:
+                    self.questions_found.emit(pending)
             
-            if success:
+            if self.isInterruptionRequested():
+                self.finished.emit(True, len(questions), f"Loading cancelled after {len(questions)} questions")
+            elif questions:
+                message = f"Extracted {len(questions)} questions"
+                is_valid, report = QuestionValidator.validate_questions(questions)
+                if not is_valid:
+                    message += f" ({report['valid']} valid, {report['invalid']} need verification)"
                 self.progress.emit(f"✓ Loaded {len(questions)} questions")
-                self.finished.emit(True, questions, message)
+                self.finished.emit(True, len(questions), message)
             else:
-                self.finished.emit(False, {}, message)
+                self.finished.emit(False, 0, "No questions found in PDF")
         except Exception as e:
-            self.finished.emit(False, {}, f"Error loading PDF: {str(e)}")
+            self.finished.emit(False, 0, f"Error loading PDF: {str(e)}")
+
+
+class QuestionListModel(QAbstractListModel):
+    """Checkable list of loaded questions, shown by a QListView.
+    
+    The view only asks for the rows on screen, so loading thousands of
+    questions creates no widgets. Check states are stored as a default
+    plus the IDs toggled away from it: select all, deselect all and a
+    random selection replace that state in one step and emit a single
+    dataChanged for the whole list.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._questions = {}
+        self._ids = []
+        self._default_checked = False
+        self._toggled = set()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        qid = self._ids[index.row()]
+        if role == Qt.DisplayRole:
+            return f"Q{qid}: {self._questions[qid].get('question', 'Unknown')[:60]}..."
+        if role == Qt.ToolTipRole:
+            return self._questions[qid].get('question', '')
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.is_checked(qid) else Qt.Unchecked
+        if role == Qt.UserRole:
+            return qid
+        return None
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        qid = self._ids[index.row()]
+        if (value == Qt.Checked) != self.is_checked(qid):
+            self._toggled ^= {qid}
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+    
+    def is_checked(self, question_id):
+        """Check whether a question is ticked."""
+        return self._default_checked != (question_id in self._toggled)
+    
+    def set_questions(self, questions):
+        """Show a new set of questions {id: question_data}, none ticked."""
+        self.beginResetModel()
+        self._questions = dict(questions)
+        self._ids = sorted(questions)
+        self._default_checked = False
+        self._toggled = set()
+        self.endResetModel()
+    
+    def add_questions(self, questions):
+        """Append questions {id: question_data} while a PDF is loading.
+        
+        New rows start unticked, even after select all.
+        """
+        new_ids = sorted(qid for qid in questions if qid not in self._questions)
+        self._questions.update(questions)
+        if not new_ids:
+            return
+        if self._default_checked:
+            self._toggled.update(new_ids)
+        if self._ids and new_ids[0] < self._ids[-1]:
+            # Out of order: rebuild the rows, keeping the check states
+            self.beginResetModel()
+            self._ids = sorted(self._questions)
+            self.endResetModel()
+            return
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_ids) - 1)
+        self._ids.extend(new_ids)
+        self.endInsertRows()
+    
+    def set_all_checked(self, checked):
+        """Tick or untick every question."""
+        self._default_checked = checked
+        self._toggled = set()
+        self._all_changed()
+    
+    def set_checked_ids(self, question_ids):
+        """Tick exactly the given questions."""
+        self._default_checked = False
+        self._toggled = set(question_ids)
+        self._all_changed()
+    
+    def set_checked(self, question_ids, checked):
+        """Tick or untick some questions (e.g. the rows a filter shows)."""
+        for qid in question_ids:
+            if self.is_checked(qid) != checked:
+                self._toggled ^= {qid}
+        self._all_changed()
+    
+    def checked_ids(self):
+        """IDs of the ticked questions, in order."""
+        if self._default_checked:
+            return [qid for qid in self._ids if qid not in self._toggled]
+        return sorted(self._toggled)
+    
+    def _all_changed(self):
+        if self._ids:
+            self.dataChanged.emit(self.index(0), self.index(len(self._ids) - 1), [Qt.CheckStateRole])
+
+
+class LogPanel(QPlainTextEdit):
+    """Read-only status log that stays fast over a long session.
+    
+    Messages wait in a bounded buffer and are written out together at most
+    every FLUSH_INTERVAL ms with appendPlainText, so a burst of progress
+    messages from a worker costs one update. The document keeps only the
+    last MAX_LINES lines.
+    """
+    
+    MAX_LINES = 1000
+    FLUSH_INTERVAL = 100
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(self.MAX_LINES)
+        self._pending = deque(maxlen=self.MAX_LINES)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush)
+    
+    def log(self, message):
+        """Queue a message; it is shown within FLUSH_INTERVAL ms."""
+        self._pending.append(str(message))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Write out the queued messages and scroll to the newest."""
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending.clear()
+        self.appendPlainText(text)
+        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
 
 
 class MCQPaperGeneratorGUI(QMainWindow):
     """Main GUI application window with PDF loading."""
     
+    DEFAULT_PARALLEL_JOBS = 2
+    MAX_PARALLEL_JOBS = 8
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("MCQ Paper Generator - PDF Edition")
         self.setGeometry(100, 100, 1300, 850)
         
         self.loaded_questions = {}
-        self.selected_questions = {}
         self.pdf_path = None
-        self.generator_thread = None
         self.loader_thread = None
         
+        # Paper generation queue: jobs run on a pool, several at a time
+        self.job_pool = QThreadPool(self)
+        self.job_pool.setMaxThreadCount(self.DEFAULT_PARALLEL_JOBS)
+        self.jobs = {}
+        self.job_rows = {}
+        self.next_job_id = 1
+        
         # Check license
         if not self.check_license():
             sys.exit(1)
@@ -156,13 +443,24 @@ class MCQPaperGeneratorGUI(QMainWindow):
         self.pdf_label.setStyleSheet("color: gray;")
         pdf_btn_layout.addWidget(self.pdf_label)
         
-        load_pdf_btn = QPushButton("Load PDF")
-        load_pdf_btn.setStyleSheet("background-color: #2196F3; color: white; padding: 8px;")
-        load_pdf_btn.clicked.connect(self.load_pdf)
-        pdf_btn_layout.addWidget(load_pdf_btn)
+        self.load_pdf_btn = QPushButton("Load PDF")
+        self.load_pdf_btn.setStyleSheet("background-color: #2196F3; color: white; padding: 8px;")
+        self.load_pdf_btn.clicked.connect(self.load_pdf)
+        pdf_btn_layout.addWidget(self.load_pdf_btn)
+        
+        self.cancel_load_btn = QPushButton("Cancel")
+        self.cancel_load_btn.clicked.connect(self.cancel_pdf_loading)
+        self.cancel_load_btn.hide()
+        pdf_btn_layout.addWidget(self.cancel_load_btn)
         
         left_layout.addLayout(pdf_btn_layout)
         
+        # Page progress while a PDF is loading
+        self.load_progress = QProgressBar()
+        self.load_progress.setFormat("Page %v of %m")
+        self.load_progress.hide()
+        left_layout.addWidget(self.load_progress)
+        
         left_layout.addWidget(QLabel(""))
         
         # College Name
@@ -249,10 +547,9 @@ class MCQPaperGeneratorGUI(QMainWindow):
         
         # Status
         left_layout.addWidget(QLabel("Status:"))
-        self.status_label = QTextEdit()
-        self.status_label.setReadOnly(True)
-        self.status_label.setMaximumHeight(120)
-        left_layout.addWidget(self.status_label)
+        self.status_log = LogPanel()
+        self.status_log.setMaximumHeight(120)
+        left_layout.addWidget(self.status_log)
         
         left_layout.addStretch()
         left_panel.setLayout(left_layout)
@@ -265,20 +562,27 @@ class MCQPaperGeneratorGUI(QMainWindow):
         
         right_layout.addWidget(QLabel("Questions from PDF:"))
         
-        # Questions scroll area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        
-        questions_widget = QWidget()
-        self.questions_layout = QVBoxLayout()
-        
-        self.question_checkboxes = {}
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter questions...")
+        right_layout.addWidget(self.filter_input)
+        
+        self.no_pdf_label = QLabel("⚠️ No PDF loaded. Click 'Load PDF' to get started.")
+        self.no_pdf_label.setStyleSheet("color: gray; font-style: italic;")
+        right_layout.addWidget(self.no_pdf_label)
+        
+        # Questions list: only the visible rows are rendered
+        self.question_model = QuestionListModel(self)
+        self.question_filter = QSortFilterProxyModel(self)
+        self.question_filter.setSourceModel(self.question_model)
+        self.question_filter.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.filter_input.textChanged.connect(self.question_filter.setFilterFixedString)
+        
+        self.questions_view = QListView()
+        self.questions_view.setModel(self.question_filter)
+        self.questions_view.setUniformItemSizes(True)
+        right_layout.addWidget(self.questions_view)
         self.update_questions_display()
         
-        questions_widget.setLayout(self.questions_layout)
-        scroll.setWidget(questions_widget)
-        right_layout.addWidget(scroll)
-        
         # Select/Deselect all buttons
         button_layout = QHBoxLayout()
         
@@ -296,6 +600,36 @@ class MCQPaperGeneratorGUI(QMainWindow):
         
         right_layout.addLayout(button_layout)
         
+        # Generation queue: one row per paper, with its progress
+        right_layout.addWidget(QLabel("Generation Queue:"))
+        self.jobs_table = QTableWidget(0, 3)
+        self.jobs_table.setHorizontalHeaderLabels(["Paper", "Questions", "Progress"])
+        self.jobs_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.jobs_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.jobs_table.verticalHeader().hide()
+        self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.jobs_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.jobs_table.setMaximumHeight(160)
+        right_layout.addWidget(self.jobs_table)
+        
+        queue_layout = QHBoxLayout()
+        queue_layout.addWidget(QLabel("Run at once:"))
+        self.parallel_jobs = QSpinBox()
+        self.parallel_jobs.setRange(1, self.MAX_PARALLEL_JOBS)
+        self.parallel_jobs.setValue(self.job_pool.maxThreadCount())
+        self.parallel_jobs.valueChanged.connect(self.job_pool.setMaxThreadCount)
+        queue_layout.addWidget(self.parallel_jobs)
+        queue_layout.addStretch()
+        
+        cancel_job_btn = QPushButton("Cancel Selected")
+        cancel_job_btn.clicked.connect(self.cancel_selected_jobs)
+        queue_layout.addWidget(cancel_job_btn)
+        
+        clear_jobs_btn = QPushButton("Clear Finished")
+        clear_jobs_btn.clicked.connect(self.clear_finished_jobs)
+        queue_layout.addWidget(clear_jobs_btn)
+        right_layout.addLayout(queue_layout)
+        
         right_panel.setLayout(right_layout)
         
         main_layout.addWidget(right_panel, 1)
@@ -303,39 +637,9 @@ class MCQPaperGeneratorGUI(QMainWindow):
         main_widget.setLayout(main_layout)
     
     def update_questions_display(self):
-        """Update the questions checkbox display."""
-        # Clear existing checkboxes
-        while self.questions_layout.count():
-            item = self.questions_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        self.question_checkboxes = {}
-        
-        if not self.loaded_questions:
-            no_pdf = QLabel("⚠️ No PDF loaded. Click 'Load PDF' to get started.")
-            no_pdf.setStyleSheet("color: gray; font-style: italic;")
-            self.questions_layout.addWidget(no_pdf)
-            return
-        
-        for qid in sorted(self.loaded_questions.keys()):
-            question = self.loaded_questions[qid]
-            q_text = question.get('question', 'Unknown')[:60]
-            
-            checkbox = QCheckBox(f"Q{qid}: {q_text}...")
-            checkbox.setChecked(self.selected_questions.get(qid, False))
-            checkbox.stateChanged.connect(lambda checked=None, q=qid: self.on_question_checked(q))
-            
-            self.question_checkboxes[qid] = checkbox
-            self.questions_layout.addWidget(checkbox)
-        
-        self.questions_layout.addStretch()
-    
-    def on_question_checked(self, question_id):
-        """Handle question checkbox state change."""
-        checkbox = self.question_checkboxes.get(question_id)
-        if checkbox:
-            self.selected_questions[question_id] = checkbox.isChecked()
+        """Show the loaded questions in the list."""
+        self.question_model.set_questions(self.loaded_questions)
+        self.no_pdf_label.setVisible(not self.loaded_questions)
     
     def load_pdf(self):
         """Load PDF file and extract questions."""
@@ -349,32 +653,71 @@ class MCQPaperGeneratorGUI(QMainWindow):
         self.pdf_path = file_path
         self.update_status(f"Loading: {Path(file_path).name}...")
         
+        # Questions appear in the list as pages are parsed
+        self.loaded_questions = {}
+        self.update_questions_display()
+        self.pdf_label.setText(f"Loading {Path(file_path).name}...")
+        self.pdf_label.setStyleSheet("color: gray;")
+        self.load_pdf_btn.setEnabled(False)
+        self.cancel_load_btn.setEnabled(True)
+        self.cancel_load_btn.show()
+        self.load_progress.setRange(0, 0)
+        self.load_progress.show()
+        
         # Start loading thread
         self.loader_thread = PDFLoaderThread(file_path)
         self.loader_thread.progress.connect(self.update_status)
+        self.loader_thread.page_progress.connect(self.pdf_page_loaded)
+        self.loader_thread.questions_found.connect(self.pdf_questions_found)
         self.loader_thread.finished.connect(self.pdf_loading_finished)
         self.loader_thread.start()
     
-    def pdf_loading_finished(self, success, questions, message):
+    def cancel_pdf_loading(self):
+        """Stop loading the PDF after the current page, keeping the questions found so far."""
+        if self.loader_thread and self.loader_thread.isRunning():
+            self.loader_thread.requestInterruption()
+            self.cancel_load_btn.setEnabled(False)
+            self.update_status("Cancelling...")
+    
+    def pdf_page_loaded(self, page_num, total_pages):
+        """Show page progress of the PDF being loaded."""
+        self.load_progress.setRange(0, total_pages)
+        self.load_progress.setValue(page_num)
+    
+    def pdf_questions_found(self, questions):
+        """Add a batch of questions parsed from the PDF being loaded."""
+        was_empty = not self.loaded_questions
+        self.loaded_questions.update(questions)
+        self.question_model.add_questions(questions)
+        self.no_pdf_label.hide()
+        self.random_count.setMaximum(max(len(self.loaded_questions), 1))
+        if was_empty:
+            self.random_count.setValue(min(5, len(self.loaded_questions)))
+        self.pdf_label.setText(f"Loading {Path(self.pdf_path).name} ({len(self.loaded_questions)} questions)...")
+    
+    def pdf_loading_finished(self, success, count, message):
         """Handle PDF loading completion."""
+        self.load_pdf_btn.setEnabled(True)
+        self.cancel_load_btn.hide()
+        self.load_progress.hide()
+        cancelled = self.loader_thread.isInterruptionRequested()
+        
         if success:
-            self.loaded_questions = questions
-            self.selected_questions = {}
-            self.random_count.setMaximum(len(questions))
-            self.random_count.setValue(min(5, len(questions)))
-            
-            self.pdf_label.setText(f"✓ {Path(self.pdf_path).name} ({len(questions)} questions)")
-            self.pdf_label.setStyleSheet("color: green; font-weight: bold;")
+            self.random_count.setMaximum(max(count, 1))
             
-            self.update_questions_display()
+            self.pdf_label.setText(f"✓ {Path(self.pdf_path).name} ({count} questions)")
+            self.pdf_label.setStyleSheet("color: orange; font-weight: bold;" if cancelled
+                                         else "color: green; font-weight: bold;")
             self.update_status(f"✓ {message}")
             
-            QMessageBox.information(
-                self, "Success",
-                f"Loaded {len(questions)} questions from PDF\n\nSelect questions and click 'Generate Papers'"
-            )
+            if not cancelled:
+                QMessageBox.information(
+                    self, "Success",
+                    f"Loaded {count} questions from PDF\n\nSelect questions and click 'Generate Papers'"
+                )
         else:
             self.update_status(f"✗ Failed to load PDF: {message}")
+            self.pdf_label.setText("No PDF loaded")
             self.pdf_label.setStyleSheet("color: red;")
             QMessageBox.critical(self, "Error", f"Failed to load PDF:\n{message}")
     
@@ -388,17 +731,24 @@ class MCQPaperGeneratorGUI(QMainWindow):
         if folder:
             self.output_input.setText(folder)
     
+    def filtered_question_ids(self):
+        """IDs of the questions the filter currently shows."""
+        rows = range(self.question_filter.rowCount())
+        return [self.question_filter.index(row, 0).data(Qt.UserRole) for row in rows]
+    
     def select_all_questions(self):
-        """Select all questions."""
-        for qid, checkbox in self.question_checkboxes.items():
-            checkbox.setChecked(True)
-            self.selected_questions[qid] = True
+        """Select all questions (those matching the filter, if one is set)."""
+        if self.filter_input.text():
+            self.question_model.set_checked(self.filtered_question_ids(), True)
+        else:
+            self.question_model.set_all_checked(True)
     
     def deselect_all_questions(self):
-        """Deselect all questions."""
-        for qid, checkbox in self.question_checkboxes.items():
-            checkbox.setChecked(False)
-            self.selected_questions[qid] = False
+        """Deselect all questions (those matching the filter, if one is set)."""
+        if self.filter_input.text():
+            self.question_model.set_checked(self.filtered_question_ids(), False)
+        else:
+            self.question_model.set_all_checked(False)
     
     def randomize_selection(self):
         """Randomly select questions."""
@@ -406,26 +756,16 @@ class MCQPaperGeneratorGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "Please load a PDF first")
             return
         
-        # Deselect all
-        for checkbox in self.question_checkboxes.values():
-            checkbox.setChecked(False)
-        
-        # Select random count
         count = self.random_count.value()
         available_ids = list(self.loaded_questions.keys())
         selected_ids = random.sample(available_ids, min(count, len(available_ids)))
-        
-        for qid in selected_ids:
-            if qid in self.question_checkboxes:
-                self.question_checkboxes[qid].setChecked(True)
-                self.selected_questions[qid] = True
+        self.question_model.set_checked_ids(selected_ids)
         
         self.update_status(f"✓ Randomly selected {len(selected_ids)} questions")
     
     def get_selected_questions(self):
         """Get IDs of selected questions."""
-        selected = [qid for qid, is_selected in self.selected_questions.items() if is_selected]
-        return selected
+        return self.question_model.checked_ids()
     
     def generate_papers_random(self):
         """Generate papers with random selection."""
@@ -480,32 +820,95 @@ class MCQPaperGeneratorGUI(QMainWindow):
             QMessageBox.warning(self, "Error", "Please enter Exam Name")
             return
         
-        self.update_status(message + "\n\nGenerating documents...\n")
-        
-        # Create and start thread
-        self.generator_thread = DocumentGeneratorThread(
-            college_name, exam_name, exam_date, questions, output_dir
-        )
-        self.generator_thread.progress.connect(self.update_status)
-        self.generator_thread.finished.connect(self.generation_finished)
-        self.generator_thread.start()
+        # Queue a job; the pool starts it when a slot is free
+        job = GenerationJob(self.next_job_id, college_name, exam_name, exam_date, questions, output_dir)
+        self.next_job_id += 1
+        job.signals.progress.connect(self.job_progress)
+        job.signals.finished.connect(self.job_finished)
+        self.jobs[job.job_id] = job
+        
+        row = self.jobs_table.rowCount()
+        self.jobs_table.insertRow(row)
+        name = QTableWidgetItem(f"{exam_name} ({exam_date})")
+        name.setData(Qt.UserRole, job.job_id)
+        name.setToolTip(f"{college_name}\n{os.path.abspath(output_dir)}")
+        self.jobs_table.setItem(row, 0, name)
+        self.jobs_table.setItem(row, 1, QTableWidgetItem(str(len(questions))))
+        progress = QProgressBar()
+        progress.setRange(0, GenerationJob.STEPS)
+        progress.setValue(0)
+        progress.setFormat("Queued")
+        self.jobs_table.setCellWidget(row, 2, progress)
+        self.job_rows[job.job_id] = name
+        
+        self.update_status(f"[Job {job.job_id}] {message} - queued")
+        self.job_pool.start(job)
     
-    def update_status(self, message):
-        """Update status display."""
-        current = self.status_label.toPlainText()
-        self.status_label.setText(current + message + "\n")
-        self.status_label.verticalScrollBar().setValue(
-            self.status_label.verticalScrollBar().maximum()
-        )
+    def job_progress_bar(self, job_id):
+        """Progress bar of a job's row in the queue panel."""
+        return self.jobs_table.cellWidget(self.job_rows[job_id].row(), 2)
+    
+    def job_progress(self, job_id, step, message):
+        """Show a job's current step."""
+        if job_id not in self.job_rows:
+            return
+        progress = self.job_progress_bar(job_id)
+        progress.setValue(step)
+        progress.setFormat(message)
+        self.update_status(f"[Job {job_id}] {message}")
     
-    def generation_finished(self, success, message):
-        """Handle generation completion."""
+    def job_finished(self, job_id, success, message):
+        """Handle completion, failure or cancellation of a job."""
+        job = self.jobs.get(job_id)
+        if job_id not in self.job_rows or job is None:
+            return
+        progress = self.job_progress_bar(job_id)
         if success:
-            self.update_status(f"\n✓ {message}")
-            QMessageBox.information(self, "Success", message)
+            progress.setValue(GenerationJob.STEPS)
+            progress.setFormat("✓ Done")
+            self.update_status(f"[Job {job_id}] ✓ {message}")
+        elif job.is_cancelled():
+            progress.setFormat("Cancelled")
+            self.update_status(f"[Job {job_id}] Cancelled")
         else:
-            self.update_status(f"\n✗ {message}")
-            QMessageBox.critical(self, "Error", message)
+            progress.setFormat("✗ Failed")
+            progress.setToolTip(message)
+            self.update_status(f"[Job {job_id}] ✗ {message}")
+        job.done = True
+    
+    def cancel_jobs(self, job_ids):
+        """Cancel jobs: queued ones are dropped, running ones stop after their current step."""
+        for job_id in job_ids:
+            job = self.jobs.get(job_id)
+            if job is None or job.done or job.is_cancelled():
+                continue
+            job.cancel()
+            if self.job_pool.tryTake(job):
+                self.job_finished(job_id, False, "Cancelled")
+            else:
+                self.job_progress_bar(job_id).setFormat("Cancelling...")
+    
+    def cancel_selected_jobs(self):
+        """Cancel the jobs selected in the queue panel."""
+        rows = {index.row() for index in self.jobs_table.selectionModel().selectedRows()}
+        self.cancel_jobs([self.jobs_table.item(row, 0).data(Qt.UserRole) for row in rows])
+    
+    def clear_finished_jobs(self):
+        """Remove finished, failed and cancelled jobs from the queue panel."""
+        for job_id, job in list(self.jobs.items()):
+            if job.done:
+                self.jobs_table.removeRow(self.job_rows.pop(job_id).row())
+                del self.jobs[job_id]
+    
+    def closeEvent(self, event):
+        """Stop queued and running jobs before the window closes."""
+        self.cancel_jobs(list(self.jobs))
+        self.job_pool.waitForDone()
+        super().closeEvent(event)
+    
+    def update_status(self, message):
+        """Update status display."""
+        self.status_log.log(message)
     
     def load_output_folder(self):
         """Open output folder in file explorer."""
@@ -535,6 +938,11 @@ def main():
     window = MCQPaperGeneratorGUI()
     window.show()
     
+    # Startup benchmark (benchmarks/startup.py): record when the window is up, then quit
+    probe_file = os.environ.get('MCQ_STARTUP_PROBE')
+    if probe_file:
+        QTimer.singleShot(0, lambda: (Path(probe_file).write_text(repr(time.time())), app.quit()))
+    
     sys.exit(app.exec_())
 
 
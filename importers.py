@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Question Bank Import
+Loads questions into a QuestionDatabase from CSV, JSON-lines or Moodle
+GIFT files - the formats exporters.py writes. Files are read row by row,
+validated in batches and committed one batch at a time, so memory use
+stays flat however large the file is.
+
+Usage:
+    python importers.py questions.csv [--subject Physics] [--batch-size 1000]
+    python importers.py physics.gift --format gift
+"""
+
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+
+from database import normalize_options
+from pdf_extractor import QuestionValidator
+
+
+# CSV header aliases, lower-cased: column name -> question field
+CSV_FIELDS = {
+    'question': 'question', 'question_text': 'question', 'text': 'question',
+    'correct_answer': 'correct_answer', 'answer': 'correct_answer', 'correct': 'correct_answer',
+    'explanation': 'explanation', 'subject': 'subject', 'chapter': 'chapter', 'difficulty': 'difficulty',
+}
+CSV_OPTIONS = {'option_a': 'A', 'option_b': 'B', 'option_c': 'C', 'option_d': 'D',
+               'a': 'A', 'b': 'B', 'c': 'C', 'd': 'D'}
+
+
+def iter_csv(path):
+    """Yield (line, question, error) for each row of a CSV file with a header row."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [name.strip().lower() for name in header]
+        if 'question' not in [CSV_FIELDS.get(name) for name in columns]:
+            yield 1, None, "CSV header has no question column"
+            return
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            question = {'options': {}}
+            for name, value in zip(columns, row):
+                if name in CSV_OPTIONS:
+                    question['options'][CSV_OPTIONS[name]] = value.strip()
+                elif name in CSV_FIELDS and value.strip():
+                    question[CSV_FIELDS[name]] = value.strip()
+            yield reader.line_num, question, None
+
+
+def iter_jsonl(path):
+    """Yield (line, question, error) for each line of a JSON-lines file."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                question = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(question, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            # IDs belong to the bank being imported into
+            question.pop('id', None)
+            yield line_number, question, None
+
+
+UNESCAPED_RE = r'(?<!\\)(?:\\\\)*'
+GIFT_TITLE_RE = re.compile(r'^\s*::(.*?)' + UNESCAPED_RE + r'::')
+GIFT_WEIGHT_RE = re.compile(r'^%-?[\d.]+%')
+GIFT_DIFFICULTY_RE = re.compile(r'difficulty:\s*(\S+)')
+
+
+def gift_unescape(text):
+    """Undo GIFT escapes (\\~ \\= \\# \\{ \\} \\: \\n \\\\)."""
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), text, flags=re.DOTALL)
+
+
+def _find_unescaped(text, char, start=0):
+    """Index of the first unescaped char in text from start, or -1."""
+    i = start
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == char:
+            return i
+        i += 1
+    return -1
+
+
+def _gift_answers(body):
+    """Split a GIFT answer block into (marker, text) pairs; marker is '=', '~' or '####'."""
+    parts = []
+    marker = None
+    start = 0
+    i = 0
+    while i < len(body):
+        if body[i] == '\\':
+            i += 2
+            continue
+        if body.startswith('####', i) or body[i] in '=~':
+            if marker is not None:
+                parts.append((marker, body[start:i]))
+            marker = '####' if body[i] == '#' else body[i]
+            i += len(marker)
+            start = i
+            continue
+        i += 1
+    if marker is not None:
+        parts.append((marker, body[start:]))
+    return parts
+
+
+def parse_gift_question(text, subject=None, chapter=None, difficulty=None):
+    """Parse one GIFT multiple-choice question.
+
+    Returns:
+        Tuple (question, error): question dictionary, or None and a message
+    """
+    title = GIFT_TITLE_RE.match(text)
+    if title:
+        text = text[title.end():]
+    opening = _find_unescaped(text, '{')
+    closing = _find_unescaped(text, '}', opening + 1) if opening >= 0 else -1
+    if closing < 0:
+        return None, "No answer block { ... }"
+
+    options = []
+    correct = None
+    explanation = ''
+    for marker, answer in _gift_answers(text[opening + 1:closing]):
+        if marker == '####':
+            explanation = gift_unescape(answer).strip()
+            continue
+        # Drop per-answer feedback and partial-credit weights
+        feedback = _find_unescaped(answer, '#')
+        answer = answer[:feedback] if feedback >= 0 else answer
+        answer = GIFT_WEIGHT_RE.sub('', answer.strip())
+        if marker == '=' and correct is None:
+            correct = len(options)
+        options.append(gift_unescape(answer).strip())
+    if len(options) != 4:
+        return None, f"Expected 4 options, got {len(options)}"
+
+    question = {
+        'question': gift_unescape(text[:opening] + text[closing + 1:]).strip(),
+        'options': options,
+        'correct_answer': correct,
+        'explanation': explanation,
+    }
+    for key, value in (('subject', subject), ('chapter', chapter), ('difficulty', difficulty)):
+        if value:
+            question[key] = value
+    return question, None
+
+
+def iter_gift(path):
+    """Yield (line, question, error) for each question of a GIFT file.
+
+    Questions are separated by blank lines. A $CATEGORY: $course$/Subject/Chapter
+    line sets the subject and chapter of the questions after it, and a
+    'difficulty: X' comment (as written by exporters.py) their difficulty.
+    """
+    subject = chapter = difficulty = None
+    block = []
+    block_line = 0
+
+    def finish():
+        question, error = parse_gift_question('\n'.join(block), subject, chapter, difficulty)
+        block.clear()
+        return block_line, question, error
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            stripped = line.strip()
+            if stripped.startswith('//'):
+                match = GIFT_DIFFICULTY_RE.search(stripped)
+                difficulty = match.group(1) if match else difficulty
+                continue
+            if stripped.startswith('$CATEGORY:'):
+                path_parts = [part for part in stripped[len('$CATEGORY:'):].strip().split('/')
+                              if part and not part.startswith('$')]
+                subject = path_parts[0] if path_parts else None
+                chapter = path_parts[1] if len(path_parts) > 1 else None
+                continue
+            # A blank line ends a question once its answer block is closed
+            if not stripped and block and _find_unescaped('\n'.join(block), '}') >= 0:
+                yield finish()
+                difficulty = None
+                continue
+            if stripped or block:
+                if not block:
+                    block_line = line_number
+                block.append(line.rstrip('\n'))
+        if any(text.strip() for text in block):
+            yield finish()
+
+
+# format: (reader, file extensions)
+IMPORT_FORMATS = {
+    'csv': (iter_csv, ('.csv',)),
+    'jsonl': (iter_jsonl, ('.jsonl', '.ndjson')),
+    'gift': (iter_gift, ('.gift', '.txt')),
+}
+
+
+def detect_format(path):
+    """Guess the import format from a file extension.
+
+    Raises:
+        ValueError: If the extension is not recognised
+    """
+    suffix = Path(path).suffix.lower()
+    for name, (_, extensions) in IMPORT_FORMATS.items():
+        if suffix in extensions:
+            return name
+    raise ValueError(f"Cannot tell the format of '{path}'; use one of: {', '.join(IMPORT_FORMATS)}")
+
+
+def import_questions(db, rows, batch_size=1000, subject=None, chapter=None,
+                     max_errors=100, progress_callback=None):
+    """Validate and store questions, one batch per database commit.
+
+    Args:
+        db: QuestionDatabase to insert into
+        rows: Iterable of (line, question, error) from a reader
+        batch_size: Questions validated and committed together
+        subject: Subject for questions that do not name one
+        chapter: Chapter for questions that do not name one
+        max_errors: Error messages kept in the report (all are counted)
+        progress_callback: Optional function(report) called after each batch
+
+    Returns:
+        Report dictionary with read, imported, invalid, errors
+        [(line, messages)] and elapsed seconds
+    """
+    report = {'read': 0, 'imported': 0, 'invalid': 0, 'errors': [], 'elapsed': 0.0}
+    start = time.perf_counter()
+    batch = {}
+
+    def reject(line, messages):
+        report['invalid'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append((line, messages))
+
+    def commit():
+        _, validation = QuestionValidator.validate_batch(batch)
+        for line, messages in validation['errors'].items():
+            reject(line, messages)
+            del batch[line]
+        report['imported'] += len(db.add_questions(batch.values()))
+        batch.clear()
+        report['elapsed'] = time.perf_counter() - start
+        if progress_callback:
+            progress_callback(report)
+
+    for line, question, error in rows:
+        report['read'] += 1
+        if error:
+            reject(line, [error])
+            continue
+        options = question.get('options')
+        if isinstance(options, list) and len(options) != 4:
+            reject(line, [f"Expected 4 options, got {len(options)}"])
+            continue
+        question['options'], question['correct_answer'] = normalize_options(
+            options, question.get('correct_answer'))
+        if subject and not question.get('subject'):
+            question['subject'] = subject
+        if chapter and not question.get('chapter'):
+            question['chapter'] = chapter
+        batch[line] = question
+        if len(batch) >= batch_size:
+            commit()
+    if batch:
+        commit()
+    report['elapsed'] = time.perf_counter() - start
+    return report
+
+
+def import_file(db, path, import_format=None, **options):
+    """Import a CSV, JSON-lines or GIFT file (format guessed from the extension).
+
+    Keyword arguments are passed to import_questions.
+
+    Returns:
+        Report dictionary (see import_questions)
+    """
+    reader = IMPORT_FORMATS[import_format or detect_format(path)][0]
+    return import_questions(db, reader(path), **options)
+
+
+def main():
+    """Command-line entry point for importing a file into the bank."""
+    parser = argparse.ArgumentParser(description="Import questions from CSV, JSON-lines or GIFT")
+    parser.add_argument('source', help="File to import")
+    parser.add_argument('--format', choices=sorted(IMPORT_FORMATS), default=None,
+                        help="Input format (default: from the file extension)")
+    parser.add_argument('--subject', default=None, help="Subject for questions without one")
+    parser.add_argument('--chapter', default=None, help="Chapter for questions without one")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Questions per commit")
+    parser.add_argument('--db', default='questions_db.json', help="Question database file")
+    args = parser.parse_args()
+
+    def progress(report):
+        rate = report['read'] / report['elapsed'] if report['elapsed'] else 0.0
+        print(f"\r{report['read']} read, {report['imported']} imported, "
+              f"{report['invalid']} invalid ({rate:.0f} rows/s)", end='', flush=True)
+
+    from database import QuestionDatabase
+    db = QuestionDatabase(args.db)
+    try:
+        report = import_file(db, args.source, args.format, subject=args.subject, chapter=args.chapter,
+                             batch_size=args.batch_size, progress_callback=progress)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("IMPORT SUMMARY")
+    print("="*60)
+    print(f"Rows read:  {report['read']}")
+    print(f"Imported:   {report['imported']}")
+    print(f"Invalid:    {report['invalid']}")
+    print(f"Elapsed:    {report['elapsed']:.2f}s")
+    for line, messages in report['errors']:
+        print(f"  ✗ line {line}: {'; '.join(messages)}")
+    if report['invalid'] > len(report['errors']):
+        print(f"  ... and {report['invalid'] - len(report['errors'])} more")
+
+    sys.exit(1 if report['invalid'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Checkpointed PDF Ingestion
+Loads questions from PDF files into the question database page by page,
+recording progress so an interrupted ingest can resume where it stopped.
+
+Run as a script to bulk-ingest a folder of PDFs:
+    python ingest.py question_banks/ --subject Physics --workers 4
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf_extractor import PDFQuestionExtractor, QuestionParser
+from atomic_write import atomic_write_json
+from file_lock import FileLock
+
+# Shared by the web app's uploads and the bulk ingest command, so each
+# sees (and resumes) the other's partial ingests
+CHECKPOINT_FILE = os.path.join('uploads', 'ingest_checkpoints.json')
+
+
+def file_fingerprint(file_path, chunk_size=1024 * 1024):
+    """Hash a file's contents so re-uploads of the same PDF are recognised.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex SHA-256 digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def question_fingerprint(question_data):
+    """Hash a question's content, used to avoid duplicate inserts.
+
+    Args:
+        question_data: Dictionary with question and options
+
+    Returns:
+        Hex SHA-1 digest of the question text and options
+    """
+    payload = json.dumps(
+        [question_data.get('question', ''), question_data.get('options', {})],
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class IngestCheckpoint:
+    """Persist per-source ingest progress in a JSON file.
+
+    The web app and the bulk ingest command share the file, so every
+    update takes <checkpoint_file>.lock and reloads the file before
+    saving; one process never overwrites another's progress.
+    """
+
+    def __init__(self, checkpoint_file=CHECKPOINT_FILE):
+        self.checkpoint_file = Path(checkpoint_file)
+        self.lock = FileLock(self.checkpoint_file.with_name(self.checkpoint_file.name + '.lock'))
+        self.sources = {}
+        self.load()
+
+    def load(self):
+        """Load checkpoints from file."""
+        with self.lock:
+            if self.checkpoint_file.exists():
+                with open(self.checkpoint_file, 'r') as f:
+                    self.sources = json.load(f).get('sources', {})
+
+    def save(self):
+        """Save checkpoints to file."""
+        atomic_write_json(self.checkpoint_file, {'sources': self.sources})
+
+    def get(self, source_key):
+        """Get the checkpoint for a source, creating an empty one if needed."""
+        return self.sources.setdefault(source_key, {
+            'next_page': 1,
+            'total_pages': None,
+            'question_ids': [],
+            'fingerprints': [],
+            'pending': [],
+            'completed': False,
+            'updated': None
+        })
+
+    def reset(self, source_key):
+        """Forget a source, so its next ingest starts from scratch."""
+        with self.lock:
+            self.load()
+            if self.sources.pop(source_key, None) is not None:
+                self.save()
+
+    def forget(self, source_key, question_ids):
+        """Drop questions (e.g. deleted from the bank) from a source's checkpoint.
+
+        The source is reopened from its first page; questions still in
+        the checkpoint are skipped by fingerprint when it is parsed again.
+        """
+        question_ids = set(question_ids)
+        with self.lock:
+            self.load()
+            entry = self.get(source_key)
+            kept = [(qid, fingerprint) for qid, fingerprint in zip(entry['question_ids'], entry['fingerprints'])
+                    if qid not in question_ids]
+            entry['question_ids'] = [qid for qid, _ in kept]
+            entry['fingerprints'] = [fingerprint for _, fingerprint in kept]
+            entry['next_page'] = 1
+            entry['total_pages'] = None
+            entry['pending'] = []
+            entry['completed'] = False
+            entry['updated'] = datetime.now().isoformat()
+            self.save()
+
+    def begin_commit(self, source_key, fingerprints):
+        """Note fingerprints about to be inserted, before the database write.
+
+        If the process dies after the insert but before record_page, the
+        next ingest finds these in the bank (see recover_pending) instead
+        of inserting them again.
+        """
+        with self.lock:
+            self.load()
+            entry = self.get(source_key)
+            entry['pending'] = list(fingerprints)
+            self.save()
+
+    def record_page(self, source_key, next_page, total_pages, question_ids, fingerprints):
+        """Record that everything before next_page has been committed.
+
+        Args:
+            source_key: Fingerprint of the source file
+            next_page: First page that still needs to be parsed
+            total_pages: Number of pages in the source
+            question_ids: Database IDs inserted since the last checkpoint
+            fingerprints: Content fingerprints of those questions
+        """
+        with self.lock:
+            self.load()
+            entry = self.get(source_key)
+            entry['next_page'] = next_page
+            entry['total_pages'] = total_pages
+            entry['question_ids'].extend(question_ids)
+            entry['fingerprints'].extend(fingerprints)
+            entry['pending'] = []
+            entry['updated'] = datetime.now().isoformat()
+            self.save()
+
+    def mark_completed(self, source_key, subject=None, chapter=None):
+        """Mark a source as fully ingested (under the given subject and chapter)."""
+        with self.lock:
+            self.load()
+            entry = self.get(source_key)
+            entry['completed'] = True
+            entry['subject'] = subject
+            entry['chapter'] = chapter
+            entry['updated'] = datetime.now().isoformat()
+            self.save()
+
+
+def commit_questions(db, checkpoint, source_key, questions, seen, next_page, total_pages, occurrences=None):
+    """Insert the questions not seen before and checkpoint them.
+
+    A question's fingerprint is its content hash plus its page and the
+    number of identical questions before it on that page, so a question
+    genuinely repeated in a PDF is kept while a re-parsed one is skipped.
+    Fingerprints are stored on the records and written to the checkpoint
+    as pending before the insert, so a crash between the database write
+    and the checkpoint never leads to a second insert.
+
+    Args:
+        db: QuestionDatabase to insert into
+        checkpoint: IngestCheckpoint store
+        source_key: Fingerprint of the source file
+        questions: Question dictionaries, already tagged with subject etc.
+        seen: Set of fingerprints already stored for this source (updated)
+        next_page: First page that still needs to be parsed
+        total_pages: Number of pages in the source
+        occurrences: Counter of (content hash, page) pairs parsed so far in
+            this run (updated); needed when one page spans several calls
+
+    Returns:
+        List of new question IDs
+    """
+    if occurrences is None:
+        occurrences = Counter()
+    new_questions = []
+    new_fingerprints = []
+    for question in questions:
+        occurrence = (question_fingerprint(question), question.get('page'))
+        fingerprint = f"{occurrence[0]}:{occurrence[1]}:{occurrences[occurrence]}"
+        occurrences[occurrence] += 1
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        question['fingerprint'] = fingerprint
+        new_questions.append(question)
+        new_fingerprints.append(fingerprint)
+    if new_fingerprints:
+        checkpoint.begin_commit(source_key, new_fingerprints)
+    question_ids = db.add_questions(new_questions)
+    checkpoint.record_page(source_key, next_page, total_pages, question_ids, new_fingerprints)
+    return question_ids
+
+
+def recover_pending(db, checkpoint, source_key):
+    """Finish a commit interrupted between the database write and its checkpoint.
+
+    Questions with pending fingerprints that did reach the bank are
+    recorded as committed; the rest are dropped from pending and will be
+    inserted when their page is parsed again.
+    """
+    with checkpoint.lock:
+        checkpoint.load()
+        entry = checkpoint.get(source_key)
+        pending = set(entry.get('pending') or ())
+        if not pending:
+            return
+        question_ids = []
+        fingerprints = []
+        for question in db.get_all_questions():
+            fingerprint = question.get('fingerprint')
+            if fingerprint in pending:
+                pending.discard(fingerprint)
+                question_ids.append(question['id'])
+                fingerprints.append(fingerprint)
+        checkpoint.record_page(source_key, entry['next_page'], entry['total_pages'], question_ids, fingerprints)
+
+
+def reconcile_checkpoint(db, checkpoint, source_key):
+    """Reopen a source whose questions were deleted from the bank.
+
+    Without this a finished checkpoint would block the file for good, and
+    re-uploading it after deleting its questions would add nothing.
+
+    Returns:
+        The source's (possibly reopened) checkpoint entry
+    """
+    entry = checkpoint.get(source_key)
+    missing = [qid for qid in entry['question_ids'] if db.get_question(qid) is None]
+    if missing or (entry['completed'] and not entry['question_ids']):
+        checkpoint.forget(source_key, missing)
+    return checkpoint.get(source_key)
+
+
+class CheckpointedIngestor:
+    """Ingest PDF questions into a QuestionDatabase with resumable progress."""
+
+    def __init__(self, db, checkpoint=None):
+        """
+        Initialize the ingestor.
+
+        Args:
+            db: QuestionDatabase to insert into
+            checkpoint: IngestCheckpoint store (default: CHECKPOINT_FILE)
+        """
+        self.db = db
+        self.checkpoint = checkpoint or IngestCheckpoint()
+
+    def ingest(self, pdf_path, subject='General', chapter='Chapter 1', progress_callback=None):
+        """Ingest a PDF, resuming from its last checkpoint if one exists.
+
+        Questions are committed to the database after each page. A question
+        that is still open at a page boundary is not committed; the next
+        checkpoint points back at the page where it started, and content
+        fingerprints keep re-parsed questions from being inserted twice.
+
+        Args:
+            pdf_path: Path to PDF file
+            subject: Subject assigned to every extracted question
+            chapter: Chapter assigned to every extracted question
+            progress_callback: Optional callable(page_num, total_pages, added)
+
+        Returns:
+            Tuple (success, added_count, message)
+        """
+        source_key = file_fingerprint(pdf_path)
+        # Pick up progress other processes made on this file
+        self.checkpoint.load()
+        recover_pending(self.db, self.checkpoint, source_key)
+        entry = reconcile_checkpoint(self.db, self.checkpoint, source_key)
+        if entry['completed']:
+            count = len(entry['question_ids'])
+            previous = (entry.get('subject'), entry.get('chapter'))
+            if None not in previous and previous != (subject, chapter):
+                return True, 0, (f"Already ingested under {previous[0]} / {previous[1]} ({count} questions); "
+                                 f"nothing was added to {subject} / {chapter}")
+            return True, 0, f"Already ingested ({count} questions)"
+
+        seen = set(entry['fingerprints'])
+        occurrences = Counter()
+        start_page = entry['next_page']
+        extractor = PDFQuestionExtractor(pdf_path)
+        parser = QuestionParser()
+        added = 0
+
+        def commit(completed, next_page, total_pages):
+            questions = []
+            for question, page in completed:
+                question['subject'] = subject
+                question['chapter'] = chapter
+                question['source'] = Path(pdf_path).name
+                question['page'] = page
+                questions.append(question)
+            return len(commit_questions(self.db, self.checkpoint, source_key, questions,
+                                        seen, next_page, total_pages, occurrences))
+
+        try:
+            total_pages = entry['total_pages']
+            for page_num, total_pages, page_text in extractor.iter_pages(start_page):
+                completed = []
+                for line in page_text.split('\n'):
+                    question = parser.feed(line, page_num)
+                    if question:
+                        completed.append(question)
+
+                # Resume from the page holding the open question, if any
+                next_page = parser.pending_page or page_num + 1
+                added += commit(completed, next_page, total_pages)
+
+                if progress_callback:
+                    progress_callback(page_num, total_pages, added)
+
+            last = parser.finish()
+            completed = [last] if last else []
+            if not completed and not self.checkpoint.get(source_key)['question_ids']:
+                # Nothing numbered was found anywhere; use the block-based fallback
+                completed = [(q, None) for q in extractor._fallback_extraction().values()]
+            added += commit(completed, (total_pages or 0) + 1, total_pages)
+        except Exception as e:
+            resume_page = self.checkpoint.get(source_key)['next_page']
+            return False, added, f"Ingest stopped at page {resume_page}: {str(e)}"
+
+        # Updates reload the file, so look the entry up again
+        total = len(self.checkpoint.get(source_key)['question_ids'])
+        if total == 0:
+            # Leave no checkpoint, so a later upload is parsed again
+            self.checkpoint.reset(source_key)
+            return False, 0, "No questions found in PDF"
+        self.checkpoint.mark_completed(source_key, subject, chapter)
+        if added == total:
+            return True, added, f"Extracted {added} questions"
+        return True, added, f"Resumed ingest: added {added} questions ({total} total from this file)"
+
+
+def extract_file(pdf_path, start_page=1):
+    """Extract all questions from one PDF; runs inside a worker process.
+
+    Args:
+        pdf_path: Path to PDF file
+        start_page: First page to parse (resuming a partial ingest)
+
+    Returns:
+        Dictionary with path, source_key, pages, questions (each tagged with
+        source file and page) and error (None on success)
+    """
+    result = {'path': pdf_path, 'source_key': None, 'pages': 0, 'questions': [], 'error': None}
+    try:
+        result['source_key'] = file_fingerprint(pdf_path)
+        extractor = PDFQuestionExtractor(pdf_path)
+        parser = QuestionParser()
+        completed = []
+        for page_num, total_pages, page_text in extractor.iter_pages(start_page):
+            result['pages'] = total_pages
+            for line in page_text.split('\n'):
+                question = parser.feed(line, page_num)
+                if question:
+                    completed.append(question)
+        last = parser.finish()
+        if last:
+            completed.append(last)
+        if not completed and start_page == 1:
+            completed = [(q, None) for q in extractor._fallback_extraction().values()]
+
+        source = Path(pdf_path).name
+        for question, page in completed:
+            question['source'] = source
+            question['page'] = page
+            result['questions'].append(question)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def expand_sources(sources, recursive=False):
+    """Expand directories and glob patterns into a sorted list of PDF paths."""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            pattern = os.path.join(source, '**', '*.pdf') if recursive else os.path.join(source, '*.pdf')
+            paths.update(glob.glob(pattern, recursive=recursive))
+        else:
+            paths.update(p for p in glob.glob(source, recursive=recursive) if p.lower().endswith('.pdf'))
+    return sorted(paths)
+
+
+def bulk_ingest(pdf_paths, db, checkpoint, subject='General', chapter='Chapter 1', workers=None, log=print):
+    """Extract many PDFs across a process pool and store the results.
+
+    Extraction runs in worker processes; database writes stay in this
+    process, with one bulk write per file. Files already recorded as
+    completed in the checkpoint store are skipped, and partly ingested
+    ones (e.g. an interrupted web upload) resume from their checkpoint
+    without re-inserting the questions already stored.
+
+    Args:
+        pdf_paths: List of PDF paths
+        db: QuestionDatabase to insert into
+        checkpoint: IngestCheckpoint used to skip, resume and record files
+        subject: Subject assigned to every extracted question
+        chapter: Chapter assigned to every extracted question
+        workers: Number of worker processes (default: CPU count)
+        log: Callable used for progress output
+
+    Returns:
+        Summary dictionary with files, skipped, failures, pages, questions,
+        elapsed seconds and pages/questions per second
+    """
+    summary = {'files': 0, 'skipped': 0, 'failures': [], 'pages': 0, 'questions': 0}
+    pending = []
+    for path in pdf_paths:
+        try:
+            source_key = file_fingerprint(path)
+            recover_pending(db, checkpoint, source_key)
+            entry = reconcile_checkpoint(db, checkpoint, source_key)
+        except OSError as e:
+            summary['failures'].append((path, str(e)))
+            log(f"✗ {Path(path).name}: {e}")
+            continue
+        if entry['completed']:
+            summary['skipped'] += 1
+        else:
+            pending.append((path, entry['next_page']))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(extract_file, path, start_page) for path, start_page in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            name = Path(result['path']).name
+            if result['error']:
+                summary['failures'].append((result['path'], result['error']))
+                log(f"✗ {name}: {result['error']}")
+                continue
+
+            # One bad file (e.g. a failed write) must not stop the others
+            try:
+                source_key = result['source_key']
+                recover_pending(db, checkpoint, source_key)
+                entry = checkpoint.get(source_key)
+                for question in result['questions']:
+                    question['subject'] = subject
+                    question['chapter'] = chapter
+                question_ids = commit_questions(
+                    db, checkpoint, source_key, result['questions'], set(entry['fingerprints']),
+                    result['pages'] + 1, result['pages']
+                )
+                if checkpoint.get(source_key)['question_ids']:
+                    checkpoint.mark_completed(source_key, subject, chapter)
+                else:
+                    # Leave no checkpoint, so a later run parses the file again
+                    checkpoint.reset(source_key)
+            except Exception as e:
+                summary['failures'].append((result['path'], str(e)))
+                log(f"✗ {name}: {e}")
+                continue
+
+            summary['files'] += 1
+            summary['pages'] += result['pages']
+            summary['questions'] += len(question_ids)
+            log(f"✓ {name}: {len(question_ids)} questions from {result['pages']} pages")
+
+    elapsed = time.perf_counter() - start
+    summary['elapsed'] = elapsed
+    summary['pages_per_sec'] = summary['pages'] / elapsed if elapsed else 0.0
+    summary['questions_per_sec'] = summary['questions'] / elapsed if elapsed else 0.0
+    return summary
+
+
+def main():
+    """Command-line entry point for bulk folder ingestion."""
+    parser = argparse.ArgumentParser(description="Bulk-ingest PDF question banks into the question database")
+    parser.add_argument('sources', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('--subject', default='General', help="Subject for all ingested questions")
+    parser.add_argument('--chapter', default='Chapter 1', help="Chapter for all ingested questions")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--db', default='questions_db.json', help="Question database file")
+    parser.add_argument('--checkpoints', default=CHECKPOINT_FILE,
+                        help="Checkpoint file (default: the one the web app uses)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Search directories recursively")
+    args = parser.parse_args()
+
+    pdf_paths = expand_sources(args.sources, args.recursive)
+    if not pdf_paths:
+        print("Error: No PDF files found")
+        sys.exit(1)
+
+    from database import QuestionDatabase
+    db = QuestionDatabase(args.db)
+    checkpoint = IngestCheckpoint(args.checkpoints)
+
+    print(f"\nIngesting {len(pdf_paths)} PDF files...\n")
+    summary = bulk_ingest(pdf_paths, db, checkpoint, args.subject, args.chapter, args.workers)
+
+    print("\n" + "="*60)
+    print("INGEST SUMMARY")
+    print("="*60)
+    print(f"Files ingested:  {summary['files']}")
+    print(f"Files skipped:   {summary['skipped']} (already ingested)")
+    print(f"Failures:        {len(summary['failures'])}")
+    print(f"Pages:           {summary['pages']} ({summary['pages_per_sec']:.1f} pages/s)")
+    print(f"Questions:       {summary['questions']} ({summary['questions_per_sec']:.1f} questions/s)")
+    print(f"Elapsed:         {summary['elapsed']:.2f}s")
+    for path, error in summary['failures']:
+        print(f"  ✗ {path}: {error}")
+
+    sys.exit(1 if summary['failures'] else 0)
+
+
+if __name__ == "__main__":
+    main()
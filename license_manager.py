@@ -8,9 +8,10 @@ import json
 import hashlib
 import secrets
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
 from pathlib import Path
 
+from atomic_write import atomic_write_json
+
 
 class APIKeyManager:
     """Manage API keys for application distribution."""
@@ -68,8 +69,7 @@ class APIKeyManager:
         
         license_path = self.license_dir / filename
         
-        with open(license_path, 'w') as f:
-            json.dump(key_data, f, indent=4)
+        atomic_write_json(license_path, key_data, indent=4)
         
         return license_path
     
@@ -187,8 +187,7 @@ class LicenseValidator:
     @staticmethod
     def save_license(license_data):
         """Save license to application directory."""
-        with open(LicenseValidator.LICENSE_FILE, 'w') as f:
-            json.dump(license_data, f, indent=4)
+        atomic_write_json(LicenseValidator.LICENSE_FILE, license_data, indent=4)
     
     @staticmethod
     def validate():
@@ -245,7 +244,6 @@ class LicenseGenerator:
         
         # Save as license file
         license_path = manager.license_dir / output_file
-        with open(license_path, 'w') as f:
-            json.dump(key_data, f, indent=4)
+        atomic_write_json(license_path, key_data, indent=4)
         
         return license_path, key_data
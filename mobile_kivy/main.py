@@ -5,25 +5,29 @@ Includes lightweight license check and local question storage.
 This is a starting point for building an Android APK via Buildozer.
 """
 
+import os
 import json
 import csv
+import shutil
+import tempfile
+import time
+import threading
 from datetime import datetime
 from pathlib import Path
 
 from kivy.app import App
 from kivy.lang import Builder
-from kivy.properties import StringProperty, ListProperty, ObjectProperty
+from kivy.properties import StringProperty, ListProperty, ObjectProperty, NumericProperty, BooleanProperty
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.filechooser import FileChooserListView
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.checkbox import CheckBox
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.metrics import dp
-from kivy.clock import mainthread
+from kivy.clock import Clock, mainthread
 from kivy.core.window import Window
 
 
@@ -109,29 +113,60 @@ class LicenseManager:
 # ----------------------------
 # Data store utilities
 # ----------------------------
+def atomic_write_text(path: Path, text: str, backup: Path | None = None):
+    """Replace a file via temp file + fsync + rename, optionally keeping a copy of the old one as backup.
+
+    The old file is copied, not moved, so the path always holds a complete file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with temp_path.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    if backup is not None and path.exists():
+        backup_temp = backup.with_name(f".{backup.name}.tmp")
+        shutil.copyfile(path, backup_temp)
+        with backup_temp.open("rb") as f:
+            os.fsync(f.fileno())
+        os.replace(backup_temp, backup)
+    os.replace(temp_path, path)
+
+
 class QuestionStore:
     """Simple JSON-backed question store."""
 
     def __init__(self, user_dir: Path):
         self.user_dir = user_dir
         self.db_path = self.user_dir / "questions.json"
+        self.backup_path = self.user_dir / "questions.json.bak"
         self.questions: list[dict] = []
+        # Set when the primary file was unreadable and the backup was loaded
+        self.loaded_from_backup = False
         self._load()
 
     def _load(self):
-        if self.db_path.exists():
+        self.questions = []
+        self.loaded_from_backup = False
+        for path in (self.db_path, self.backup_path):
+            if not path.exists():
+                continue
             try:
-                with self.db_path.open("r") as f:
+                with path.open("r", encoding="utf-8") as f:
                     self.questions = json.load(f)
-            except Exception:
-                self.questions = []
-        else:
-            self.questions = []
+                self.loaded_from_backup = path == self.backup_path
+                return
+            except (OSError, ValueError):
+                continue
+        if self.db_path.exists():
+            # Unreadable and no usable backup: keep it aside rather than overwrite it
+            os.replace(self.db_path, self.db_path.with_name(f"questions.corrupt-{datetime.now():%Y%m%d%H%M%S}.json"))
 
     def _save(self):
-        self.user_dir.mkdir(parents=True, exist_ok=True)
-        with self.db_path.open("w") as f:
-            json.dump(self.questions, f, indent=2)
+        # A primary that failed to load must not replace the good backup
+        backup = None if self.loaded_from_backup else self.backup_path
+        atomic_write_text(self.db_path, json.dumps(self.questions, separators=(",", ":")), backup)
+        self.loaded_from_backup = False
 
     def add_question(self, question_text: str, options: list[str], correct_idx: int, subject: str, chapter: str, difficulty: str):
         q = {
@@ -191,6 +226,100 @@ class QuestionStore:
         return target
 
 
+# ----------------------------
+# Background work
+# ----------------------------
+class TaskCancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+    """Run work(task) on a daemon thread, keeping the UI responsive.
+
+    The work function reports progress with task.progress(done, total,
+    message), which also raises TaskCancelled once the task is cancelled.
+    Callbacks run on the Kivy main thread via Clock.schedule_once:
+    on_progress(done, total, message) at most once per frame, then
+    on_done(result) or on_error(exc). A cancelled task calls neither.
+    """
+
+    def __init__(self, work, on_done=None, on_error=None, on_progress=None):
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self._latest_progress = None
+        self._progress_scheduled = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def progress(self, done: int, total: int, message: str = ""):
+        if self.cancelled:
+            raise TaskCancelled()
+        if self.on_progress is None:
+            return
+        self._latest_progress = (done, total, message)
+        # Coalesce updates: one pending callback carries the latest values
+        if not self._progress_scheduled:
+            self._progress_scheduled = True
+            Clock.schedule_once(self._deliver_progress)
+
+    def _deliver_progress(self, _dt):
+        self._progress_scheduled = False
+        if not self.cancelled:
+            self.on_progress(*self._latest_progress)
+
+    def _finish(self, callback, value):
+        def deliver(_dt):
+            # Cancel may be pressed after the work ended but before this runs
+            if not self.cancelled:
+                callback(value)
+
+        if callback is not None:
+            Clock.schedule_once(deliver)
+
+    def _run(self):
+        try:
+            result = self.work(self)
+        except TaskCancelled:
+            return
+        except Exception as exc:  # noqa: BLE001
+            self._finish(self.on_error, exc)
+            return
+        self._finish(self.on_done, result)
+
+
+class ProgressPopup(Popup):
+    """Modal progress bar with a Cancel button for a BackgroundTask."""
+
+    def __init__(self, title: str, on_cancel):
+        self.message = Label(text="Starting...")
+        self.bar = ProgressBar(max=1, value=0, size_hint_y=None, height=dp(24))
+        cancel = Button(text="Cancel", size_hint_y=None, height=dp(44))
+        cancel.bind(on_release=lambda *_: on_cancel())
+        layout = BoxLayout(orientation="vertical", spacing=dp(10), padding=dp(10))
+        layout.add_widget(self.message)
+        layout.add_widget(self.bar)
+        layout.add_widget(cancel)
+        super().__init__(title=title, content=layout, size_hint=(0.8, 0.35), auto_dismiss=False)
+
+    def update(self, done: int, total: int, message: str):
+        self.bar.max = max(total, 1)
+        self.bar.value = done
+        self.message.text = message
+
+
 # ----------------------------
 # Screens
 # ----------------------------
@@ -210,6 +339,43 @@ class AddQuestionScreen(Screen):
     correct_spinner = ObjectProperty(None)
 
 
+class BankRow(RecycleDataViewBehavior, BoxLayout):
+    """One question of the bank list (layout in app.kv); recycled while scrolling.
+
+    Rows are as tall as their text. Each row measures its text when it is
+    given a question or resized and writes the height into its data
+    entry, so the RecycleBoxLayout places every row with its own height.
+    """
+    text = StringProperty("")
+    details = StringProperty("")
+
+    def __init__(self, **kwargs):
+        self.rv = None
+        self.index = None
+        super().__init__(**kwargs)
+        self._fit_trigger = Clock.create_trigger(self.fit_height)
+        self.bind(width=self._fit_trigger)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv
+        self.index = index
+        self._fit_trigger()
+        return super().refresh_view_attrs(rv, index, data)
+
+    def fit_height(self, *args):
+        if self.rv is None or self.index is None or self.index >= len(self.rv.data):
+            return
+        entry = self.rv.data[self.index]
+        if entry.get("text") != self.text:
+            return
+        label = self.ids.question
+        label.texture_update()
+        height = label.texture_size[1] + self.ids.details.height + self.padding[1] + self.padding[3] + self.spacing
+        if entry.get("height") != height:
+            # Replacing the entry makes the layout re-measure just this row
+            self.rv.data[self.index] = dict(entry, height=height)
+
+
 class BankScreen(Screen):
     questions = ListProperty([])
 
@@ -217,20 +383,21 @@ class BankScreen(Screen):
         self.update_bank()
 
     def update_bank(self):
-        grid = self.ids.get("bank_grid")
-        if not grid:
-            return
-        grid.clear_widgets()
-        if not self.questions:
-            grid.add_widget(Label(text="No questions yet."))
+        """Rebuild the list data; RecycleView only creates widgets for visible rows."""
+        rv = self.ids.get("bank_rv")
+        if not rv:
             return
+        rows = []
         for q in self.questions:
-            grid.add_widget(Label(text=f"Q{q['id']}: {q['question']}", bold=True, text_size=(grid.width, None), halign="left"))
+            lines = [f"[b]Q{q['id']}: {q['question']}[/b]"]
             for idx, opt in enumerate(q["options"]):
                 prefix = "✔ " if idx == q.get("correct_answer") else "  "
-                grid.add_widget(Label(text=f"{prefix}{chr(65+idx)}. {opt}", text_size=(grid.width, None), halign="left"))
-            grid.add_widget(Label(text=f"Subject: {q['subject']} | Chapter: {q['chapter']} | Difficulty: {q['difficulty']}", font_size="12sp", text_size=(grid.width, None), halign="left"))
-            grid.add_widget(Label(text="---", color=(0.6, 0.6, 0.6, 1)))
+                lines.append(f"{prefix}{chr(65+idx)}. {opt}")
+            rows.append({
+                "text": "\n".join(lines),
+                "details": f"Subject: {q['subject']} | Chapter: {q['chapter']} | Difficulty: {q['difficulty']}",
+            })
+        rv.data = rows
 
 
 class GenerateScreen(Screen):
@@ -238,74 +405,63 @@ class GenerateScreen(Screen):
     pass
 
 
+class PDFQuestionRow(RecycleDataViewBehavior, BoxLayout):
+    """One checkable PDF question (layout in app.kv); recycled while scrolling."""
+    index = NumericProperty(0)
+    text = StringProperty("")
+    checked = BooleanProperty(False)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.index = index
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_checkbox(self, active: bool):
+        if active == self.checked:
+            return
+        # Keep the property in step with the checkbox so a recycled row
+        # showing a different question always gets its state refreshed
+        self.checked = active
+        App.get_running_app().root.get_screen("pdf").set_checked(self.index, active)
+
+
 class PDFQuestionScreen(Screen):
     questions = ListProperty([])
-    checked_indices = ListProperty([])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.checked_indices = set()
 
     def on_questions(self, *_):
-        self.checked_indices = []
+        self.checked_indices = set()
         self.update_view()
 
     def update_view(self):
-        grid = self.ids.get("pdf_grid")
-        if not grid:
-            return
-        grid.clear_widgets()
-        if not self.questions:
-            grid.add_widget(Label(
-                text="No PDF attached yet.\n\nClick 'Add PDF' to load questions.",
-                size_hint_y=None,
-                height=dp(80),
-                halign="center"
-            ))
+        """Rebuild the list data; RecycleView only creates widgets for visible rows."""
+        rv = self.ids.get("pdf_rv")
+        if not rv:
             return
-        
+        rows = []
         for idx, text in enumerate(self.questions):
-            # Create a container for each question
-            container = BoxLayout(
-                orientation="horizontal",
-                size_hint_y=None,
-                height=dp(80),  # Increased height for better readability
-                spacing=dp(10),
-                padding=(dp(8), dp(4))
-            )
-            
-            # Checkbox on left
-            checkbox = CheckBox(
-                size_hint=(None, None),
-                width=dp(40),
-                height=dp(40),
-                active=(idx in self.checked_indices)
-            )
-            checkbox.bind(active=lambda cb, val, i=idx: self._toggle_check(i, val))
-            container.add_widget(checkbox)
-            
-            # Question text on right with wrapping
             # Truncate very long questions for mobile
             display_text = text[:200] + "..." if len(text) > 200 else text
-            
-            label = Label(
-                text=f"[b]Q{idx+1}:[/b] {display_text}",
-                markup=True,
-                size_hint_x=1,
-                size_hint_y=None,
-                height=dp(70),
-                text_size=(None, None),  # Let it calculate size
-                halign="left",
-                valign="top",
-                font_size="13sp"
-            )
-            # Bind to calculate proper text_size after width is known
-            label.bind(width=lambda lbl, w: setattr(lbl, 'text_size', (w, None)))
-            container.add_widget(label)
-            
-            grid.add_widget(container)
+            rows.append({
+                "text": f"[b]Q{idx+1}:[/b] {display_text}",
+                "checked": idx in self.checked_indices,
+            })
+        rv.data = rows
+
+    def set_checked(self, idx: int, active: bool):
+        """Record one checkbox toggle; only that row's data changes."""
+        if active:
+            self.checked_indices.add(idx)
+        else:
+            self.checked_indices.discard(idx)
+        # The visible row already shows the new state; the data keeps it when the row is recycled
+        self.ids.pdf_rv.data[idx]["checked"] = active
 
-    def _toggle_check(self, idx: int, active: bool):
-        if active and idx not in self.checked_indices:
-            self.checked_indices.append(idx)
-        elif not active and idx in self.checked_indices:
-            self.checked_indices.remove(idx)
+    def set_all_checked(self, active: bool):
+        self.checked_indices = set(range(len(self.questions))) if active else set()
+        self.update_view()
 
 
 class RootManager(ScreenManager):
@@ -336,9 +492,10 @@ class MCQMobileApp(App):
         self.store = QuestionStore(self.user_dir)
         manager = RootManager()
         self._validate_license(manager)
+        self._pdf_task = None
         existing_pdf = self.user_dir / "questions_import.pdf"
         if existing_pdf.exists():
-            self.attach_pdf(existing_pdf, show_popup=False)
+            self.load_pdf_questions(existing_pdf, show_popup=False)
         return manager
 
     @mainthread
@@ -359,18 +516,47 @@ class MCQMobileApp(App):
     def on_start(self):
         # populate PDF list if available
         self.refresh_pdf_screen()
+        # Startup benchmark (benchmarks/startup.py): record when the first frame is up, then quit
+        probe_file = os.environ.get("MCQ_STARTUP_PROBE")
+        if probe_file:
+            Clock.schedule_once(lambda dt: (Path(probe_file).write_text(repr(time.time())), self.stop()), 0)
 
     def attach_pdf(self, pdf_path: Path, show_popup: bool = True):
         if not pdf_path.exists() or pdf_path.suffix.lower() != ".pdf":
             self._popup("Invalid file", "Please select a PDF file.")
             return
-        self.user_dir.mkdir(parents=True, exist_ok=True)
-        dest = self.user_dir / "questions_import.pdf"
-        dest.write_bytes(pdf_path.read_bytes())
-        self.attached_pdf = str(dest)
-        self.load_pdf_questions(dest)
-        if show_popup:
-            self._popup("PDF added", f"Stored a copy at:\n{dest}\nParsed {len(self.pdf_questions)} lines")
+        # The copy into the user data dir happens on the worker thread too
+        self.load_pdf_questions(pdf_path, show_popup=show_popup, store_copy=True)
+
+    def run_in_background(self, title: str, work, on_done, on_error=None, show_progress: bool = True):
+        """Run work(task) on a worker thread, with a cancellable progress popup.
+
+        on_done(result) and on_error(exc) run on the main thread once the
+        work finishes; errors are shown in a popup by default.
+        """
+        popup = None
+
+        def finish(callback):
+            def wrapped(value):
+                if popup is not None:
+                    popup.dismiss()
+                callback(value)
+            return wrapped
+
+        def cancel():
+            task.cancel()
+            if popup is not None:
+                popup.dismiss()
+
+        if on_error is None:
+            on_error = lambda exc: self._popup(f"{title} failed", str(exc))  # noqa: E731
+        if show_progress:
+            popup = ProgressPopup(title, cancel)
+        task = BackgroundTask(work, on_done=finish(on_done), on_error=finish(on_error),
+                              on_progress=popup.update if popup is not None else None)
+        if popup is not None:
+            popup.open()
+        return task.start()
 
     def open_pdf_picker(self):
         chooser = FileChooserListView(filters=["*.pdf"], path=str(Path.home()))
@@ -425,34 +611,70 @@ class MCQMobileApp(App):
         layout.add_widget(buttons)
         popup.open()
 
-    def load_pdf_questions(self, pdf_path: Path):
+    def load_pdf_questions(self, pdf_path: Path, show_popup: bool = True, store_copy: bool = False):
+        """Parse a PDF on a worker thread; the question list updates when it is done.
+
+        Args:
+            pdf_path: PDF to read
+            show_popup: Show progress and result popups (off for the startup reload)
+            store_copy: Copy the PDF into the user data dir first
+        """
         try:
             from PyPDF2 import PdfReader  # type: ignore
         except Exception:
             self._popup("Missing dependency", "PyPDF2 not installed. Add PyPDF2 to requirements for PDF parsing.")
             return
 
-        try:
-            reader = PdfReader(str(pdf_path))
+        dest = self.user_dir / "questions_import.pdf"
+
+        def work(task: BackgroundTask):
+            source = pdf_path
+            if store_copy:
+                task.progress(0, 1, "Copying PDF...")
+                self.user_dir.mkdir(parents=True, exist_ok=True)
+                # Copy under a unique temporary name so a cancelled (or overlapping) copy keeps the previous PDF
+                partial = tempfile.NamedTemporaryFile(dir=self.user_dir, prefix=f".{dest.name}.", suffix=".tmp", delete=False)
+                try:
+                    with partial, pdf_path.open("rb") as f:
+                        shutil.copyfileobj(f, partial)
+                    if task.cancelled:
+                        raise TaskCancelled()
+                    os.replace(partial.name, dest)
+                except BaseException:
+                    os.unlink(partial.name)
+                    raise
+                source = dest
+            reader = PdfReader(str(source))
+            total = len(reader.pages)
             text_parts = []
-            for page in reader.pages:
-                page_text = page.extract_text() or ""
-                text_parts.append(page_text)
-            full_text = "\n".join(text_parts)
-            
+            for number, page in enumerate(reader.pages, 1):
+                task.progress(number - 1, total, f"Reading page {number} of {total}...")
+                text_parts.append(page.extract_text() or "")
+            task.progress(total, total, "Finding questions...")
             # Parse questions intelligently
-            questions = self._parse_questions_from_text(full_text)
-            
+            return source, self._parse_questions_from_text("\n".join(text_parts))
+
+        def done(result):
+            source, questions = result
+            self._pdf_task = None
             if not questions:
                 self._popup("No questions found", "Could not find any questions in the PDF. Questions should be numbered (e.g., '1.', 'Q1:', '1)', etc.)")
                 return
-                
+            self.attached_pdf = str(source)
             self.pdf_questions = questions
             self.refresh_pdf_screen()
-            self._popup("PDF loaded", f"Found {len(questions)} questions")
-        except Exception as exc:  # noqa: BLE001
+            if show_popup:
+                self._popup("PDF loaded", f"Stored a copy at:\n{source}\nFound {len(questions)} questions")
+
+        def failed(exc):
+            self._pdf_task = None
             self._popup("PDF error", f"Could not read PDF. {exc}")
 
+        # A newer PDF replaces one still loading
+        if self._pdf_task is not None:
+            self._pdf_task.cancel()
+        self._pdf_task = self.run_in_background("Loading PDF", work, done, failed, show_progress=show_popup)
+
     def _parse_questions_from_text(self, text: str) -> list:
         """Extract questions from PDF text with their options."""
         import re
@@ -507,21 +729,25 @@ class MCQMobileApp(App):
         screen: PDFQuestionScreen = self.root.get_screen("pdf")
         screen.questions = list(self.pdf_questions)
 
+    def refresh_bank(self):
+        if not self.root or not self.root.has_screen("bank"):
+            return
+        screen: BankScreen = self.root.get_screen("bank")
+        screen.questions = self.store.all_questions()
+
     def select_all_pdf_questions(self):
         """Select all PDF questions."""
         if not self.root:
             return
         screen: PDFQuestionScreen = self.root.get_screen("pdf")
-        screen.checked_indices = list(range(len(self.pdf_questions)))
-        screen.update_view()
+        screen.set_all_checked(True)
 
     def clear_all_pdf_questions(self):
         """Clear all PDF question selections."""
         if not self.root:
             return
         screen: PDFQuestionScreen = self.root.get_screen("pdf")
-        screen.checked_indices = []
-        screen.update_view()
+        screen.set_all_checked(False)
 
     def generate_random_paper(self):
         """Generate paper with randomly selected questions."""
@@ -557,36 +783,76 @@ class MCQMobileApp(App):
         self._save_generated_paper(selected_qs, "selected")
 
     def _save_generated_paper(self, questions: list, mode: str):
-        """Save generated paper and answer key as PDF files."""
-        from datetime import datetime as dt
-        
-        try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        except ImportError:
-            # Fallback to text if reportlab not available
-            self._save_as_text(questions, mode)
-            return
-        
+        """Save generated paper and answer key as PDF files, on a worker thread."""
+        header = (self.college_name, self.exam_name, self.exam_date)
         # Create output directory (user-selected)
         output_dir = Path(self.output_dir) if self.output_dir else Path.cwd() / "output"
+
+        def done(result):
+            title, message = result
+            self._popup(title, message)
+
+        self.run_in_background(
+            "Generating paper",
+            lambda task: self._write_paper_files(task, questions, header, output_dir),
+            done,
+        )
+
+    def _write_paper_files(self, task: BackgroundTask, questions: list, header: tuple, output_dir: Path):
+        """Write the paper files (runs on a worker thread).
+
+        Files already written are removed if the task is cancelled part way.
+
+        Returns:
+            Tuple (popup title, popup message)
+        """
+        from datetime import datetime as dt
+
         output_dir.mkdir(parents=True, exist_ok=True)
-        
         timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
+        written = []
+        try:
+            try:
+                from reportlab.lib.pagesizes import letter  # noqa: F401
+            except ImportError:
+                # Fallback to text if reportlab not available
+                task.progress(0, 1, "Writing text files...")
+                written += self._save_text_outputs(output_dir, questions, timestamp, header)
+                return ("Text Files Generated", f"Saved to:\n• {written[0].name}\n• {written[1].name}"
+                        "\n\nInstall 'reportlab' for PDF output.")
+
+            task.progress(0, 3, "Building question paper...")
+            question_file = self._build_question_pdf(output_dir, questions, timestamp, header)
+            written.append(question_file)
+            task.progress(1, 3, "Building answer key...")
+            answer_file = self._build_answer_pdf(output_dir, questions, timestamp, header)
+            written.append(answer_file)
+            # Also create text versions (questions + answer key)
+            task.progress(2, 3, "Writing text files...")
+            written += self._save_text_outputs(output_dir, questions, timestamp, header)
+            task.progress(3, 3, "Done")
+            return "Papers Generated", f"Created:\n• {question_file.name}\n• {answer_file.name}"
+        except TaskCancelled:
+            for path in written:
+                path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _build_question_pdf(output_dir: Path, questions: list, timestamp: str, header: tuple) -> Path:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+        college_name, exam_name, exam_date = header
         question_file = output_dir / f"Question_Paper_{timestamp}.pdf"
-        answer_file = output_dir / f"Answer_Key_Solutions_{timestamp}.pdf"
-        
         styles = getSampleStyleSheet()
-        
-        # Create Question Paper
         doc = SimpleDocTemplate(str(question_file), pagesize=letter)
         story = []
         
         # Header
-        story.append(Paragraph(f"<b>{self.college_name}</b>", styles['Title']))
-        story.append(Paragraph(f"<b>Exam: {self.exam_name}</b>", styles['Heading2']))
-        story.append(Paragraph(f"Date: {self.exam_date}", styles['Normal']))
+        story.append(Paragraph(f"<b>{college_name}</b>", styles['Title']))
+        story.append(Paragraph(f"<b>Exam: {exam_name}</b>", styles['Heading2']))
+        story.append(Paragraph(f"Date: {exam_date}", styles['Normal']))
         story.append(Spacer(1, 20))
         
         # Questions
@@ -595,57 +861,47 @@ class MCQMobileApp(App):
             story.append(Spacer(1, 15))
         
         doc.build(story)
-        
-        # Create Answer Key
+        return question_file
+
+    @staticmethod
+    def _build_answer_pdf(output_dir: Path, questions: list, timestamp: str, header: tuple) -> Path:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+        _, exam_name, _ = header
+        answer_file = output_dir / f"Answer_Key_Solutions_{timestamp}.pdf"
+        styles = getSampleStyleSheet()
         doc_ans = SimpleDocTemplate(str(answer_file), pagesize=letter)
         story_ans = []
         
-        story_ans.append(Paragraph(f"<b>Answer Key - {self.exam_name}</b>", styles['Title']))
+        story_ans.append(Paragraph(f"<b>Answer Key - {exam_name}</b>", styles['Title']))
         story_ans.append(Spacer(1, 20))
         
-        # Extract answers (look for correct answer pattern)
-        import re
         for idx, q in enumerate(questions, 1):
-            # Try to find the answer in common formats
-            answer = "Not specified"
-            lines = q.split('\n')
-            for line in lines:
-                # Look for patterns like "Answer: A" or "Correct: B"
-                match = re.search(r'(answer|correct)[:\s]+([A-D])', line, re.IGNORECASE)
-                if match:
-                    answer = match.group(2).upper()
-                    break
+            answer = MCQMobileApp._extract_answer_from_question(q)
             story_ans.append(Paragraph(f"Question {idx}: <b>{answer}</b>", styles['Normal']))
             story_ans.append(Spacer(1, 10))
         
         doc_ans.build(story_ans)
+        return answer_file
 
-        # Also create text versions (questions + answer key)
-        self._save_text_outputs(output_dir, questions, timestamp)
-        
-        self._popup("Papers Generated", f"Created:\n• {question_file.name}\n• {answer_file.name}")
-    
-    def _save_as_text(self, questions: list, mode: str):
-        """Fallback: Save as text file."""
-        from datetime import datetime as dt
-        
-        # Create output directory (user-selected)
-        output_dir = Path(self.output_dir) if self.output_dir else Path.cwd() / "output"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
-        self._save_text_outputs(output_dir, questions, timestamp, show_popup=True)
+    @staticmethod
+    def _save_text_outputs(output_dir: Path, questions: list, timestamp: str, header: tuple) -> list:
+        """Save question paper and answer key as text files.
 
-    def _save_text_outputs(self, output_dir: Path, questions: list, timestamp: str, show_popup: bool = False):
-        """Save question paper and answer key as text files."""
+        Returns:
+            [question paper path, answer key path]
+        """
+        college_name, exam_name, exam_date = header
         q_filename = output_dir / f"Question_Paper_{timestamp}.txt"
         a_filename = output_dir / f"Answer_Key_Solutions_{timestamp}.txt"
 
         # Question paper text
         q_lines = [
-            f"College: {self.college_name}",
-            f"Exam: {self.exam_name}",
-            f"Date: {self.exam_date}",
+            f"College: {college_name}",
+            f"Exam: {exam_name}",
+            f"Date: {exam_date}",
             "",
             "Questions:",
             "=" * 60,
@@ -659,20 +915,18 @@ class MCQMobileApp(App):
 
         # Answer key text
         a_lines = [
-            f"Exam: {self.exam_name}",
-            f"Date: {self.exam_date}",
+            f"Exam: {exam_name}",
+            f"Date: {exam_date}",
             "",
             "Answer Key:",
             "=" * 40,
             "",
         ]
         for idx, q in enumerate(questions, 1):
-            ans = self._extract_answer_from_question(q)
+            ans = MCQMobileApp._extract_answer_from_question(q)
             a_lines.append(f"Q{idx}: {ans}")
         a_filename.write_text("\n".join(a_lines))
-
-        if show_popup:
-            self._popup("Text Files Generated", f"Saved to:\n• {q_filename.name}\n• {a_filename.name}\n\nInstall 'reportlab' for PDF output.")
+        return [q_filename, a_filename]
 
     @staticmethod
     def _extract_answer_from_question(question_text: str) -> str:
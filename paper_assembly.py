@@ -0,0 +1,396 @@
+"""
+Blueprint-based Paper Assembly
+Selects questions for a paper from a blueprint (questions per chapter,
+difficulty mix, excluded questions) using the database's
+(subject, chapter, difficulty) buckets
+"""
+
+import json
+import random
+import threading
+from bisect import bisect_right
+from collections import Counter, deque
+
+from database import BucketIndex
+
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+
+
+def apportion(count, weights):
+    """Split a count across weighted keys using largest remainders.
+
+    Args:
+        count: Total number to split
+        weights: Dictionary {key: weight}
+
+    Returns:
+        Dictionary {key: share} whose shares sum to count
+    """
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        raise ValueError("Difficulty mix weights must add up to more than zero")
+
+    exact = {key: count * weight / total_weight for key, weight in weights.items()}
+    shares = {key: int(value) for key, value in exact.items()}
+    remainder = count - sum(shares.values())
+    for key in sorted(exact, key=lambda k: exact[k] - shares[k], reverse=True)[:remainder]:
+        shares[key] += 1
+    return shares
+
+
+def is_number(value):
+    """Whether a JSON value is a number (bool is not)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_count(value):
+    """Parse a question count from JSON (a whole number or numeric string).
+
+    Returns:
+        Integer count, or None if value is not a whole number
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if value.lstrip('-').isdigit() else None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if is_number(value) and not isinstance(value, float):
+        return value
+    return None
+
+
+def allocate(demands, capacity):
+    """Split demands over shared buckets with a maximum flow.
+
+    Greedy filling can fail when requirements overlap in several buckets
+    even though an assignment exists; a maximum flow finds one whenever
+    it does.
+
+    Args:
+        demands: List of (count, keys) tuples, one per requirement
+        capacity: Dictionary {key: number of usable questions}
+
+    Returns:
+        List of dictionaries {key: count}, one per demand. A demand
+        whose counts sum to less than its count cannot be met.
+    """
+    # Residual graph: source -> demand i -> bucket key -> sink
+    source, sink = ('source',), ('sink',)
+    residual = {source: {}, sink: {}}
+    def add_edge(u, v, cap):
+        residual.setdefault(u, {})[v] = residual.get(u, {}).get(v, 0) + cap
+        residual.setdefault(v, {}).setdefault(u, 0)
+
+    for i, (count, keys) in enumerate(demands):
+        add_edge(source, ('demand', i), count)
+        for key in keys:
+            add_edge(('demand', i), ('key', key), count)
+    for key, cap in capacity.items():
+        add_edge(('key', key), sink, cap)
+
+    while True:
+        parent = {source: None}
+        queue = deque([source])
+        while queue and sink not in parent:
+            u = queue.popleft()
+            for v, cap in residual[u].items():
+                if cap > 0 and v not in parent:
+                    parent[v] = u
+                    queue.append(v)
+        if sink not in parent:
+            break
+        path = []
+        v = sink
+        while parent[v] is not None:
+            path.append((parent[v], v))
+            v = parent[v]
+        push = min(residual[u][v] for u, v in path)
+        for u, v in path:
+            residual[u][v] -= push
+            residual[v][u] += push
+
+    allocations = []
+    for i, (count, keys) in enumerate(demands):
+        node = ('demand', i)
+        allocations.append({
+            key: residual[('key', key)][node]
+            for key in keys if residual[('key', key)][node] > 0
+        })
+    return allocations
+
+
+class Requirement:
+    """A number of questions to draw from the buckets matching some facets."""
+
+    def __init__(self, section, subject, chapter, difficulty, count):
+        self.section = section
+        self.subject = subject
+        self.chapter = chapter
+        self.difficulty = difficulty
+        self.count = count
+
+    def label(self):
+        """Human-readable description used in diagnostics."""
+        facets = [self.subject or 'any subject', self.chapter or 'any chapter', self.difficulty or 'any difficulty']
+        return f"Section {self.section} ({' / '.join(facets)})"
+
+
+class Blueprint:
+    """Exam blueprint describing how a paper is composed.
+
+    Dictionary / JSON form:
+        {
+            "sections": [
+                {"subject": "Physics", "chapter": "Optics", "count": 5},
+                {"subject": "Physics", "count": 4,
+                 "difficulty": {"Easy": 1, "Medium": 2, "Hard": 1}},
+                {"chapter": "Waves", "difficulty": "Hard", "count": 2}
+            ],
+            "difficulty_mix": {"Easy": 30, "Medium": 50, "Hard": 20},
+            "exclude_ids": [12, 57]
+        }
+
+    A section's difficulty may be a single level, a {level: count} split or
+    omitted, in which case difficulty_mix (if given) is applied to it.
+    Omitted subject/chapter match any value.
+    """
+
+    def __init__(self, sections, difficulty_mix=None, exclude_ids=()):
+        self.sections = sections
+        self.difficulty_mix = difficulty_mix
+        self.exclude_ids = set(exclude_ids)
+        self.requirements = self._expand()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a blueprint from its dictionary form."""
+        if not isinstance(data, dict) or not isinstance(data.get('sections'), list) or not data['sections']:
+            raise ValueError("Blueprint needs a non-empty 'sections' list")
+        difficulty_mix = data.get('difficulty_mix')
+        if difficulty_mix is not None:
+            if not isinstance(difficulty_mix, dict):
+                raise ValueError("'difficulty_mix' must be an object of {level: weight}")
+            for level, weight in difficulty_mix.items():
+                if level not in DIFFICULTIES:
+                    raise ValueError(f"'difficulty_mix' has unknown difficulty '{level}'")
+                if not is_number(weight) or not weight >= 0 or weight == float('inf'):
+                    raise ValueError(f"'difficulty_mix' weight for {level} must be a non-negative number")
+        exclude_ids = data.get('exclude_ids') or ()
+        if not isinstance(exclude_ids, (list, tuple)):
+            raise ValueError("'exclude_ids' must be a list of question IDs")
+        # IDs sent as strings ("12") must still match the bank's integer IDs
+        parsed_ids = [parse_count(qid) for qid in exclude_ids]
+        if None in parsed_ids:
+            raise ValueError("'exclude_ids' must contain whole-number question IDs")
+        return cls(data['sections'], difficulty_mix, parsed_ids)
+
+    @classmethod
+    def from_json(cls, text):
+        """Create a blueprint from JSON text."""
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Blueprint is not valid JSON: {e}")
+        return cls.from_dict(data)
+
+    @property
+    def total(self):
+        """Total number of questions the blueprint asks for."""
+        return sum(req.count for req in self.requirements)
+
+    def _expand(self):
+        """Expand sections into per-difficulty requirements."""
+        requirements = []
+        for number, section in enumerate(self.sections, 1):
+            if not isinstance(section, dict):
+                raise ValueError(f"Section {number} must be an object")
+            subject = section.get('subject') or None
+            chapter = section.get('chapter') or None
+            difficulty = section.get('difficulty') or None
+            for facet, value in (('subject', subject), ('chapter', chapter)):
+                if value is not None and not isinstance(value, str):
+                    raise ValueError(f"Section {number} {facet} must be a string")
+            if difficulty is not None and not isinstance(difficulty, (str, dict)):
+                raise ValueError(f"Section {number} difficulty must be a level or an object of {{level: count}}")
+
+            if isinstance(difficulty, dict):
+                split = difficulty
+            else:
+                count = parse_count(section.get('count', 0))
+                if count is None:
+                    raise ValueError(f"Section {number} has an invalid count")
+                if count <= 0:
+                    raise ValueError(f"Section {number} needs a positive count")
+                if difficulty is None and self.difficulty_mix:
+                    split = apportion(count, self.difficulty_mix)
+                else:
+                    split = {difficulty: count}
+
+            for level, level_count in split.items():
+                if level is not None and level not in DIFFICULTIES:
+                    raise ValueError(f"Section {number} has unknown difficulty '{level}'")
+                level_count = parse_count(level_count)
+                if level_count is None or level_count < 0:
+                    raise ValueError(f"Section {number} has an invalid count for difficulty '{level}'")
+                if level_count > 0:
+                    requirements.append(Requirement(number, subject, chapter, level, level_count))
+        return requirements
+
+
+class PaperAssembler:
+    """Draw questions that satisfy a Blueprint."""
+
+    def __init__(self, questions, index=None, rng=None, lock=None):
+        """
+        Initialize the assembler.
+
+        Args:
+            questions: Dictionary of questions {id: question_data}
+            index: BucketIndex over the questions (built if not given)
+            rng: random.Random instance (default: module random)
+            lock: Lock held while questions and index are read, if other
+                threads change them (e.g. QuestionDatabase.view_lock)
+        """
+        self.questions = questions
+        self.index = index or BucketIndex(questions)
+        self.rng = rng or random
+        self.lock = lock or threading.RLock()
+
+    @classmethod
+    def from_database(cls, db, rng=None):
+        """Create an assembler over a QuestionDatabase's bucket index."""
+        questions, index = db.get_questions_and_index()
+        return cls(questions, index, rng, db.view_lock)
+
+    def assemble(self, blueprint, exclude=()):
+        """Select questions for a blueprint.
+
+        Requirements are filled most-specific first (fewest matching
+        buckets), so broad sections do not use up questions a narrower
+        section needs. When overlapping sections still leave that order
+        short, questions are drawn per bucket using a maximum-flow
+        allocation, so a paper is only refused when no assignment exists.
+        Every shortfall is reported, not only the first.
+
+        Args:
+            blueprint: Blueprint to satisfy
+            exclude: Additional question IDs that must not be used
+                (e.g. questions from recent papers)
+
+        Returns:
+            Tuple (success, selected_questions, diagnostics)
+            selected_questions is a list of question dicts in section order;
+            diagnostics is a list of messages explaining any shortfall
+        """
+        # The database's journal replay changes buckets in place
+        with self.lock:
+            return self._assemble(blueprint, exclude)
+
+    def _assemble(self, blueprint, exclude):
+        blocked = set(blueprint.exclude_ids)
+        blocked.update(exclude)
+        blocked_per_key = Counter(
+            self.index.key_of[qid] for qid in blocked if qid in self.index.key_of
+        )
+
+        plans = []
+        for req in blueprint.requirements:
+            keys = self.index.matching(req.subject, req.chapter, req.difficulty)
+            plans.append((req, keys))
+
+        diagnostics = []
+        for req, keys in plans:
+            if not keys:
+                diagnostics.append(f"{req.label()}: no questions match")
+                continue
+            available = sum(self.index.size(k) - blocked_per_key[k] for k in keys)
+            if available < req.count:
+                diagnostics.append(
+                    f"{req.label()}: needs {req.count}, only {available} available"
+                )
+        if diagnostics:
+            return False, [], diagnostics
+
+        chosen = self._draw_greedy(plans, blocked, blocked_per_key)
+        if chosen is None:
+            capacity = {
+                k: self.index.size(k) - blocked_per_key[k]
+                for _, keys in plans for k in keys
+            }
+            allocations = allocate([(req.count, keys) for req, keys in plans], capacity)
+            for (req, _), allocation in zip(plans, allocations):
+                filled = sum(allocation.values())
+                if filled < req.count:
+                    diagnostics.append(
+                        f"{req.label()}: needs {req.count}, only {filled} left "
+                        f"after the sections it shares questions with"
+                    )
+            if diagnostics:
+                return False, [], diagnostics
+
+            chosen = {}
+            for (req, _), allocation in zip(plans, allocations):
+                picked = []
+                for key, count in allocation.items():
+                    picked.extend(self._draw([key], count, blocked, blocked_per_key))
+                self.rng.shuffle(picked)
+                chosen[id(req)] = picked
+
+        selected = []
+        for req in blueprint.requirements:
+            selected.extend(self.questions[qid] for qid in chosen[id(req)])
+        return True, selected, []
+
+    def _draw_greedy(self, plans, blocked, blocked_per_key):
+        """Fill requirements most-specific first, drawing uniformly.
+
+        Returns:
+            Dictionary {id(requirement): [question IDs]}, or None if the
+            order runs short (blocked and blocked_per_key are left as they were)
+        """
+        def specificity(plan):
+            req, keys = plan
+            return len(keys), sum(self.index.size(k) for k in keys)
+
+        trial_blocked = set(blocked)
+        trial_per_key = Counter(blocked_per_key)
+        chosen = {}
+        for req, keys in sorted(plans, key=specificity):
+            available = sum(self.index.size(k) - trial_per_key[k] for k in keys)
+            if available < req.count:
+                return None
+            chosen[id(req)] = self._draw(keys, req.count, trial_blocked, trial_per_key)
+        return chosen
+
+    def _draw(self, keys, count, blocked, blocked_per_key):
+        """Draw count unblocked IDs uniformly from the union of buckets.
+
+        While most of the union is unblocked, random positions are drawn
+        and blocked ones are redrawn, which costs O(count). Otherwise the
+        unblocked candidates are listed once and sampled.
+        """
+        buckets = [self.index.buckets[k] for k in keys]
+        starts = []
+        total = 0
+        for bucket in buckets:
+            starts.append(total)
+            total += len(bucket)
+
+        picked = []
+        if (sum(blocked_per_key[k] for k in keys) + count) * 2 <= total:
+            while len(picked) < count:
+                position = self.rng.randrange(total)
+                i = bisect_right(starts, position) - 1
+                qid = buckets[i][position - starts[i]]
+                if qid not in blocked:
+                    picked.append(qid)
+                    blocked.add(qid)
+                    blocked_per_key[keys[i]] += 1
+        else:
+            candidates = [qid for bucket in buckets for qid in bucket if qid not in blocked]
+            picked = self.rng.sample(candidates, count)
+            for qid in picked:
+                blocked.add(qid)
+                blocked_per_key[self.index.key_of[qid]] += 1
+        return picked
@@ -0,0 +1,160 @@
+"""
+Rendered Paper Cache
+Content-addressed cache for generated question papers and answer keys, so
+regenerating an identical paper reuses the DOCX/PDF files already on disk
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+
+# Bump whenever the document layout changes so cached papers are re-rendered.
+# Kept here rather than in document_generator so computing a cache key does
+# not load python-docx and lxml.
+RENDERER_VERSION = "3"
+
+ARTIFACTS = {
+    'question_paper': 'Question_Paper',
+    'answer_key': 'Answer_Key_Solutions',
+}
+
+
+def paper_cache_key(college_name, exam_name, date, questions):
+    """Hash everything that affects the rendered output.
+
+    Args:
+        college_name: Name of the college
+        exam_name: Name of the exam
+        date: Date of the exam
+        questions: Dictionary of questions {number: question_data}
+
+    Returns:
+        Hex SHA-256 digest of the ordered questions, header fields and
+        renderer version
+    """
+    payload = json.dumps({
+        'renderer': RENDERER_VERSION,
+        'header': [college_name, exam_name, date],
+        'questions': [[str(qid), questions[qid]] for qid in sorted(questions)],
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PaperCache:
+    """Map paper cache keys to artifact files in an output directory."""
+
+    MAX_AGE_DAYS = 30
+    MAX_SIZE_MB = 500
+    # Artifacts written or looked up this recently may still be in use by
+    # another job or request (e.g. being converted to PDF) and are kept
+    GRACE_SECONDS = 600
+    # Only cache artifacts are pruned; other files in the folder are left alone
+    ARTIFACT_RE = re.compile(r'^(?:%s)_([0-9a-f]{16})\.(?:docx|pdf)$' % '|'.join(ARTIFACTS.values()))
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def path(self, key, artifact, extension='.docx'):
+        """Path of a cached artifact ('question_paper' or 'answer_key')."""
+        return self.output_dir / f"{ARTIFACTS[artifact]}_{key[:16]}{extension}"
+
+    def lookup(self, key, require_pdf=False):
+        """Find cached artifacts for a key.
+
+        Args:
+            key: Paper cache key
+            require_pdf: Only report a hit if the PDF versions exist too
+
+        Returns:
+            Dictionary {artifact: Path} of the DOCX files, or None on a miss
+        """
+        extensions = ('.docx', '.pdf') if require_pdf else ('.docx',)
+        paths = [self.path(key, artifact, ext) for artifact in ARTIFACTS for ext in extensions]
+        if not all(p.exists() for p in paths):
+            return None
+
+        # Refresh modification time so size-based pruning keeps hot papers
+        now = time.time()
+        for p in paths:
+            os.utime(p, (now, now))
+        return {artifact: self.path(key, artifact) for artifact in ARTIFACTS}
+
+    def render(self, key, artifact, render_fn):
+        """Render an artifact into the cache.
+
+        The file is written under a temporary name and renamed into place,
+        so a concurrent lookup never sees a half-written document, and
+        threads rendering the same paper do not share a temporary file.
+
+        Args:
+            key: Paper cache key
+            artifact: 'question_paper' or 'answer_key'
+            render_fn: Callable that writes a DOCX to the path it is given
+
+        Returns:
+            Path of the cached DOCX
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        target = self.path(key, artifact)
+        partial = target.with_name(f"{target.stem}.{os.getpid()}.{threading.get_ident()}.partial.docx")
+        try:
+            render_fn(str(partial))
+            os.replace(partial, target)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        return target
+
+    def prune(self, max_age_days=None, max_size_mb=None, keep=()):
+        """Remove old cached papers from the output directory.
+
+        Artifacts older than max_age_days are deleted first; then, while
+        the cached artifacts still take more than max_size_mb, the least
+        recently used ones go. Artifacts of the keys in keep and any used
+        within GRACE_SECONDS are never removed, even if that leaves the
+        cache over its size limit.
+
+        Args:
+            max_age_days: Age limit (default: MAX_AGE_DAYS)
+            max_size_mb: Size limit (default: MAX_SIZE_MB)
+            keep: Paper cache keys to protect, e.g. the one just rendered
+
+        Returns:
+            Number of files removed
+        """
+        max_age_days = self.MAX_AGE_DAYS if max_age_days is None else max_age_days
+        max_bytes = (self.MAX_SIZE_MB if max_size_mb is None else max_size_mb) * 1024 * 1024
+        if not self.output_dir.exists():
+            return 0
+
+        kept = {key[:16] for key in keep}
+        entries = []
+        for entry in os.scandir(self.output_dir):
+            match = self.ARTIFACT_RE.match(entry.name)
+            if match and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path, match.group(1)))
+        entries.sort()
+
+        removed = 0
+        now = time.time()
+        cutoff = now - max_age_days * 86400
+        in_use = now - self.GRACE_SECONDS
+        total = sum(entry[1] for entry in entries)
+        for mtime, size, path, key in entries:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            if key in kept or mtime >= in_use:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
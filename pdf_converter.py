@@ -7,12 +7,15 @@ class PDFConverter:
     """Convert Word documents to PDF format."""
     
     @staticmethod
-    def docx_to_pdf(docx_path, pdf_path):
+    def docx_to_pdf(docx_path, pdf_path, profile_dir=None):
         """Convert DOCX file to PDF using LibreOffice.
         
         Args:
             docx_path: Path to the input DOCX file
             pdf_path: Path to save the output PDF file
+            profile_dir: Optional LibreOffice user profile directory. A
+                conversion with its own profile runs its own LibreOffice
+                process, so several can run at the same time
             
         Returns:
             True if conversion is successful, False otherwise
@@ -28,6 +31,8 @@ class PDFConverter:
                 '--outdir', output_dir,
                 str(docx_path)
             ]
+            if profile_dir:
+                cmd.insert(1, '-env:UserInstallation=' + Path(profile_dir).resolve().as_uri())
             
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
             
@@ -53,13 +58,14 @@ class PDFConverter:
             return False
     
     @staticmethod
-    def convert_documents(question_paper_path, answer_key_path, output_dir):
+    def convert_documents(question_paper_path, answer_key_path, output_dir, profile_dir=None):
         """Convert both Question Paper and Answer Key to PDF.
         
         Args:
             question_paper_path: Path to Question Paper DOCX
             answer_key_path: Path to Answer Key DOCX
             output_dir: Directory to save PDF files
+            profile_dir: Optional LibreOffice user profile (see docx_to_pdf)
             
         Returns:
             Tuple (question_paper_pdf_path, answer_key_pdf_path) or None if any conversion fails
@@ -79,7 +85,7 @@ class PDFConverter:
         
         # Convert Question Paper
         print("Converting Question Paper to PDF...")
-        if not PDFConverter.docx_to_pdf(question_paper_path, question_paper_pdf):
+        if not PDFConverter.docx_to_pdf(question_paper_path, question_paper_pdf, profile_dir):
             print("Failed to convert Question Paper to PDF")
             return None
         
@@ -87,7 +93,7 @@ class PDFConverter:
         
         # Convert Answer Key
         print("Converting Answer Key to PDF...")
-        if not PDFConverter.docx_to_pdf(answer_key_path, answer_key_pdf):
+        if not PDFConverter.docx_to_pdf(answer_key_path, answer_key_pdf, profile_dir):
             print("Failed to convert Answer Key to PDF")
             return None
         
@@ -3,11 +3,109 @@ PDF Question Extractor
 Extracts questions from PDF files
 """
 
-import pdfplumber
 from pathlib import Path
+from collections import Counter
+from itertools import chain, compress, repeat
+from operator import lt, ne, not_
 import re
 
 
+class QuestionParser:
+    """Incremental line parser for numbered MCQ questions.
+    
+    Lines are fed one at a time; a question is returned once the start of
+    the next question (or the end of input) closes it. This lets callers
+    parse a PDF page by page and know which questions are complete.
+    """
+    
+    QUESTION_RE = re.compile(r'^(?:Q\.?\s*)?(\d+)[.\):\s]+(.+)')
+    OPTION_RE = re.compile(r'^([A-D])[.\)]\s+(.+)')
+    ANSWER_RE = re.compile(r'^(?:Answer|Correct|Solution)[:\s]+([A-D])', re.IGNORECASE)
+    EXPLANATION_RE = re.compile(r'^(?:Explanation|Solution|Note|Reason)[:\s]+', re.IGNORECASE)
+    
+    def __init__(self):
+        self.current_question = None
+        self.current_options = {}
+        self.current_answer = None
+        self.current_explanation = ""
+        self.current_page = None
+    
+    @property
+    def pending_page(self):
+        """Page on which the currently open question started, if any."""
+        return self.current_page if self.current_question is not None else None
+    
+    def _build(self):
+        """Build the open question, or None if it has no options."""
+        if self.current_question and self.current_options:
+            return {
+                "question": self.current_question,
+                "options": self.current_options,
+                "correct_answer": self.current_answer or "A",
+                "explanation": self.current_explanation.strip() or "No explanation provided"
+            }
+        return None
+    
+    def _start(self, question_text, page):
+        self.current_question = question_text
+        self.current_options = {}
+        self.current_answer = None
+        self.current_explanation = ""
+        self.current_page = page
+    
+    def feed(self, line, page=None):
+        """Feed a single line of text.
+        
+        Args:
+            line: Line of extracted text
+            page: Page number the line came from (optional)
+            
+        Returns:
+            Tuple (question_data, start_page) for a question closed by this
+            line, otherwise None
+        """
+        line = line.strip()
+        if not line:
+            return None
+        
+        completed = None
+        
+        # Check for question start (Q1., 1., Question:, etc.)
+        question_match = self.QUESTION_RE.match(line)
+        if question_match:
+            if self.current_question is not None:
+                question = self._build()
+                if question:
+                    completed = (question, self.current_page)
+            self._start(question_match.group(2), page)
+        
+        # Check for options (A), B), C), D) or A. B. C. D.
+        elif self.OPTION_RE.match(line):
+            option_match = self.OPTION_RE.match(line)
+            self.current_options[option_match.group(1)] = option_match.group(2)
+        
+        # Check for answer indicator
+        elif self.ANSWER_RE.match(line):
+            self.current_answer = self.ANSWER_RE.match(line).group(1)
+        
+        # Check for explanation
+        elif self.EXPLANATION_RE.match(line):
+            self.current_explanation = line
+        
+        return completed
+    
+    def finish(self):
+        """Close the last open question.
+        
+        Returns:
+            Tuple (question_data, start_page) or None
+        """
+        question = self._build()
+        completed = (question, self.current_page) if question else None
+        self.current_question = None
+        return completed
+
+
 class PDFQuestionExtractor:
     """Extract questions from PDF files."""
     
@@ -28,6 +126,7 @@ class PDFQuestionExtractor:
             Dictionary with page-wise text
         """
         try:
+            import pdfplumber  # Slow to import; only needed once a PDF is opened
             with pdfplumber.open(self.pdf_path) as pdf:
                 for page_num, page in enumerate(pdf.pages, 1):
                     page_text = page.extract_text()
@@ -41,6 +140,30 @@ class PDFQuestionExtractor:
         except Exception as e:
             return False, f"Error extracting text: {str(e)}"
     
+    def iter_pages(self, start_page=1):
+        """Extract text page by page, starting at a given page.
+        
+        Pages before start_page are skipped without extracting their text,
+        so a resumed ingest does not pay for work it already did.
+        
+        Args:
+            start_page: 1-based page number to start from
+            
+        Yields:
+            Tuple (page_num, total_pages, page_text)
+        """
+        import pdfplumber
+        with pdfplumber.open(self.pdf_path) as pdf:
+            total_pages = len(pdf.pages)
+            for page_num in range(max(start_page, 1), total_pages + 1):
+                page_text = pdf.pages[page_num - 1].extract_text() or ""
+                self.pages_text.append({
+                    "page": page_num,
+                    "text": page_text
+                })
+                self.text += page_text + "\n"
+                yield page_num, total_pages, page_text
+    
     def extract_questions(self):
         """Extract questions from PDF text.
         
@@ -56,80 +179,17 @@ class PDFQuestionExtractor:
         questions = {}
         question_id = 1
         
-        # Try multiple question patterns
-        patterns = [
-            # Pattern 1: Q1. Question text\nA) option\nB) option\nC) option\nD) option\nAnswer: B
-            r'Q\.?\s*(\d+)[.\):\s]+([^A-D\n]+)\n([A-D]\)[^\n]+\n)+.*?Answer[:\s]+([A-D])',
-            
-            # Pattern 2: 1. Question text\nA) option\nB) option\nC) option\nD) option
-            r'(\d+)[.\):\s]+([^A-D\n]+)\n([A-D]\)[^\n]+(?:\n[A-D]\)[^\n]+){2,3})',
-            
-            # Pattern 3: Question. text\nA. option\nB. option\nC. option\nD. option
-            r'([A-D])\.\s+([^A-D\n]+(?:\n(?![A-D]\.).*)*)',
-        ]
-        
-        # Split by question markers
-        lines = self.text.split('\n')
-        current_question = None
-        current_options = {}
-        current_answer = None
-        current_explanation = ""
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check for question start (Q1., 1., Question:, etc.)
-            question_match = re.match(r'^(?:Q\.?\s*)?(\d+)[.\):\s]+(.+)', line)
-            if question_match and current_question is not None:
-                # Save previous question
-                if current_options:
-                    questions[question_id] = {
-                        "question": current_question,
-                        "options": current_options,
-                        "correct_answer": current_answer or "A",
-                        "explanation": current_explanation.strip() or "No explanation provided"
-                    }
-                    question_id += 1
-                
-                # Start new question
-                current_question = question_match.group(2)
-                current_options = {}
-                current_answer = None
-                current_explanation = ""
-            
-            elif question_match and current_question is None:
-                current_question = question_match.group(2)
-                current_options = {}
-                current_answer = None
-                current_explanation = ""
-            
-            # Check for options (A), B), C), D) or A. B. C. D.
-            elif re.match(r'^[A-D][.\)]\s+', line):
-                option_match = re.match(r'^([A-D])[.\)]\s+(.+)', line)
-                if option_match:
-                    option_key = option_match.group(1)
-                    option_text = option_match.group(2)
-                    current_options[option_key] = option_text
-            
-            # Check for answer indicator
-            elif re.match(r'^(?:Answer|Correct|Solution)[:\s]+([A-D])', line, re.IGNORECASE):
-                ans_match = re.match(r'^(?:Answer|Correct|Solution)[:\s]+([A-D])', line, re.IGNORECASE)
-                current_answer = ans_match.group(1)
-            
-            # Check for explanation
-            elif re.match(r'^(?:Explanation|Solution|Note|Reason)[:\s]+', line, re.IGNORECASE):
-                current_explanation = line
+        parser = QuestionParser()
+        for line in self.text.split('\n'):
+            completed = parser.feed(line)
+            if completed:
+                questions[question_id] = completed[0]
+                question_id += 1
         
         # Save last question
-        if current_question and current_options:
-            questions[question_id] = {
-                "question": current_question,
-                "options": current_options,
-                "correct_answer": current_answer or "A",
-                "explanation": current_explanation.strip() or "No explanation provided"
-            }
+        completed = parser.finish()
+        if completed:
+            questions[question_id] = completed[0]
         
         if not questions:
             # Fallback: try to extract any text with options
@@ -140,6 +200,40 @@ class PDFQuestionExtractor:
         else:
             return False, {}, "No questions found in PDF"
     
+    def iter_question_pages(self):
+        """Extract questions page by page, as the pages are read.
+        
+        Stopping the iteration early closes the PDF, so callers can cancel
+        a long extraction between pages.
+        
+        Yields:
+            Tuple (page_num, total_pages, questions) where questions is a
+            dictionary {id: question_data} of the questions completed on
+            that page (possibly empty). IDs are numbered from 1 in reading
+            order. A final tuple for the last page holds the question
+            still open at the end, or the fallback extraction when no
+            numbered questions were found.
+        """
+        parser = QuestionParser()
+        question_id = 1
+        page_num = total_pages = 0
+        for page_num, total_pages, page_text in self.iter_pages():
+            questions = {}
+            for line in page_text.split('\n'):
+                completed = parser.feed(line, page_num)
+                if completed:
+                    questions[question_id] = completed[0]
+                    question_id += 1
+            yield page_num, total_pages, questions
+        
+        questions = {}
+        completed = parser.finish()
+        if completed:
+            questions[question_id] = completed[0]
+        elif question_id == 1:
+            questions = self._fallback_extraction()
+        yield page_num, total_pages, questions
+    
     def _fallback_extraction(self):
         """Fallback method to extract questions."""
         questions = {}
@@ -198,6 +292,8 @@ class PDFQuestionExtractor:
 class QuestionValidator:
     """Validate extracted questions."""
     
+    REQUIRED_OPTIONS = frozenset({'A', 'B', 'C', 'D'})
+    
     @staticmethod
     def validate_question(question_data):
         """Validate a single question.
@@ -236,31 +332,91 @@ class QuestionValidator:
         return len(errors) == 0, errors
     
     @staticmethod
-    def validate_questions(questions_dict):
-        """Validate all questions.
+    def validate_batch(questions_dict):
+        """Validate a batch of questions column by column.
+        
+        The question texts, option dictionaries and answers are pulled into
+        columns and each rule is first checked with one aggregate pass over
+        its column (shortest text, key counts, answer set, shortest option).
+        Rows are only located when an aggregate check fails, and error
+        messages are only built for the failing rows, so the usual all-valid
+        import does no per-question bookkeeping.
         
         Args:
             questions_dict: Dictionary of questions
             
         Returns:
-            Tuple (is_valid, validation_report)
+            Tuple (is_valid, validation_report) as validate_questions
         """
+        required = QuestionValidator.REQUIRED_OPTIONS
+        qids = list(questions_dict.keys())
+        rows = list(questions_dict.values())
+        rows_range = range(len(rows))
+        
+        texts = [q.get("question") for q in rows]
+        options = [q.get("options", {}) for q in rows]
+        answers = [q.get("correct_answer", "") for q in rows]
+        
+        failing = set()
+        
+        # Question text length
+        try:
+            if rows and min(map(len, texts)) < 5:
+                failing.update(compress(rows_range, map(lt, map(len, texts), repeat(5))))
+        except TypeError:
+            failing.update(i for i, text in enumerate(texts) if not text or len(text) < 5)
+        
+        # Option key sets: with keys limited to A-D and 4 keys per row on
+        # average, every row must have exactly A, B, C and D
+        if all(map(isinstance, options, repeat(dict))):
+            dict_rows = rows_range
+            dicts = options
+        else:
+            dict_rows = [i for i, opts in enumerate(options) if isinstance(opts, dict)]
+            dicts = [options[i] for i in dict_rows]
+            failing.update(set(rows_range).difference(dict_rows))
+        key_counts = Counter(chain.from_iterable(dicts))
+        if not (key_counts.keys() <= required and sum(key_counts.values()) == 4 * len(dicts)):
+            failing.update(compress(dict_rows, map(ne, map(dict.keys, dicts), repeat(required))))
+        
+        # Answer membership
+        if not Counter(answers).keys() <= required:
+            failing.update(compress(rows_range, map(not_, map(required.__contains__, answers))))
+        
+        # Option text length
+        values = list(chain.from_iterable(map(dict.values, dicts)))
+        try:
+            short = None
+            if values and (min(map(len, values)) < 2 or not all(values)):
+                short = list(map(lt, map(len, values), repeat(2)))
+        except TypeError:
+            short = [not value or len(str(value)) < 2 for value in values]
+        if short is not None:
+            owners = chain.from_iterable(map(repeat, dict_rows, map(len, dicts)))
+            failing.update(compress(owners, short))
+        
         report = {
-            "total": len(questions_dict),
-            "valid": 0,
-            "invalid": 0,
+            "total": len(rows),
+            "valid": len(rows) - len(failing),
+            "invalid": len(failing),
             "errors": {}
         }
-        
-        for qid, question in questions_dict.items():
-            is_valid, errors = QuestionValidator.validate_question(question)
-            if is_valid:
-                report["valid"] += 1
-            else:
-                report["invalid"] += 1
-                report["errors"][qid] = errors
+        for i in sorted(failing):
+            report["errors"][qids[i]] = QuestionValidator.validate_question(rows[i])[1]
         
         return report["invalid"] == 0, report
+    
+    @staticmethod
+    def validate_questions(questions_dict):
+        """Validate all questions.
+        
+        Args:
+            questions_dict: Dictionary of questions
+            
+        Returns:
+            Tuple (is_valid, validation_report)
+        """
+        return QuestionValidator.validate_batch(questions_dict)
 
 
 def extract_pdf_questions(pdf_path):
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Production Server for the Web Application
+Serves app_web with several worker processes (gunicorn) so a whole staff
+room can use it at once. On Windows, where gunicorn is not available,
+a multi-threaded waitress server is used instead.
+
+Usage:
+    python serve.py [--port 8080] [--workers 4] [--threads 4]
+
+Graceful reload (gunicorn): workers finish their current requests and are
+replaced by new ones running the current code:
+    kill -HUP $(cat serve.pid)
+
+Every worker opens the question bank itself and reloads it before a
+request when another worker has changed the file. The session secret is
+shared through MCQ_SECRET_KEY or the .secret_key file.
+"""
+
+import os
+import sys
+import socket
+import argparse
+import multiprocessing
+
+
+def default_workers():
+    """Two workers per CPU plus one, capped for small servers."""
+    return min(multiprocessing.cpu_count() * 2 + 1, 9)
+
+
+def choose_server(requested):
+    """Pick the server backend to use.
+
+    Args:
+        requested: 'auto', 'gunicorn', 'waitress' or 'flask'
+
+    Returns:
+        Name of an installed backend
+    """
+    if requested != 'auto':
+        return requested
+    candidates = ['waitress'] if sys.platform == 'win32' else ['gunicorn', 'waitress']
+    for name in candidates:
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return 'flask'
+
+
+def run_gunicorn(args):
+    """Run app_web under gunicorn with a pre-fork worker pool."""
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        # Paper generation and PDF ingestion can take a while
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'keepalive': 5,
+        # Recycle workers now and then to keep memory bounded
+        'max_requests': args.max_requests,
+        'max_requests_jitter': max(args.max_requests // 10, 1) if args.max_requests else 0,
+        'pidfile': args.pidfile,
+        'accesslog': '-',
+        # Each worker imports the app and opens the question bank itself
+        'preload_app': False,
+    }
+
+    class MCQApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app_web import app
+            return app
+
+    MCQApplication().run()
+
+
+def run_waitress(args):
+    """Run app_web under waitress (single process, many threads)."""
+    from waitress import serve
+    from app_web import app
+
+    serve(app, host=args.host, port=args.port, threads=args.workers * args.threads,
+          channel_timeout=args.timeout)
+
+
+def run_flask(args):
+    """Fall back to Flask's threaded development server."""
+    from app_web import app
+
+    print("Warning: gunicorn/waitress not installed; using the development server")
+    print("Install one for production use: pip install gunicorn (or waitress on Windows)")
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
+
+
+def main():
+    """Command-line entry point."""
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Serve the MCQ Paper Generator web app")
+    parser.add_argument('--host', default=env('MCQ_HOST', '0.0.0.0'), help="Interface to bind")
+    parser.add_argument('--port', type=int, default=int(env('MCQ_PORT', 8080)), help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=int(env('MCQ_WORKERS', default_workers())),
+                        help="Worker processes (waitress: multiplies --threads)")
+    parser.add_argument('--threads', type=int, default=int(env('MCQ_THREADS', 4)), help="Threads per worker")
+    parser.add_argument('--timeout', type=int, default=120, help="Seconds before a stuck request is aborted")
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help="Seconds workers get to finish requests on reload/shutdown")
+    parser.add_argument('--max-requests', type=int, default=1000,
+                        help="Restart a worker after this many requests (0 = never)")
+    parser.add_argument('--pidfile', default='serve.pid', help="PID file of the master process")
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress', 'flask'], default='auto',
+                        help="Server backend (default: gunicorn, or waitress on Windows)")
+    args = parser.parse_args()
+
+    server = choose_server(args.server)
+    try:
+        local_ip = socket.gethostbyname(socket.gethostname())
+    except OSError:
+        local_ip = 'localhost'
+
+    print("\n" + "="*60)
+    print("MCQ PAPER GENERATOR - WEB SERVER")
+    print("="*60)
+    print(f"\nServer:   {server}")
+    if server == 'gunicorn':
+        print(f"Workers:  {args.workers} x {args.threads} threads")
+        print(f"Reload:   kill -HUP $(cat {args.pidfile})")
+    elif server == 'waitress':
+        print(f"Threads:  {args.workers * args.threads}")
+    print(f"\nAccess from this computer: http://localhost:{args.port}")
+    print(f"Access from tablet/phone: http://{local_ip}:{args.port}")
+    print("="*60 + "\n")
+
+    {'gunicorn': run_gunicorn, 'waitress': run_waitress, 'flask': run_flask}[server](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,9 +19,16 @@ if errorlevel 1 (
     pip install flask werkzeug
 )
 
+REM Multi-threaded production server
+python -c "import waitress" 2>nul
+if errorlevel 1 (
+    echo Installing waitress...
+    pip install waitress
+)
+
 REM Start the web server
 echo.
 echo Starting web server...
 echo.
-python app_web.py
+python serve.py
 pause
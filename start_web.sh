@@ -18,8 +18,14 @@ if ! python -c "import flask" 2>/dev/null; then
     pip install flask werkzeug
 fi
 
+# Multi-process production server
+if ! python -c "import gunicorn" 2>/dev/null; then
+    echo "Installing gunicorn..."
+    pip install gunicorn
+fi
+
 # Start the web server
 echo ""
 echo "Starting web server..."
 echo ""
-python app_web.py
+python serve.py